@@ -0,0 +1,120 @@
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import run_operations
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import ColumnTable
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import normalize_credentials
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    OPERATIONS,
+    TholaRequestError,
+    build_request,
+    thola_client_found,
+)
+
+HOST_KEYS = ("host", "community", "version", "port")
+
+# the table of the results of these operations can be returned column wise
+TABLES = {
+    "read_interfaces": "interfaces",
+    "check_interface_metrics": "performance_data",
+}
+
+
+class ActionModule(ActionBase):
+    TRANSFERS_FILES = False
+    _requires_connection = False
+
+    argument_spec = dict(
+        api_host=dict(type="str", required=True),
+        hosts=dict(type="list", elements="raw", required=True),
+        operation=dict(type="str", required=True, choices=sorted(OPERATIONS)),
+        community=dict(type="str", required=False, default="public"),
+        version=dict(type="str", required=False, default="2c"),
+        port=dict(type="int", required=False, default=161),
+        discover_parallel_request=dict(type="int", required=False, default=5),
+        discover_retries=dict(type="int", required=False, default=0),
+        discover_timeout=dict(type="int", required=False, default=2),
+        request=dict(type="dict", required=False, default={}),
+        concurrency=dict(type="int", required=False, default=20),
+        timeout=dict(type="float", required=False),
+        output_format=dict(type="str", required=False, default="rows", choices=["rows", "columns"]),
+    )
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        dummy, args = self.validate_argument_spec(argument_spec=self.argument_spec)
+
+        if not thola_client_found:
+            raise AnsibleActionFail("The thola-client-module is not installed")
+        if args["concurrency"] < 1:
+            raise AnsibleActionFail("concurrency must be at least 1")
+
+        targets = []
+        for entry in args["hosts"]:
+            target = dict((key, args[key]) for key in HOST_KEYS[1:])
+            if isinstance(entry, dict):
+                unknown = sorted(str(key) for key in entry if key not in HOST_KEYS)
+                if unknown:
+                    raise AnsibleActionFail("Unknown keys in an entry of hosts: " + ", ".join(unknown))
+                target.update(entry)
+                if target.get("host") is None:
+                    raise AnsibleActionFail("Every entry of hosts needs a host")
+                target["host"] = str(target["host"])
+            else:
+                target["host"] = str(entry)
+            # community, version and port of an entry can be lists Thola tries
+            try:
+                target["community"], target["version"], target["port"] = normalize_credentials(
+                    target["community"], target["version"], target["port"])
+            except TholaRequestError as e:
+                raise AnsibleActionFail(target["host"] + ": " + str(e))
+            targets.append(target)
+
+        # results are keyed by host, so a host may only be given once, entries
+        # that are exactly the same are merged
+        unique = {}
+        for target in targets:
+            if unique.setdefault(target["host"], target) != target:
+                raise AnsibleActionFail("hosts contains " + target["host"] + " more than once with different settings")
+        targets = list(unique.values())
+
+        try:
+            bodies = [build_request(
+                args["operation"],
+                target["host"],
+                community=target["community"],
+                version=target["version"],
+                port=target["port"],
+                discover_parallel_request=args["discover_parallel_request"],
+                discover_retries=args["discover_retries"],
+                discover_timeout=args["discover_timeout"],
+                extra=args["request"],
+            ) for target in targets]
+        except TholaRequestError as e:
+            raise AnsibleActionFail(str(e))
+
+        table = TABLES.get(args["operation"]) if args["output_format"] == "columns" else None
+
+        def to_columns(facts):
+            if facts.get(table) is not None:
+                facts[table] = ColumnTable.from_rows(facts[table])
+            return facts
+
+        results = {}
+        failed_hosts = {}
+        responses = run_operations(args["api_host"], args["operation"], bodies,
+                                   concurrency=args["concurrency"], timeout=args["timeout"],
+                                   transform=to_columns if table else None)
+        for target, (ok, value) in zip(targets, responses):
+            if ok:
+                if table and value.get(table) is not None:
+                    value[table] = value[table].to_dict()
+                results[target["host"]] = value
+            else:
+                failed_hosts[target["host"]] = value
+
+        result["changed"] = False
+        result["results"] = results
+        result["failed_hosts"] = failed_hosts
+        return result
@@ -0,0 +1,98 @@
+import json
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import AdaptiveLimiter, run_operations
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    DEFAULT_MAX_ADDRESSES,
+    build_request,
+    expand_targets,
+    thola_client_found,
+)
+
+
+class ActionModule(ActionBase):
+    TRANSFERS_FILES = False
+    _requires_connection = False
+
+    argument_spec = dict(
+        api_host=dict(type="str", required=True),
+        networks=dict(type="list", elements="str", required=True),
+        community=dict(type="str", required=False, default="public"),
+        version=dict(type="str", required=False, default="2c"),
+        port=dict(type="int", required=False, default=161),
+        discover_parallel_request=dict(type="int", required=False, default=5),
+        discover_retries=dict(type="int", required=False, default=0),
+        discover_timeout=dict(type="int", required=False, default=2),
+        concurrency=dict(type="int", required=False, default=100),
+        initial_concurrency=dict(type="int", required=False, default=10),
+        timeout=dict(type="float", required=False),
+        output=dict(type="path", required=False),
+        return_results=dict(type="bool", required=False, default=True),
+        max_addresses=dict(type="int", required=False, default=DEFAULT_MAX_ADDRESSES),
+    )
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        dummy, args = self.validate_argument_spec(argument_spec=self.argument_spec)
+
+        if not thola_client_found:
+            raise AnsibleActionFail("The thola-client-module is not installed")
+        if args["concurrency"] < 1 or args["initial_concurrency"] < 1:
+            raise AnsibleActionFail("concurrency and initial_concurrency must be at least 1")
+
+        try:
+            targets = expand_targets(args["networks"], args["max_addresses"])
+        except ValueError as e:
+            raise AnsibleActionFail("Invalid network: " + str(e))
+
+        # the bodies are built while the sweep runs
+        bodies = (build_request(
+            "identify",
+            target,
+            community=args["community"],
+            version=args["version"],
+            port=args["port"],
+            discover_parallel_request=args["discover_parallel_request"],
+            discover_retries=args["discover_retries"],
+            discover_timeout=args["discover_timeout"],
+        ) for target in targets)
+
+        output = None
+        if args["output"]:
+            try:
+                output = open(args["output"], "w")
+            except (IOError, OSError) as e:
+                raise AnsibleActionFail("Can't open output file: " + str(e))
+
+        def write_result(index, ok, value):
+            # every result is written as one JSON line as soon as it is available
+            if ok:
+                line = {"host": targets[index], "identified": True, "facts": value}
+            else:
+                line = {"host": targets[index], "identified": False, "msg": value}
+            output.write(json.dumps(line) + "\n")
+            output.flush()
+
+        limiter = AdaptiveLimiter(args["concurrency"], initial=args["initial_concurrency"])
+        try:
+            responses = run_operations(args["api_host"], "identify", bodies, timeout=args["timeout"],
+                                       limiter=limiter, callback=write_result if output else None)
+        finally:
+            if output:
+                output.close()
+
+        results = {}
+        for target, (ok, value) in zip(targets, responses):
+            if ok:
+                results[target] = value
+
+        result["changed"] = False
+        result["scanned"] = len(targets)
+        result["identified"] = len(results)
+        result["concurrency"] = int(limiter.limit)
+        if args["return_results"]:
+            result["results"] = results
+        return result
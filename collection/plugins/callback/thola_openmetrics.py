@@ -0,0 +1,180 @@
+DOCUMENTATION = """
+---
+name: thola_openmetrics
+author: "Thola team"
+version_added: "1.1.0"
+type: aggregate
+short_description: "Writes the results of Thola checks to an OpenMetrics file"
+description:
+    - "Collects the results of the thola_check_* modules and of thola_batch with a check operation and writes
+      them, once at the end of the playbook, to a file in the OpenMetrics text format, e.g. for the textfile
+      collector of the node exporter"
+    - "The file is written to a temporary file next to it and renamed, so readers never see a partial file. It is
+      not touched if the playbook ran no checks"
+    - "Exported are the status of every check (0 OK, 1 WARNING, 2 CRITICAL, 3 UNKNOWN, checks that could not be
+      run are UNKNOWN), the values and thresholds of its performance data and the duration of its request"
+requirements:
+    - enable in configuration, e.g. callbacks_enabled = inexio.thola.thola_openmetrics
+options:
+    path:
+        description:
+          - File the metrics are written to
+        type: path
+        default: "~/.ansible/thola/checks.prom"
+        env:
+          - name: THOLA_OPENMETRICS_PATH
+        ini:
+          - section: callback_thola_openmetrics
+            key: path
+"""
+
+import os
+import tempfile
+import time
+
+from ansible.plugins.callback import CallbackBase
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import to_rows
+
+UNKNOWN = 3
+THRESHOLDS = ("warning_min", "warning_max", "critical_min", "critical_max")
+
+# metric families in the order they are written, with their help text
+FAMILIES = (
+    ("thola_check_status", "Status of the check, 0 OK, 1 WARNING, 2 CRITICAL, 3 UNKNOWN"),
+    ("thola_check_value", "Value of a performance data point of the check"),
+    ("thola_check_threshold", "Threshold of a performance data point of the check"),
+    ("thola_check_request_seconds", "Duration of the request of the check to the Thola API"),
+    ("thola_check_run_timestamp_seconds", "Time the metrics were written"),
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def check_samples(host, check, facts):
+    """Yields the (family, labels, value) samples of a check result, facts
+    are the facts a check module returns or None if the check could not be
+    run."""
+    labels = (("host", host), ("check", check))
+    if not isinstance(facts, dict) or _number(facts.get("status_code")) is None:
+        yield "thola_check_status", labels, UNKNOWN
+        return
+    yield "thola_check_status", labels, _number(facts["status_code"])
+    performance_data = facts.get("performance_data") or []
+    if isinstance(performance_data, dict):
+        # output_format columns
+        performance_data = to_rows(performance_data)
+    for point in performance_data:
+        point_labels = labels + (("metric", point.get("metric") or ""), ("label", point.get("label") or ""))
+        value = _number(point.get("value"))
+        if value is not None:
+            yield "thola_check_value", point_labels + (("unit", point.get("unit") or ""),), value
+        thresholds = point.get("thresholds") or {}
+        for threshold in THRESHOLDS:
+            value = _number(thresholds.get(threshold))
+            if value is not None:
+                yield "thola_check_threshold", point_labels + (("threshold", threshold),), value
+    request = _number((facts.get("thola_timings") or {}).get("request"))
+    if request is not None:
+        yield "thola_check_request_seconds", labels, request
+
+
+def format_metrics(samples):
+    """Returns samples, a dict of (family, labels) to value, in the
+    OpenMetrics text format."""
+    lines = []
+    for family, help_text in FAMILIES:
+        family_samples = sorted((labels, value) for (name, labels), value in samples.items() if name == family)
+        if not family_samples:
+            continue
+        lines.append("# TYPE %s gauge" % family)
+        lines.append("# HELP %s %s" % (family, help_text))
+        for labels, value in family_samples:
+            if labels:
+                label_text = ",".join("%s=\"%s\"" % (name, _escape(label)) for name, label in labels)
+                lines.append("%s{%s} %r" % (family, label_text, float(value)))
+            else:
+                lines.append("%s %r" % (family, float(value)))
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, text):
+    """Writes text to path atomically."""
+    path = os.path.expanduser(path)
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o755)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        # mkstemp creates the file readable for the owner only
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "inexio.thola.thola_openmetrics"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display)
+        # (family, labels) to value, a check that runs twice for a host keeps its last result
+        self._samples = {}
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, False)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, True)
+
+    def _record(self, result, failed):
+        action = result._task.action.split(".")[-1]
+        if action.startswith("thola_check_") and action.endswith("_facts"):
+            check = action[len("thola_check_"):-len("_facts")]
+            if failed:
+                # a failed check returns its result next to the message
+                facts = result._result if "status_code" in result._result else None
+            else:
+                facts = dict(result._result.get("ansible_facts") or {},
+                             thola_timings=result._result.get("thola_timings"))
+            self._add(result._host.get_name(), check, facts)
+        elif action == "thola_batch" and not failed:
+            operation = str(result._task.args.get("operation", ""))
+            if not operation.startswith("check_"):
+                return
+            check = operation[len("check_"):]
+            for host, facts in (result._result.get("results") or {}).items():
+                self._add(host, check, facts)
+            for host in result._result.get("failed_hosts") or {}:
+                self._add(host, check, None)
+
+    def _add(self, host, check, facts):
+        for family, labels, value in check_samples(host, check, facts):
+            self._samples[(family, labels)] = value
+
+    def v2_playbook_on_stats(self, stats):
+        if not self._samples:
+            return
+        self._samples[("thola_check_run_timestamp_seconds", ())] = time.time()
+        path = self.get_option("path")
+        try:
+            write_metrics(path, format_metrics(self._samples))
+        except (IOError, OSError) as e:
+            self._display.warning("Could not write the Thola check metrics to %s: %s" % (path, e))
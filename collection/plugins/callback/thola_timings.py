@@ -0,0 +1,183 @@
+DOCUMENTATION = """
+---
+name: thola_timings
+author: "Thola team"
+version_added: "1.1.0"
+type: aggregate
+short_description: "Summarizes where the time of Thola tasks went"
+description:
+    - "Collects the thola_timings the Thola modules return and prints, at the end of the playbook, for every module
+      the mean, percentiles and maximum of each stage, a histogram of the request durations and the hosts with the
+      slowest requests"
+    - "The request stage is the round trip to the Thola API, it includes the SNMP requests Thola sends to the
+      device"
+    - "The overhead stage is the time Ansible needed around the module, e.g. to fork, transfer the module and start
+      the interpreter, it is measured from the start of the task on the host until its result arrived"
+requirements:
+    - enable in configuration, e.g. callbacks_enabled = inexio.thola.thola_timings
+options:
+    slowest_hosts:
+        description:
+          - Number of hosts with the slowest requests that are listed for every module
+        type: int
+        default: 5
+        env:
+          - name: THOLA_TIMINGS_SLOWEST_HOSTS
+        ini:
+          - section: callback_thola_timings
+            key: slowest_hosts
+    output_path:
+        description:
+          - File the summary is written to as JSON, in addition to printing it
+        type: path
+        env:
+          - name: THOLA_TIMINGS_OUTPUT_PATH
+        ini:
+          - section: callback_thola_timings
+            key: output_path
+"""
+
+import json
+import math
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+STAGES = ("build", "request", "decode", "sanitize", "total", "overhead")
+
+# upper bounds of the request histogram buckets in seconds
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+BAR_WIDTH = 40
+
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of the sorted list values."""
+    return values[max(0, int(math.ceil(fraction * len(values))) - 1)]
+
+
+def histogram(values, buckets=BUCKETS):
+    counts = [0] * len(buckets)
+    for value in values:
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+    return counts
+
+
+def summarize(samples, slowest_hosts=5):
+    """Summarizes samples, a dict of operation to a list of (host, timings)
+    tuples, per operation."""
+    summary = {}
+    for operation, entries in samples.items():
+        stages = {}
+        for stage in STAGES:
+            values = sorted(timings[stage] for host, timings in entries if stage in timings)
+            if not values:
+                continue
+            stages[stage] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+            }
+        requests = [(host, timings["request"]) for host, timings in entries if "request" in timings]
+        requests.sort(key=lambda entry: entry[1], reverse=True)
+        summary[operation] = {
+            "count": len(entries),
+            "stages": stages,
+            "histogram": histogram([seconds for host, seconds in requests]),
+            "slowest_hosts": requests[:slowest_hosts],
+        }
+    return summary
+
+
+def _milliseconds(seconds):
+    return "%.1fms" % (seconds * 1000)
+
+
+def format_summary(summary):
+    lines = []
+    for operation in sorted(summary):
+        entry = summary[operation]
+        lines.append("%s (%d results)" % (operation, entry["count"]))
+        lines.append("  %-10s %6s %10s %10s %10s %10s %10s" % ("stage", "count", "mean", "p50", "p90", "p99", "max"))
+        for stage in STAGES:
+            if stage not in entry["stages"]:
+                continue
+            values = entry["stages"][stage]
+            lines.append("  %-10s %6d %10s %10s %10s %10s %10s" % (
+                stage, values["count"], _milliseconds(values["mean"]), _milliseconds(values["p50"]),
+                _milliseconds(values["p90"]), _milliseconds(values["p99"]), _milliseconds(values["max"])))
+        if entry["slowest_hosts"]:
+            lines.append("  request histogram:")
+            counts = entry["histogram"]
+            largest = max(counts)
+            # empty buckets below the fastest and above the slowest request are left out
+            first = min(i for i, count in enumerate(counts) if count)
+            last = max(i for i, count in enumerate(counts) if count)
+            for bound, count in list(zip(BUCKETS, counts))[first:last + 1]:
+                label = "<= " + _milliseconds(bound) if bound != float("inf") else "> " + _milliseconds(BUCKETS[-2])
+                bar = "#" * int(round(BAR_WIDTH * count / float(largest)))
+                lines.append("    %-12s %-*s %d" % (label, BAR_WIDTH, bar, count))
+            lines.append("  slowest hosts (request):")
+            for host, seconds in entry["slowest_hosts"]:
+                lines.append("    %-30s %10s" % (host, _milliseconds(seconds)))
+        lines.append("")
+    return lines
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "inexio.thola.thola_timings"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display)
+        self._starts = {}
+        self._samples = {}
+
+    def v2_runner_on_start(self, host, task):
+        self._starts[(host.get_name(), task._uuid)] = time.monotonic()
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result)
+
+    def _record(self, result):
+        host = result._host.get_name()
+        start = self._starts.pop((host, result._task._uuid), None)
+        operation = result._task.action.split(".")[-1]
+        if "results" in result._result:
+            # loop items don't have a start of their own
+            entries = [item for item in result._result["results"] if isinstance(item, dict)]
+        else:
+            entries = [result._result]
+        for entry in entries:
+            timings = entry.get("thola_timings")
+            if not isinstance(timings, dict):
+                continue
+            timings = dict(timings)
+            components = timings.pop("components", {})
+            if start is not None and len(entries) == 1:
+                timings["overhead"] = max(0, time.monotonic() - start - timings.get("total", 0))
+            self._samples.setdefault(operation, []).append((host, timings))
+            for component, component_timings in components.items():
+                self._samples.setdefault(operation + "/" + component, []).append((host, component_timings))
+
+    def v2_playbook_on_stats(self, stats):
+        if not self._samples:
+            return
+        summary = summarize(self._samples, self.get_option("slowest_hosts"))
+        self._display.banner("THOLA TIMINGS")
+        for line in format_summary(summary):
+            self._display.display(line)
+        output_path = self.get_option("output_path")
+        if output_path:
+            with open(output_path, "w") as f:
+                json.dump(summary, f, indent=2, sort_keys=True)
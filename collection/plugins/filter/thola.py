@@ -0,0 +1,14 @@
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import to_rows
+
+
+def thola_rows(table):
+    """Converts a table returned with output_format columns back to a list
+    of dicts, e.g. interfaces | inexio.thola.thola_rows"""
+    return to_rows(table)
+
+
+class FilterModule(object):
+    def filters(self):
+        return {
+            "thola_rows": thola_rows,
+        }
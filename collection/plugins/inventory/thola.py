@@ -0,0 +1,188 @@
+DOCUMENTATION = """
+---
+name: thola
+author: "Thola team"
+version_added: "1.1.0"
+short_description: "Builds an inventory from devices identified by Thola"
+description:
+    - "Identifies a list of IPs and CIDR ranges concurrently with the Thola API"
+    - "Every device that could be identified becomes a host with its identify facts as host variables"
+    - "Groups are built from the identify facts, e.g. os_ios or vendor_cisco"
+    - "The configuration file has to end with thola.yml or thola.yaml"
+requirements:
+    - thola-client-module-python
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+options:
+    plugin:
+        description:
+          - Token that ensures this is a source file for the thola plugin
+        required: True
+        choices: ["inexio.thola.thola"]
+    api_host:
+        description:
+          - Hostname of the running Thola API instance
+        required: True
+    hosts:
+        description:
+          - List of IPs, hostnames and CIDR ranges that should be identified
+        type: list
+        elements: str
+        required: True
+    community:
+        description:
+          - SNMP community of the devices
+        default: "public"
+    version:
+        description:
+          - SNMP version that should be used to connect to the devices
+        default: "2c"
+    port:
+        description:
+          - The port you want Thola to connect to the devices
+        type: int
+        default: 161
+    discover_parallel_request:
+        description:
+          - Sets the number of possible parallel requests
+        type: int
+        default: 5
+    discover_retries:
+        description:
+          - Sets the number of discovery retries
+        type: int
+        default: 0
+    discover_timeout:
+        description:
+          - Sets the discover timeout
+        type: int
+        default: 2
+    concurrency:
+        description:
+          - Maximum number of identify requests that are sent to the Thola API at the same time
+        type: int
+        default: 20
+    timeout:
+        description:
+          - Timeout of a single identify request in seconds
+        type: float
+    max_addresses:
+        description:
+          - Maximum number of addresses the entries of hosts may make up together, parsing fails for more
+        type: int
+        default: 65536
+    group_by:
+        description:
+          - Identify facts that groups are built from, the group name is the fact name
+          - without the ansible_net_ prefix followed by the lowercased value, e.g. os_ios
+        type: list
+        elements: str
+        default: ["ansible_net_os", "ansible_net_vendor", "ansible_net_model_series"]
+"""
+
+EXAMPLES = """
+# thola.yml
+plugin: inexio.thola.thola
+api_host: http://localhost:8237
+hosts:
+  - 192.168.178.0/24
+  - 10.0.0.1
+community: public
+concurrency: 50
+cache: true
+cache_plugin: jsonfile
+cache_connection: /tmp/thola_inventory
+cache_timeout: 86400
+keyed_groups:
+  - key: ansible_net_version
+    prefix: version
+"""
+
+from ansible.errors import AnsibleError, AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+from ansible.utils.display import Display
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import run_operations
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    build_request,
+    expand_targets,
+    thola_client_found,
+)
+
+display = Display()
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = "inexio.thola.thola"
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and path.endswith(("thola.yml", "thola.yaml"))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option("cache") and cache
+        update_cache = self.get_option("cache") and not cache
+
+        devices = None
+        if use_cache:
+            try:
+                devices = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if devices is None:
+            devices = self._identify()
+        if update_cache:
+            self._cache[cache_key] = devices
+
+        self._populate(devices)
+
+    def _identify(self):
+        if not thola_client_found:
+            raise AnsibleError("The thola-client-module is not installed")
+        try:
+            targets = expand_targets(self.get_option("hosts"), self.get_option("max_addresses"))
+        except ValueError as e:
+            raise AnsibleParserError("Invalid entry in hosts: " + str(e))
+
+        bodies = (build_request(
+            "identify",
+            target,
+            community=self.get_option("community"),
+            version=self.get_option("version"),
+            port=self.get_option("port"),
+            discover_parallel_request=self.get_option("discover_parallel_request"),
+            discover_retries=self.get_option("discover_retries"),
+            discover_timeout=self.get_option("discover_timeout"),
+        ) for target in targets)
+        responses = run_operations(self.get_option("api_host"), "identify", bodies,
+                                   concurrency=self.get_option("concurrency"), timeout=self.get_option("timeout"))
+
+        devices = {}
+        for target, (ok, value) in zip(targets, responses):
+            if ok:
+                devices[target] = value
+            else:
+                display.vvv("thola: could not identify " + target + ": " + value)
+        return devices
+
+    def _populate(self, devices):
+        strict = self.get_option("strict")
+        for host, facts in devices.items():
+            self.inventory.add_host(host)
+            self.inventory.set_variable(host, "ansible_host", host)
+            for key, value in facts.items():
+                self.inventory.set_variable(host, key, value)
+
+            for key in self.get_option("group_by"):
+                value = facts.get(key)
+                if value:
+                    prefix = key[len("ansible_net_"):] if key.startswith("ansible_net_") else key
+                    group = self.inventory.add_group(self._sanitize_group_name((prefix + "_" + str(value)).lower()))
+                    self.inventory.add_child(group, host)
+
+            self._set_composite_vars(self.get_option("compose"), facts, host, strict=strict)
+            self._add_host_to_composed_groups(self.get_option("groups"), facts, host, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option("keyed_groups"), facts, host, strict=strict)
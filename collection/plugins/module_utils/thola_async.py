@@ -0,0 +1,278 @@
+import asyncio
+import collections
+import hashlib
+import json
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    OPERATIONS,
+    TholaRequestError,
+    decode_response,
+    error_message,
+    finish_operation,
+    serialize_request,
+)
+
+DEFAULT_CONCURRENCY = 20
+
+# responses that mean the Thola API (or a proxy in front of it) is overloaded
+OVERLOAD_STATUS = (429, 502, 503, 504)
+
+
+class Limiter(object):
+    """Bounds the number of requests in flight to limit."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = collections.deque()
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # we were woken up but won't take the slot, pass it on
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self, latency, overloaded):
+        self.in_flight -= 1
+        self.record(latency, overloaded)
+        self._wake()
+
+    def record(self, latency, overloaded):
+        pass
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class AdaptiveLimiter(Limiter):
+    """Limiter that adapts its limit to the behaviour of the Thola API.
+
+    The limit grows by one per window of limit successful requests
+    (additive increase) and is halved (multiplicative decrease) when a
+    request hits an error/timeout that signals overload, or when the short
+    term average latency rises above latency_factor times the long term
+    average. Decreases happen at most once per window.
+    """
+
+    def __init__(self, maximum, initial=None, minimum=1, latency_factor=2.0):
+        super(AdaptiveLimiter, self).__init__(min(initial or 10, maximum))
+        self.maximum = maximum
+        self.minimum = minimum
+        self.latency_factor = latency_factor
+        self._short_latency = None
+        self._long_latency = None
+        self._since_decrease = 0
+
+    def record(self, latency, overloaded):
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+        else:
+            self._short_latency = 0.3 * latency + 0.7 * self._short_latency
+            self._long_latency = 0.02 * latency + 0.98 * self._long_latency
+        self._since_decrease += 1
+
+        slow = self._short_latency > self.latency_factor * self._long_latency
+        if overloaded or slow:
+            if self._since_decrease >= self.limit:
+                self.limit = max(self.minimum, self.limit / 2.0)
+                self._since_decrease = 0
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed by Thola API")
+    status = int(status_line.split(None, 2)[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, dummy, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        data = b"".join(chunks)
+    elif "content-length" in headers:
+        data = await reader.readexactly(int(headers["content-length"]))
+    else:
+        data = await reader.read()
+        headers["connection"] = "close"
+
+    keep_alive = headers.get("connection", "").lower() != "close"
+    return status, data, keep_alive
+
+
+class AsyncTholaClient(object):
+    """Minimal asyncio HTTP/1.1 client for the Thola API.
+
+    At most `concurrency` requests are in flight at the same time (or as
+    many as the given limiter allows), idle connections are kept alive and
+    reused. Has to be created inside a running event loop.
+    """
+
+    def __init__(self, api_host, concurrency=DEFAULT_CONCURRENCY, timeout=None, limiter=None):
+        url = urlsplit(api_host)
+        self.host = url.hostname
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.port = url.port or (443 if self.ssl else 80)
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.limiter = limiter or Limiter(concurrency)
+        self._idle = []
+        self._in_flight = {}
+
+    async def post(self, path, body):
+        """Posts body as JSON and returns the raw response body.
+        Raises TholaRequestError on errors and timeouts.
+
+        Identical requests that are in flight at the same time share a
+        single request to the Thola API."""
+        payload = json.dumps(body, sort_keys=True).encode("utf-8")
+        key = (path, hashlib.sha256(payload).hexdigest())
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._send(path, payload))
+            task.add_done_callback(lambda done: self._in_flight.pop(key, None))
+        # a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(task)
+
+    async def _send(self, path, payload):
+        await self.limiter.acquire()
+        start = time.monotonic()
+        overloaded = True
+        try:
+            status, data = await asyncio.wait_for(self._post(path, payload), self.timeout)
+            overloaded = status in OVERLOAD_STATUS
+        except asyncio.TimeoutError:
+            raise TholaRequestError("Request to Thola API timed out")
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            raise TholaRequestError("Can't connect to Thola API!")
+        finally:
+            self.limiter.release(time.monotonic() - start, overloaded)
+        if status >= 400:
+            raise TholaRequestError(error_message(data), status)
+        return data
+
+    async def close(self):
+        while self._idle:
+            dummy, writer = self._idle.pop()
+            writer.close()
+
+    async def _post(self, path, payload):
+        request = ("POST %s%s HTTP/1.1\r\n"
+                   "Host: %s:%d\r\n"
+                   "Content-Type: application/json\r\n"
+                   "Accept: application/json\r\n"
+                   "Content-Length: %d\r\n"
+                   "Connection: keep-alive\r\n"
+                   "\r\n" % (self.base_path, path, self.host, self.port, len(payload))).encode("latin-1") + payload
+        while True:
+            reused = bool(self._idle)
+            if reused:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, data, keep_alive = await _read_response(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    # the server closed the idle connection, try again with another one
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, data
+
+
+async def _run(api_host, operation, bodies, concurrency, timeout, limiter, callback, transform):
+    client = AsyncTholaClient(api_host, concurrency=concurrency, timeout=timeout, limiter=limiter)
+    path = OPERATIONS[operation].path
+
+    async def run_one(index, body):
+        try:
+            data = await client.post(path, body)
+            facts = finish_operation(operation, decode_response(operation, data))
+            result = True, transform(facts) if transform is not None else facts
+        except TholaRequestError as e:
+            result = False, str(e)
+        if callback is not None:
+            callback(index, *result)
+        results[index] = result
+
+    async def wait(pending):
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # raises the errors run_one doesn't handle, e.g. of the callback
+            task.result()
+        return pending
+
+    # no more requests are pending than the limiter can let through
+    window = int(getattr(client.limiter, "maximum", client.limiter.limit))
+    results = []
+    pending = set()
+    try:
+        for index, body in enumerate(bodies):
+            while len(pending) >= window:
+                pending = await wait(pending)
+            results.append(None)
+            pending.add(asyncio.ensure_future(run_one(index, serialize_request(body))))
+        while pending:
+            pending = await wait(pending)
+        return results
+    finally:
+        for task in pending:
+            task.cancel()
+        await client.close()
+
+
+def run_operations(api_host, operation, bodies, concurrency=DEFAULT_CONCURRENCY, timeout=None, limiter=None,
+                   callback=None, transform=None):
+    """Runs operation for every request body concurrently.
+
+    Returns a list of (ok, facts or error message) tuples in the order of
+    bodies. If callback is given, it is called with (index, ok, facts or
+    error message) as soon as a request completes. A limiter (e.g. an
+    AdaptiveLimiter) replaces the fixed concurrency bound. transform is
+    applied to the facts of every request as soon as it completes.
+
+    bodies can be any iterable, it is consumed only as fast as the requests
+    are sent, so a generator keeps large sweeps from building all request
+    bodies up front.
+    """
+    return asyncio.run(_run(api_host, operation, bodies, concurrency, timeout, limiter, callback, transform))
@@ -0,0 +1,88 @@
+import time
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_identify_cache import cache_key
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import COMPONENTS, build_request
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import load_state, save_state
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
+
+thola_client_found = False
+try:
+    import thola_client.rest as rest
+    import urllib3
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+DEFAULT_CAPABILITY_PATH = "~/.ansible/thola/capabilities"
+DEFAULT_CAPABILITY_TTL = 86400
+
+# The component each operation needs, operations that are missing work on
+# every device
+OPERATION_COMPONENTS = dict((operation, component) for component, operation in COMPONENTS.items())
+OPERATION_COMPONENTS.update({
+    "read_count_interfaces": "interfaces",
+    "check_cpu_load": "cpu",
+    "check_disk": "disk",
+    "check_hardware_health": "hardware_health",
+    "check_interface_metrics": "interfaces",
+    "check_memory_usage": "memory",
+    "check_sbc": "sbc",
+    "check_server": "server",
+    "check_ups": "ups",
+})
+
+
+def capability_key(request_args):
+    return cache_key(request_args["host"], request_args.get("port", 161), request_args.get("community", "public"),
+                     request_args.get("version", "2c"))
+
+
+def load_components(path, key, ttl=DEFAULT_CAPABILITY_TTL):
+    """Returns the cached available components for key or None if there is
+    no entry or the entry is older than ttl seconds."""
+    entry = load_state(path, key)
+    try:
+        if time.time() - entry["timestamp"] > ttl:
+            return None
+        return entry["components"]
+    except (KeyError, TypeError):
+        return None
+
+
+def save_components(path, key, components):
+    save_state(path, key, {"timestamp": time.time(), "components": components})
+
+
+def available_components(api_host, request_args, path, ttl=DEFAULT_CAPABILITY_TTL, worker_socket=None,
+                         check_mode=False):
+    """Returns the available components of the device from the capability
+    cache, or reads them from the Thola API and caches them if there is no
+    valid entry and not check_mode. Raises the exceptions of the generated
+    API."""
+    key = capability_key(request_args)
+    components = load_components(path, key, ttl)
+    if components is None:
+        body = build_request("read_available_components", **request_args)
+        result = forward_operation("read_available_components", api_host, body, worker_socket)
+        components = result.get("available_components") or []
+        if not check_mode:
+            save_components(path, key, components)
+    return components
+
+
+def unavailable_component(operation, api_host, request_args, path, ttl=DEFAULT_CAPABILITY_TTL, worker_socket=None,
+                          check_mode=False):
+    """Returns the component operation needs if the device doesn't have it,
+    None if it has or if that can't be determined (the request itself
+    reports the error then)."""
+    component = OPERATION_COMPONENTS.get(operation)
+    if component is None:
+        return None
+    try:
+        components = available_components(api_host, request_args, path, ttl, worker_socket, check_mode)
+    except (rest.ApiException, urllib3.exceptions.HTTPError):
+        return None
+    if component in components:
+        return None
+    return component
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+
+# has to be imported before thola_client, so that only the used parts of it are loaded
+from ansible_collections.inexio.thola.plugins.module_utils import thola_lazy  # noqa: F401
+from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import to_wire
+
+thola_client_found = False
+try:
+    import thola_client.rest as rest
+    import thola_client
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+# Every generated model creates a Configuration, and every new Configuration
+# adds another log handler to the thola_client and urllib3 loggers, so that
+# building requests gets slower and slower in long running processes. New
+# configurations are copies of the default one if it is set.
+if thola_client_found and thola_client.Configuration._default is None:
+    thola_client.Configuration.set_default(thola_client.Configuration())
+
+# Number of keep-alive connections kept per Thola API host. Can be
+# overridden with the THOLA_POOL_SIZE environment variable.
+DEFAULT_POOL_SIZE = 10
+
+_rest_clients = {}
+_clients_lock = threading.Lock()
+
+# identical requests that are in flight, see _single_flight
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def pool_size_from_env():
+    try:
+        return int(os.environ.get("THOLA_POOL_SIZE", DEFAULT_POOL_SIZE))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+def _get_rest_client(api_host, pool_size):
+    """Returns the pooled (Configuration, RESTClientObject) for api_host.
+
+    Clients are cached per process, so every request issued from the same
+    interpreter (action plugin, worker, ...) reuses the same urllib3
+    connection pool instead of opening a new connection per request.
+    """
+    if pool_size is None:
+        pool_size = pool_size_from_env()
+    key = (api_host, pool_size)
+    with _clients_lock:
+        entry = _rest_clients.get(key)
+        if entry is None:
+            configuration = thola_client.Configuration()
+            configuration.host = api_host
+            configuration.connection_pool_maxsize = pool_size
+            entry = _rest_clients[key] = (configuration, rest.RESTClientObject(configuration))
+    return entry
+
+
+def _post(api_host, path, payload, pool_size, preload_content):
+    # the requests don't need the ApiClient, so its module isn't even imported
+    configuration, rest_client = _get_rest_client(api_host, pool_size)
+    response = rest_client.pool_manager.request(
+        "POST",
+        configuration.host + path,
+        body=payload,
+        headers={"Content-Type": "application/json", "Accept": "application/json", "Connection": "keep-alive"},
+        preload_content=preload_content,
+    )
+    if response.status >= 400:
+        raise rest.ApiException(http_resp=rest.RESTResponse(response))
+    return response
+
+
+def post(api_host, path, body, pool_size=None):
+    """POSTs body to path over the pooled connections and returns the
+    undecoded response body.
+
+    Identical requests that are issued concurrently from several threads
+    (e.g. by the worker) share a single request to the Thola API.
+
+    Raises the same exceptions as the generated API methods.
+    """
+    payload = json.dumps(to_wire(body), sort_keys=True)
+    key = (api_host, path, hashlib.sha256(payload.encode("utf-8")).hexdigest())
+    return _single_flight(key, lambda: _post(api_host, path, payload, pool_size, True).data)
+
+
+def post_json(api_host, path, body, pool_size=None):
+    """Like post, but returns the decoded JSON response as is, without
+    building the generated models."""
+    return json.loads(post(api_host, path, body, pool_size))
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+        self.error = None
+
+
+def _single_flight(key, fetch):
+    """Calls fetch and returns its result, unless a call with the same key
+    is in flight already. Then it waits for that call and returns (or
+    raises) its result instead."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.data
+    try:
+        flight.data = fetch()
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.data
+
+
+def open_request(api_host, path, body, pool_size=None):
+    """Like post_json, but returns the urllib3 response without reading its
+    content, so the caller can consume it with response.stream(). The caller
+    has to call response.release_conn() afterwards.
+    """
+    return _post(api_host, path, json.dumps(to_wire(body)), pool_size, False)
+
+
+def clear():
+    with _clients_lock:
+        for configuration, rest_client in _rest_clients.values():
+            rest_client.pool_manager.clear()
+        _rest_clients.clear()
@@ -0,0 +1,108 @@
+_key_tables = {}
+
+
+def _shared_keys(keys):
+    # tables with the same fields share one key tuple
+    keys = tuple(keys)
+    return _key_tables.setdefault(keys, keys)
+
+
+class ColumnTable(object):
+    """Column wise representation of a list of dicts.
+
+    keys holds the field names once, columns one list of values per key,
+    or None if the field is None in all rows.
+    Columns of nested dicts (e.g. ethernet_like) are stored as nested
+    tables, the rows where they are None are recorded in nulls. Fields that
+    are missing in some rows (as opposed to being None) are recorded in
+    absent as row numbers per key, so to_rows() gives back exactly the rows
+    the table was built from.
+    """
+
+    __slots__ = ("keys", "columns", "count", "absent", "nulls")
+
+    def __init__(self, keys, columns, count, absent=None, nulls=None):
+        self.keys = _shared_keys(keys)
+        self.columns = columns
+        self.count = count
+        self.absent = absent or {}
+        self.nulls = nulls or {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        keys = []
+        positions = {}
+        columns = []
+        absent = {}
+        for number, row in enumerate(rows):
+            for key, value in row.items():
+                position = positions.get(key)
+                if position is None:
+                    position = positions[key] = len(keys)
+                    keys.append(key)
+                    # the key was missing in all rows so far
+                    columns.append([None] * number)
+                    if number:
+                        absent[key] = list(range(number))
+                columns[position].append(value)
+            if len(row) != len(keys):
+                for key, column in zip(keys, columns):
+                    if len(column) == number:
+                        column.append(None)
+                        absent.setdefault(key, []).append(number)
+
+        nulls = {}
+        for position, column in enumerate(columns):
+            if column.count(None) == len(column):
+                columns[position] = None
+            elif any(type(value) is dict for value in column) and \
+                    all(value is None or type(value) is dict for value in column):
+                numbers = [number for number, value in enumerate(column) if value is None]
+                if numbers:
+                    nulls[keys[position]] = numbers
+                columns[position] = cls.from_rows([value if value is not None else {} for value in column])
+        return cls(keys, columns, len(rows), absent, nulls)
+
+    @classmethod
+    def from_dict(cls, table):
+        columns = [cls.from_dict(column) if isinstance(column, dict) else column for column in table["columns"]]
+        return cls(table["keys"], columns, table["count"], table.get("absent"), table.get("nulls"))
+
+    def to_dict(self):
+        columns = [column.to_dict() if isinstance(column, ColumnTable) else column for column in self.columns]
+        table = {"keys": list(self.keys), "columns": columns, "count": self.count}
+        if self.absent:
+            table["absent"] = self.absent
+        if self.nulls:
+            table["nulls"] = self.nulls
+        return table
+
+    def to_rows(self):
+        columns = []
+        for column in self.columns:
+            if column is None:
+                column = [None] * self.count
+            elif isinstance(column, ColumnTable):
+                column = column.to_rows()
+            columns.append(column)
+        for key, numbers in self.nulls.items():
+            column = columns[self.keys.index(key)]
+            for number in numbers:
+                column[number] = None
+        rows = [dict(zip(self.keys, values)) for values in zip(*columns)] if self.keys else \
+            [{} for dummy in range(self.count)]
+        for key, numbers in self.absent.items():
+            for number in numbers:
+                del rows[number][key]
+        return rows
+
+
+def to_columns(rows):
+    """Converts a list of dicts to the JSON serializable columnar form."""
+    return ColumnTable.from_rows(rows).to_dict()
+
+
+def to_rows(table):
+    """Converts the columnar form created by to_columns back to the list of
+    dicts it was created from."""
+    return ColumnTable.from_dict(table).to_rows()
@@ -0,0 +1,96 @@
+import time
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_identify_cache import cache_key
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    TholaRequestError,
+    as_list,
+    build_request,
+    error_message,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import load_state, save_state
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
+
+thola_client_found = False
+try:
+    import thola_client.rest as rest
+    import urllib3
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+DEFAULT_CREDENTIAL_PATH = "~/.ansible/thola/snmp_credentials"
+DEFAULT_CREDENTIAL_TTL = 86400
+
+
+def normalize_credentials(community, version, port):
+    """Returns community, version and port, each a single value or a list,
+    as lists of strings and ints. Raises TholaRequestError on invalid
+    ports."""
+    try:
+        ports = [int(p) for p in as_list(port)]
+    except (TypeError, ValueError):
+        raise TholaRequestError("Invalid port " + str(port))
+    return [str(c) for c in as_list(community)], [str(v) for v in as_list(version)], ports
+
+
+def credentials_key(host, communities, versions, ports):
+    return cache_key(host, ports, communities, versions)
+
+
+def load_credentials(path, key, ttl=DEFAULT_CREDENTIAL_TTL):
+    """Returns the cached working (community, version, port) for key or
+    None if there is no entry or the entry is older than ttl seconds."""
+    entry = load_state(path, key)
+    try:
+        if time.time() - entry["timestamp"] > ttl:
+            return None
+        return entry["community"], entry["version"], entry["port"]
+    except (KeyError, TypeError):
+        return None
+
+
+def save_credentials(path, key, credentials):
+    community, version, port = credentials
+    save_state(path, key, {"timestamp": time.time(), "community": community, "version": version, "port": port})
+
+
+def successful_credentials(result_dict):
+    """Returns the (community, version, port) a check_snmp result reports
+    as working or None."""
+    credentials = result_dict.get("successful_snmp_credentials") or {}
+    if credentials.get("community") is None or credentials.get("version") is None or credentials.get("port") is None:
+        return None
+    return credentials["community"], credentials["version"], credentials["port"]
+
+
+def snmp_credentials(api_host, host, community, version, port, path, ttl=DEFAULT_CREDENTIAL_TTL, worker_socket=None,
+                     check_mode=False, **discover_args):
+    """Returns the (community, version, port) to read host with. community,
+    version and port can be lists, if they make up more than one
+    combination, Thola tries all of them in parallel with check_snmp and the
+    working one is cached for ttl seconds, unless check_mode, so that later
+    requests send only that one.
+
+    Raises TholaRequestError if the check fails or none of the combinations
+    works."""
+    communities, versions, ports = normalize_credentials(community, version, port)
+    if len(communities) * len(versions) * len(ports) == 1:
+        return communities[0], versions[0], ports[0]
+    key = credentials_key(host, communities, versions, ports)
+    credentials = load_credentials(path, key, ttl)
+    if credentials is not None:
+        return credentials
+    body = build_request("check_snmp", host, communities, versions, ports, **discover_args)
+    try:
+        result = forward_operation("check_snmp", api_host, body, worker_socket)
+    except rest.ApiException as e:
+        raise TholaRequestError(error_message(e.body), e.status)
+    except urllib3.exceptions.MaxRetryError:
+        raise TholaRequestError("Can't connect to Thola API!")
+    credentials = successful_credentials(result)
+    if credentials is None:
+        raise TholaRequestError("None of the SNMP credentials work for " + str(host))
+    if not check_mode:
+        save_credentials(path, key, credentials)
+    return credentials
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import math
+import time
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import as_list
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import load_state, save_state
+
+DEFAULT_HISTORY_PATH = "~/.ansible/thola/discovery_history"
+DEFAULT_DISCOVER_TIMEOUT = 2
+DEFAULT_DISCOVER_PARALLEL_REQUEST = 5
+MAX_DISCOVER_TIMEOUT = 30
+MAX_DISCOVER_PARALLEL_REQUEST = 20
+LATENCIES = 10
+
+
+def history_key(host, port):
+    """port is the configured port, a single one or a list of the ports the
+    SNMP credentials are tried with."""
+    try:
+        ports = [int(p) for p in as_list(port)]
+    except (TypeError, ValueError):
+        ports = as_list(port)
+    if len(ports) == 1:
+        ports = ports[0]
+    return hashlib.sha256(json.dumps([host, ports]).encode("utf-8")).hexdigest()
+
+
+def is_device_failure(status):
+    """Returns whether an error status of the Thola API means that Thola
+    could not get an answer from the device, rather than an invalid
+    request."""
+    return status is None or status >= 500 or status == 408
+
+
+class DiscoveryHistory(object):
+    """Discovery settings of a device, adapted to how it behaved in the
+    previous requests.
+
+    After a request the device didn't answer, discover_timeout is doubled
+    and discover_parallel_request halved. Every successful request raises
+    discover_parallel_request by one and lowers discover_timeout by one
+    second, but not below twice the slowest of the last requests.
+    """
+
+    def __init__(self, path, host, port):
+        self.path = path
+        self.key = history_key(host, port)
+        state = load_state(path, self.key)
+        if not isinstance(state, dict):
+            state = {}
+        self.discover_timeout = state.get("discover_timeout", DEFAULT_DISCOVER_TIMEOUT)
+        self.discover_parallel_request = state.get("discover_parallel_request", DEFAULT_DISCOVER_PARALLEL_REQUEST)
+        self.latencies = state.get("latencies", [])
+        self.failures = state.get("failures", 0)
+
+    def record(self, discover_timeout, discover_parallel_request, seconds=None, status=None):
+        """Records a request sent with the given settings, that took
+        seconds or failed with the Thola API error status, and saves the
+        settings recommended for the next request."""
+        if seconds is None:
+            if not is_device_failure(status):
+                return
+            self.failures += 1
+            self.discover_timeout = min(MAX_DISCOVER_TIMEOUT, discover_timeout * 2)
+            self.discover_parallel_request = max(1, discover_parallel_request // 2)
+        else:
+            self.failures = 0
+            self.latencies = (self.latencies + [round(seconds, 3)])[-LATENCIES:]
+            floor = max(1, int(math.ceil(2 * max(self.latencies))))
+            self.discover_timeout = min(discover_timeout, max(floor, discover_timeout - 1))
+            self.discover_parallel_request = min(MAX_DISCOVER_PARALLEL_REQUEST, discover_parallel_request + 1)
+        save_state(self.path, self.key, {
+            "timestamp": time.time(),
+            "discover_timeout": self.discover_timeout,
+            "discover_parallel_request": self.discover_parallel_request,
+            "latencies": self.latencies,
+            "failures": self.failures,
+        })
@@ -0,0 +1,36 @@
+import hashlib
+import json
+import time
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import delete_state, load_state, save_state
+
+DEFAULT_CACHE_PATH = "~/.ansible/thola/identify_cache"
+DEFAULT_CACHE_TTL = 86400
+
+
+def cache_key(host, port, community, version):
+    # the community is hashed so that it does not end up in the cache in plain text
+    community_hash = hashlib.sha256(str(community).encode("utf-8")).hexdigest()
+    key = json.dumps([host, port, community_hash, version])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_cached_facts(cache_path, key, ttl=DEFAULT_CACHE_TTL):
+    """Returns the cached facts for key or None if there is no entry or
+    the entry is older than ttl seconds."""
+    entry = load_state(cache_path, key)
+    try:
+        if time.time() - entry["timestamp"] > ttl:
+            return None
+        return entry["facts"]
+    except (KeyError, TypeError):
+        return None
+
+
+def cache_facts(cache_path, key, facts):
+    # a cache that can't be written must not fail the identify
+    save_state(cache_path, key, {"timestamp": time.time(), "facts": facts})
+
+
+def invalidate_cached_facts(cache_path, key):
+    delete_state(cache_path, key)
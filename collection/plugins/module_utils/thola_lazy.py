@@ -0,0 +1,68 @@
+import importlib
+import importlib.machinery
+import importlib.util
+import os
+import re
+import sys
+import types
+
+# Names exported by a generated package __init__, e.g.
+# "from thola_client.models.read_ups_request import ReadUPSRequest"
+_EXPORT = re.compile(r"^from\s+(thola_client[\w.]*)\s+import\s+(\w+)\s*$", re.MULTILINE)
+
+# thola_client and its subpackages whose __init__ imports every generated class
+LAZY_PACKAGES = ("thola_client", "thola_client.api", "thola_client.models")
+
+
+def _lazy_package(name, directory):
+    with open(os.path.join(directory, "__init__.py")) as f:
+        exports = dict((attr, source) for source, attr in _EXPORT.findall(f.read()))
+
+    package = types.ModuleType(name)
+    package.__file__ = os.path.join(directory, "__init__.py")
+    package.__path__ = [directory]
+    package.__package__ = name
+    package.__spec__ = importlib.machinery.ModuleSpec(name, None, is_package=True)
+    package.__spec__.submodule_search_locations = [directory]
+
+    def __getattr__(attr):
+        source = exports.get(attr)
+        if source is None:
+            raise AttributeError("module " + name + " has no attribute " + attr)
+        value = getattr(importlib.import_module(source), attr)
+        setattr(package, attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(package.__dict__) | set(exports))
+
+    package.__getattr__ = __getattr__
+    package.__dir__ = __dir__
+    return package
+
+
+def install():
+    """Replaces the thola_client packages by lazy ones, so that importing
+    thola_client (or one of its API modules) only loads the generated
+    classes that are actually used instead of all of them.
+
+    Does nothing if thola_client has been imported already or is not
+    installed. Returns whether thola_client can be imported.
+    """
+    if "thola_client" in sys.modules:
+        return True
+    spec = importlib.util.find_spec("thola_client")
+    if spec is None or not spec.submodule_search_locations:
+        return False
+    root = list(spec.submodule_search_locations)[0]
+    for name in LAZY_PACKAGES:
+        directory = os.path.join(root, *name.split(".")[1:])
+        package = _lazy_package(name, directory)
+        sys.modules[name] = package
+        if "." in name:
+            parent, dummy, child = name.rpartition(".")
+            setattr(sys.modules[parent], child, package)
+    return True
+
+
+thola_client_found = install()
@@ -0,0 +1,216 @@
+import collections
+import ipaddress
+import json
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_client_pool import post
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import build_wire, from_wire, to_wire
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import mark
+
+thola_client_found = False
+try:
+    import thola_client.rest  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+Operation = collections.namedtuple("Operation", ["api", "method", "request", "response", "path"])
+
+OPERATIONS = {
+    "identify": Operation("identify", "identify", "IdentifyRequest",
+                          "IdentifyResponse", "/identify"),
+    "read_available_components": Operation("read", "read_available_components", "ReadAvailableComponentsRequest",
+                                           "ReadAvailableComponentsResponse", "/read/available-components"),
+    "read_count_interfaces": Operation("read", "read_count_interfaces", "ReadCountInterfacesRequest",
+                                       "ReadCountInterfacesResponse", "/read/count-interfaces"),
+    "read_cpu_load": Operation("read", "read_cpu_load", "ReadCPULoadRequest",
+                               "ReadCPULoadResponse", "/read/cpu-load"),
+    "read_disk": Operation("read", "read_disk", "ReadDiskRequest",
+                           "ReadDiskResponse", "/read/disk"),
+    "read_hardware_health": Operation("read", "hardware_health", "ReadHardwareHealthRequest",
+                                      "ReadHardwareHealthResponse", "/read/hardware-health"),
+    "read_interfaces": Operation("read", "read_interfaces", "ReadInterfacesRequest",
+                                 "ReadInterfacesResponse", "/read/interfaces"),
+    "read_memory_usage": Operation("read", "read_memory_usage", "ReadMemoryUsageRequest",
+                                   "ReadMemoryUsageResponse", "/read/memory-usage"),
+    "read_sbc": Operation("read", "read_sbc", "ReadSBCRequest",
+                          "ReadSBCResponse", "/read/sbc"),
+    "read_server": Operation("read", "read_server", "ReadServerRequest",
+                             "ReadServerResponse", "/read/server"),
+    "read_ups": Operation("read", "read_ups", "ReadUPSRequest",
+                          "ReadUPSResponse", "/read/ups"),
+    "check_cpu_load": Operation("check", "check_cpu_load", "CheckCPULoadRequest",
+                                "CheckResponse", "/check/cpu-load"),
+    "check_disk": Operation("check", "check_disk", "CheckDiskRequest",
+                            "CheckResponse", "/check/disk"),
+    "check_hardware_health": Operation("check", "check_hardware_health", "CheckHardwareHealthRequest",
+                                       "CheckResponse", "/check/hardware-health"),
+    "check_identify": Operation("check", "check_identify", "CheckIdentifyRequest",
+                                "CheckIdentifyResponse", "/check/identify"),
+    "check_interface_metrics": Operation("check", "check_interface_metrics", "CheckInterfaceMetricsRequest",
+                                         "CheckResponse", "/check/interface-metrics"),
+    "check_memory_usage": Operation("check", "check_memory_usage", "CheckMemoryUsageRequest",
+                                    "CheckResponse", "/check/memory-usage"),
+    "check_sbc": Operation("check", "check_sbc", "CheckSBCRequest",
+                           "CheckResponse", "/check/sbc"),
+    "check_server": Operation("check", "check_server", "CheckServerRequest",
+                              "CheckResponse", "/check/server"),
+    "check_snmp": Operation("check", "check_snmp", "CheckSNMPRequest",
+                            "CheckSNMPResponse", "/check/snmp"),
+    "check_ups": Operation("check", "check_ups", "CheckUPSRequest",
+                           "CheckResponse", "/check/ups"),
+}
+
+# Components as reported by read_available_components and the operation
+# that reads each of them
+COMPONENTS = {
+    "cpu": "read_cpu_load",
+    "disk": "read_disk",
+    "hardware_health": "read_hardware_health",
+    "interfaces": "read_interfaces",
+    "memory": "read_memory_usage",
+    "sbc": "read_sbc",
+    "server": "read_server",
+    "ups": "read_ups",
+}
+
+
+class TholaRequestError(Exception):
+    def __init__(self, message, status=None):
+        super(TholaRequestError, self).__init__(message)
+        # HTTP status of the API response, None if no response was received
+        self.status = status
+
+
+def change_property_names(properties):
+    properties["ansible_net_model"] = properties["model"]
+    del properties["model"]
+    properties["ansible_net_version"] = properties["os_version"]
+    del properties["os_version"]
+    properties["ansible_net_serialnum"] = properties["serial_number"]
+    del properties["serial_number"]
+    properties["ansible_net_vendor"] = properties["vendor"]
+    del properties["vendor"]
+    properties["ansible_net_model_series"] = properties["model_series"]
+    del properties["model_series"]
+    return properties
+
+
+def identify_facts(result_dict):
+    result_dict["ansible_net_system"] = result_dict["_class"]
+    result_dict["ansible_net_os"] = result_dict["_class"]
+    del result_dict["_class"]
+    properties = result_dict["properties"]
+    del result_dict["properties"]
+    result_dict.update(change_property_names(properties))
+    return result_dict
+
+
+# the most addresses CIDR ranges are expanded to
+DEFAULT_MAX_ADDRESSES = 65536
+
+
+def as_list(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def build_request(operation, host, community="public", version="2c", port=161, discover_parallel_request=5,
+                  discover_retries=0, discover_timeout=2, extra=None):
+    """Builds the request body of operation as the plain JSON structure of
+    the API, without the generated models. community, version and port can
+    also be lists of values Thola tries. extra holds further fields of the
+    request by their Python names, nested models as dicts.
+
+    Raises TholaRequestError for unknown fields."""
+    values = dict(extra or {})
+    values["device_data"] = {
+        "ip_address": host,
+        "connection_data": {
+            "snmp": {
+                "communities": as_list(community),
+                "versions": as_list(version),
+                "ports": as_list(port),
+                "discover_retries": discover_retries,
+                "discover_timeout": discover_timeout,
+                "discover_parallel_requests": discover_parallel_request,
+            }
+        }
+    }
+    try:
+        return build_wire(OPERATIONS[operation].request, values)
+    except ValueError as e:
+        raise TholaRequestError(str(e))
+
+
+def error_message(body):
+    try:
+        return json.loads(body)["message"]
+    except (ValueError, TypeError, KeyError):
+        return str(body)
+
+
+def serialize_request(body):
+    return to_wire(body)
+
+
+def decode_response(operation, data):
+    try:
+        return from_wire(json.loads(data), OPERATIONS[operation].response)
+    except ValueError:
+        raise TholaRequestError("Invalid response from Thola API")
+
+
+def raw_operation(operation, api_host, body, pool_size=None, timings=None):
+    """Issues a single request over the pooled client and returns the
+    response as the dict the generated API would return from to_dict(),
+    without the model round trip. Raises the exceptions of the generated
+    API (rest.ApiException, urllib3.exceptions.MaxRetryError).
+
+    If timings is given, the request and decode stages are marked on it."""
+    data = post(api_host, OPERATIONS[operation].path, body, pool_size)
+    mark(timings, "request")
+    result = from_wire(json.loads(data), OPERATIONS[operation].response)
+    mark(timings, "decode")
+    return result
+
+
+def finish_operation(operation, result_dict):
+    if operation == "identify":
+        result_dict = identify_facts(result_dict)
+    elif operation == "check_identify":
+        result_dict["identify_result"] = identify_facts(result_dict["identify_result"])
+    return change_quotation_marks(result_dict)
+
+
+def expand_targets(entries, max_addresses=DEFAULT_MAX_ADDRESSES):
+    """Expands a list of IPs, hostnames and CIDR ranges to single targets,
+    keeping the order and dropping duplicates. Raises ValueError for
+    invalid ranges and if the entries make up more than max_addresses
+    addresses."""
+    targets = []
+    seen = set()
+    count = 0
+    for entry in entries:
+        entry = str(entry).strip()
+        if "/" in entry:
+            network = ipaddress.ip_network(entry, strict=False)
+            if network.num_addresses == 1:
+                addresses = [network.network_address]
+            else:
+                addresses = network.hosts()
+            # checked before anything is expanded, an IPv6 /64 would never finish
+            count += network.num_addresses
+        else:
+            addresses = [entry]
+            count += 1
+        if count > max_addresses:
+            raise ValueError("%s exceeds the limit of %d addresses" % (entry, max_addresses))
+        candidates = [str(address) for address in addresses]
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                targets.append(candidate)
+    return targets
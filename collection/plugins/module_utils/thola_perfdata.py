@@ -0,0 +1,71 @@
+import re
+
+# One performance data item, 'label'=value[unit];[warn];[crit];[min];[max].
+# Quoted labels can contain spaces and '' for a single quote.
+PERFDATA_ITEM = re.compile(r"('(?:[^']|'')*'|[^'\s=][^\s=]*)=(\S*)")
+VALUE = re.compile(r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(.*)")
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?\Z")
+
+
+def _number(text):
+    """Returns text as int or float, None if it is empty or no number."""
+    if not text or not NUMBER.match(text):
+        return None
+    if text.lstrip("+-").isdigit():
+        return int(text)
+    return float(text)
+
+
+def _threshold(text):
+    # a plain number is an upper bound, ranges like 10:20 or @10:20 are
+    # returned as they are
+    if not text:
+        return None
+    number = _number(text)
+    return text if number is None else number
+
+
+def split_output(raw_output):
+    """Splits the output of a check in the plugin output format into its
+    text and its performance data. The performance data follows the first
+    | of the first line and the first | of the long text."""
+    lines = raw_output.split("\n", 1)
+    text, _, perfdata = lines[0].partition("|")
+    text = text.rstrip()
+    if len(lines) > 1:
+        long_text, _, long_perfdata = lines[1].partition("|")
+        if long_text.strip():
+            text += "\n" + long_text.rstrip()
+        perfdata += " " + long_perfdata
+    return text, perfdata
+
+
+def parse_perfdata(perfdata):
+    """Parses performance data into a list of metrics with their label,
+    value, unit, warn, crit, min and max. Values are numbers, value is None
+    for unknown values (U), thresholds that are ranges are kept as strings."""
+    metrics = []
+    for match in PERFDATA_ITEM.finditer(perfdata):
+        label = match.group(1)
+        if label.startswith("'"):
+            label = label[1:-1].replace("''", "'")
+        fields = match.group(2).split(";")
+        fields += [""] * (5 - len(fields))
+        value = VALUE.match(fields[0])
+        metrics.append({
+            "label": label,
+            "value": _number(value.group(1)) if value else None,
+            "unit": value.group(2) if value else "",
+            "warn": _threshold(fields[1]),
+            "crit": _threshold(fields[2]),
+            "min": _number(fields[3]),
+            "max": _number(fields[4]),
+        })
+    return metrics
+
+
+def parse_output(raw_output):
+    """Returns the text of the output of a check as output and its parsed
+    performance data as perfdata."""
+    text, perfdata = split_output(raw_output or "")
+    return {"output": text, "perfdata": parse_perfdata(perfdata)}
@@ -0,0 +1,140 @@
+import hashlib
+import json
+
+numpy_found = False
+try:
+    import numpy
+
+    numpy_found = True
+except ImportError:
+    pass
+
+DEFAULT_COUNTERS_PATH = "~/.ansible/thola/interface_counters"
+
+# Interface counters rates are computed for, with their width in bits.
+# 32 bit counters that decrease are taken as wrapped, 64 bit counters
+# practically never wrap, a decrease means the counter was reset.
+COUNTERS = (
+    ("if_hc_in_octets", 64),
+    ("if_hc_out_octets", 64),
+    ("if_hc_in_ucast_pkts", 64),
+    ("if_hc_out_ucast_pkts", 64),
+    ("if_in_octets", 32),
+    ("if_out_octets", 32),
+    ("if_in_ucast_pkts", 32),
+    ("if_out_ucast_pkts", 32),
+    ("if_in_errors", 32),
+    ("if_out_errors", 32),
+    ("if_in_discards", 32),
+    ("if_out_discards", 32),
+)
+
+
+def counters_key(host, port, if_name_filter=None, if_type_filter=None):
+    # counters read with different filters cover different interfaces
+    return hashlib.sha256(json.dumps([host, port, if_name_filter, if_type_filter]).encode("utf-8")).hexdigest()
+
+
+def counter_columns(interfaces, timestamp):
+    """Collects the counters of interfaces column wise, in a form that can
+    be stored as JSON and passed to compute_rates later."""
+    columns = dict((name, []) for name, bits in COUNTERS)
+    indexes = []
+    for interface in interfaces:
+        indexes.append(str(interface.get("if_index")))
+        for name, column in columns.items():
+            column.append(interface.get(name))
+    return {"timestamp": timestamp, "if_index": indexes, "counters": columns}
+
+
+def _numpy_column(column):
+    values = numpy.array(column, dtype=object)
+    valid = numpy.not_equal(values, None)
+    values[~valid] = 0
+    return values.astype(numpy.uint64), valid
+
+
+def _rates_numpy(previous, current, positions, bits, elapsed):
+    current_values, current_valid = _numpy_column(current)
+    previous_values, previous_valid = _numpy_column(previous)
+
+    known = positions >= 0
+    gather = numpy.where(known, positions, 0)
+    previous_values = previous_values[gather]
+    previous_valid = previous_valid[gather] & known
+
+    # unsigned subtraction wraps around modulo 2^64
+    delta = current_values - previous_values
+    if bits == 32:
+        delta &= numpy.uint64(0xFFFFFFFF)
+        valid = current_valid & previous_valid
+    else:
+        valid = current_valid & previous_valid & (current_values >= previous_values)
+    rates = (delta.astype(numpy.float64) / elapsed).astype(object)
+    rates[~valid] = None
+    return rates.tolist()
+
+
+def _rates_python(previous, current, positions, bits, elapsed):
+    modulus = 1 << bits
+    rates = []
+    for value, position in zip(current, positions):
+        old = previous[position] if position >= 0 else None
+        if value is None or old is None or (bits == 64 and value < old):
+            rates.append(None)
+        else:
+            rates.append(((value - old) % modulus) / elapsed)
+    return rates
+
+
+def compute_rates(previous, current):
+    """Computes the per second rates of all counters between two
+    counter_columns results.
+
+    Returns a dict of counter name to list of rates in the interface order
+    of current. A rate is None if the interface or counter is missing in
+    one of the polls or the counter was reset.
+    """
+    elapsed = current["timestamp"] - previous["timestamp"]
+    count = len(current["if_index"])
+    if elapsed <= 0:
+        return dict((name, [None] * count) for name, bits in COUNTERS)
+
+    position = dict((index, i) for i, index in enumerate(previous["if_index"]))
+    positions = [position.get(index, -1) for index in current["if_index"]]
+    if numpy_found:
+        positions = numpy.array(positions, dtype=numpy.int64)
+        rates_function = _rates_numpy
+    else:
+        rates_function = _rates_python
+
+    rates = {}
+    for name, bits in COUNTERS:
+        current_column = current["counters"][name]
+        previous_column = previous["counters"].get(name)
+        if (not previous_column or previous_column.count(None) == len(previous_column)
+                or current_column.count(None) == count):
+            # counter not supported by the device
+            rates[name] = [None] * count
+        else:
+            rates[name] = rates_function(previous_column, current_column, positions, bits, elapsed)
+    return rates
+
+
+def interface_rates(previous, current):
+    """Returns the rates between two counter_columns results as list of
+    dicts with if_index, in_bps, out_bps and the rate of every counter that
+    could be computed."""
+    rates = compute_rates(previous, current)
+    columns = [(name, rates[name]) for name, bits in COUNTERS]
+    result = []
+    for i, index in enumerate(current["if_index"]):
+        row = {"if_index": int(index) if index.isdigit() else index}
+        for name, column in columns:
+            if column[i] is not None:
+                row[name] = column[i]
+        for direction in ("in", "out"):
+            octets = row.get("if_hc_" + direction + "_octets", row.get("if_" + direction + "_octets"))
+            row[direction + "_bps"] = octets * 8 if octets is not None else None
+        result.append(row)
+    return result
@@ -0,0 +1,28 @@
+def change_quotation_marks(obj):
+    """Replaces every double quote in the strings of obj with a single quote.
+
+    Dicts and lists are walked iteratively with an explicit stack and
+    changed in place, only strings that actually contain a double quote
+    are rewritten. Returns obj (or the changed string if obj is a string),
+    other values are returned unchanged.
+    """
+    if isinstance(obj, str):
+        return obj.replace("\"", "'") if "\"" in obj else obj
+    if not isinstance(obj, (dict, list)):
+        return obj
+    stack = [obj]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        container = pop()
+        if isinstance(container, dict):
+            items = container.items()
+        else:
+            items = enumerate(container)
+        for key, value in items:
+            if isinstance(value, str):
+                if "\"" in value:
+                    container[key] = value.replace("\"", "'")
+            elif isinstance(value, (dict, list)):
+                push(value)
+    return obj
@@ -0,0 +1,564 @@
+# Fields of the Thola API models as (python name, JSON key, kind, model)
+# tuples, generated from the thola-client models. kind is "model", "list"
+# or "dict" if the field contains models of the given type, None for plain
+# values.
+MODELS = {
+    "BaseRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "CPUComponent": (
+        ("load", "load", None, None),
+        ("temperature", "temperature", None, None),
+    ),
+    "CheckCPULoadRequest": (
+        ("cpu_load_thresholds", "cpuLoadThresholds", "model", "Thresholds"),
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckDeviceRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckDiskRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("disk_thresholds", "diskThresholds", "model", "Thresholds"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckHardwareHealthRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckIdentifyRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("expectations", "expectations", "model", "Device"),
+        ("json_metrics", "json_metrics", None, None),
+        ("model_diff_warning", "model_diff_warning", None, None),
+        ("model_series_diff_warning", "model_series_diff_warning", None, None),
+        ("os_diff_warning", "os_diff_warning", None, None),
+        ("os_version_diff_warning", "os_version_diff_warning", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("serial_number_diff_warning", "serial_number_diff_warning", None, None),
+        ("timeout", "timeout", None, None),
+        ("vendor_diff_warning", "vendor_diff_warning", None, None),
+    ),
+    "CheckIdentifyResponse": (
+        ("failed_expectations", "failed_expectations", "dict", "IdentifyExpectationResult"),
+        ("identify_result", "identify_result", "model", "Device"),
+        ("messages", "messages", "list", "OutputMessage"),
+        ("performance_data", "performance_data", "list", "PerformanceDataPoint"),
+        ("raw_output", "raw_output", None, None),
+        ("status_code", "status_code", None, None),
+    ),
+    "CheckInterfaceMetricsRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("if_name_filter", "ifName_filter", None, None),
+        ("if_type_filter", "ifType_filter", None, None),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_interfaces", "print_interfaces", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckMemoryUsageRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("memory_usage_thresholds", "memoryUsageThresholds", "model", "Thresholds"),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckRequest": (
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+    ),
+    "CheckResponse": (
+        ("messages", "messages", "list", "OutputMessage"),
+        ("performance_data", "performance_data", "list", "PerformanceDataPoint"),
+        ("raw_output", "raw_output", None, None),
+        ("status_code", "status_code", None, None),
+    ),
+    "CheckSBCRequest": (
+        ("system_health_score_thresholds", "SystemHealthScoreThresholds", "model", "Thresholds"),
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckSNMPRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckSNMPResponse": (
+        ("messages", "messages", "list", "OutputMessage"),
+        ("performance_data", "performance_data", "list", "PerformanceDataPoint"),
+        ("raw_output", "raw_output", None, None),
+        ("status_code", "status_code", None, None),
+        ("successful_snmp_credentials", "successful_snmp_credentials", "model", "SNMPCredentials"),
+    ),
+    "CheckServerRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("procs_threshold", "procsThreshold", "model", "Thresholds"),
+        ("timeout", "timeout", None, None),
+        ("users_threshold", "usersThreshold", "model", "Thresholds"),
+    ),
+    "CheckTholaServerRequest": (
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("timeout", "timeout", None, None),
+    ),
+    "CheckUPSRequest": (
+        ("battery_current_thresholds", "batteryCurrentThresholds", "model", "Thresholds"),
+        ("battery_temperature_thresholds", "batteryTemperatureThresholds", "model", "Thresholds"),
+        ("current_load_thresholds", "currentLoadThresholds", "model", "Thresholds"),
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("json_metrics", "json_metrics", None, None),
+        ("print_performance_data", "print_performance_data", None, None),
+        ("rectifier_current_thresholds", "rectifierCurrentThresholds", "model", "Thresholds"),
+        ("system_voltage_thresholds", "systemVoltageThresholds", "model", "Thresholds"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ConnectionData": (
+        ("http", "http", "model", "HTTPConnectionData"),
+        ("snmp", "snmp", "model", "SNMPConnectionData"),
+    ),
+    "DWDMInterface": (
+        ("channels", "channels", "list", "OpticalChannel"),
+        ("corrected_fec", "corrected_fec", "list", "Rate"),
+        ("rx_power", "rx_power", None, None),
+        ("tx_power", "tx_power", None, None),
+        ("uncorrected_fec", "uncorrected_fec", "list", "Rate"),
+    ),
+    "Device": (
+        ("_class", "class", None, None),
+        ("properties", "properties", "model", "Properties"),
+    ),
+    "DeviceData": (
+        ("connection_data", "connection_data", "model", "ConnectionData"),
+        ("ip_address", "ip_address", None, None),
+    ),
+    "DiskComponent": (
+        ("storages", "storages", "list", "DiskComponentStorage"),
+    ),
+    "DiskComponentStorage": (
+        ("available", "available", None, None),
+        ("description", "description", None, None),
+        ("type", "type", None, None),
+        ("used", "used", None, None),
+    ),
+    "EthernetLikeInterface": (
+        ("dot3_hc_stats_fcs_errors", "dot3HCStatsFCSErrors", None, None),
+        ("dot3_stats_alignment_errors", "dot3StatsAlignmentErrors", None, None),
+        ("dot3_stats_carrier_sense_errors", "dot3StatsCarrierSenseErrors", None, None),
+        ("dot3_stats_deferred_transmissions", "dot3StatsDeferredTransmissions", None, None),
+        ("dot3_stats_excessive_collisions", "dot3StatsExcessiveCollisions", None, None),
+        ("dot3_stats_fcs_errors", "dot3StatsFCSErrors", None, None),
+        ("dot3_stats_frame_too_longs", "dot3StatsFrameTooLongs", None, None),
+        ("dot3_stats_internal_mac_receive_errors", "dot3StatsInternalMacReceiveErrors", None, None),
+        ("dot3_stats_internal_mac_transmit_errors", "dot3StatsInternalMacTransmitErrors", None, None),
+        ("dot3_stats_late_collisions", "dot3StatsLateCollisions", None, None),
+        ("dot3_stats_multiple_collision_frames", "dot3StatsMultipleCollisionFrames", None, None),
+        ("dot3_stats_sqe_test_errors", "dot3StatsSQETestErrors", None, None),
+        ("dot3_stats_single_collision_frames", "dot3StatsSingleCollisionFrames", None, None),
+        ("ether_stats_crc_align_errors", "etherStatsCRCAlignErrors", None, None),
+    ),
+    "HTTPConnectionData": (
+        ("auth_password", "auth_password", None, None),
+        ("auth_username", "auth_username", None, None),
+        ("http_ports", "http_ports", None, None),
+        ("https_ports", "https_ports", None, None),
+    ),
+    "HardwareHealthComponent": (
+        ("environment_monitor_state", "environment_monitor_state", None, None),
+        ("fans", "fans", "list", "HardwareHealthComponentFan"),
+        ("power_supply", "power_supply", "list", "HardwareHealthComponentPowerSupply"),
+    ),
+    "HardwareHealthComponentFan": (
+        ("description", "description", None, None),
+        ("state", "state", None, None),
+    ),
+    "HardwareHealthComponentPowerSupply": (
+        ("description", "description", None, None),
+        ("state", "state", None, None),
+    ),
+    "IdentifyExpectationResult": (
+        ("expected", "expected", None, None),
+        ("got", "got", None, None),
+    ),
+    "IdentifyRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "IdentifyResponse": (
+        ("_class", "class", None, None),
+        ("properties", "properties", "model", "Properties"),
+    ),
+    "Interface": (
+        ("dwdm", "dwdm", "model", "DWDMInterface"),
+        ("ethernet_like", "ethernet_like", "model", "EthernetLikeInterface"),
+        ("if_admin_status", "ifAdminStatus", None, None),
+        ("if_alias", "ifAlias", None, None),
+        ("if_descr", "ifDescr", None, None),
+        ("if_hc_in_broadcast_pkts", "ifHCInBroadcastPkts", None, None),
+        ("if_hc_in_multicast_pkts", "ifHCInMulticastPkts", None, None),
+        ("if_hc_in_octets", "ifHCInOctets", None, None),
+        ("if_hc_in_ucast_pkts", "ifHCInUcastPkts", None, None),
+        ("if_hc_out_broadcast_pkts", "ifHCOutBroadcastPkts", None, None),
+        ("if_hc_out_multicast_pkts", "ifHCOutMulticastPkts", None, None),
+        ("if_hc_out_octets", "ifHCOutOctets", None, None),
+        ("if_hc_out_ucast_pkts", "ifHCOutUcastPkts", None, None),
+        ("if_high_speed", "ifHighSpeed", None, None),
+        ("if_in_broadcast_pkts", "ifInBroadcastPkts", None, None),
+        ("if_in_discards", "ifInDiscards", None, None),
+        ("if_in_errors", "ifInErrors", None, None),
+        ("if_in_multicast_pkts", "ifInMulticastPkts", None, None),
+        ("if_in_n_ucast_pkts", "ifInNUcastPkts", None, None),
+        ("if_in_octets", "ifInOctets", None, None),
+        ("if_in_ucast_pkts", "ifInUcastPkts", None, None),
+        ("if_in_unknown_protos", "ifInUnknownProtos", None, None),
+        ("if_index", "ifIndex", None, None),
+        ("if_last_change", "ifLastChange", None, None),
+        ("if_mtu", "ifMtu", None, None),
+        ("if_name", "ifName", None, None),
+        ("if_oper_status", "ifOperStatus", None, None),
+        ("if_out_broadcast_pkts", "ifOutBroadcastPkts", None, None),
+        ("if_out_discards", "ifOutDiscards", None, None),
+        ("if_out_errors", "ifOutErrors", None, None),
+        ("if_out_multicast_pkts", "ifOutMulticastPkts", None, None),
+        ("if_out_n_ucast_pkts", "ifOutNUcastPkts", None, None),
+        ("if_out_octets", "ifOutOctets", None, None),
+        ("if_out_q_len", "ifOutQLen", None, None),
+        ("if_out_ucast_pkts", "ifOutUcastPkts", None, None),
+        ("if_phys_address", "ifPhysAddress", None, None),
+        ("if_specific", "ifSpecific", None, None),
+        ("if_speed", "ifSpeed", None, None),
+        ("if_type", "ifType", None, None),
+        ("optical_amplifier", "optical_amplifier", "model", "OpticalAmplifierInterface"),
+        ("optical_opm", "optical_opm", "model", "OpticalOPMInterface"),
+        ("optical_transponder", "optical_transponder", "model", "OpticalTransponderInterface"),
+        ("radio", "radio", "model", "RadioInterface"),
+        ("sap", "sap", "model", "SAPInterface"),
+    ),
+    "OpticalAmplifierInterface": (
+        ("gain", "gain", None, None),
+        ("identifier", "identifier", None, None),
+        ("label", "label", None, None),
+        ("rx_power", "rx_power", None, None),
+        ("tx_power", "tx_power", None, None),
+    ),
+    "OpticalChannel": (
+        ("channel", "channel", None, None),
+        ("rx_power", "rx_power", None, None),
+        ("tx_power", "tx_power", None, None),
+    ),
+    "OpticalOPMInterface": (
+        ("channels", "channels", "list", "OpticalChannel"),
+        ("identifier", "identifier", None, None),
+        ("label", "label", None, None),
+        ("rx_power", "rx_power", None, None),
+    ),
+    "OpticalTransponderInterface": (
+        ("corrected_fec", "corrected_fec", None, None),
+        ("identifier", "identifier", None, None),
+        ("label", "label", None, None),
+        ("rx_power", "rx_power", None, None),
+        ("tx_power", "tx_power", None, None),
+        ("uncorrected_fec", "uncorrected_fec", None, None),
+    ),
+    "OutputError": (
+        ("error", "error", None, None),
+    ),
+    "OutputMessage": (
+        ("message", "message", None, None),
+        ("status", "status", None, None),
+    ),
+    "PerformanceDataPoint": (
+        ("label", "label", None, None),
+        ("max", "max", None, None),
+        ("metric", "metric", None, None),
+        ("min", "min", None, None),
+        ("thresholds", "thresholds", "model", "Thresholds"),
+        ("unit", "unit", None, None),
+        ("value", "value", None, None),
+    ),
+    "Properties": (
+        ("model", "model", None, None),
+        ("model_series", "model_series", None, None),
+        ("os_version", "os_version", None, None),
+        ("serial_number", "serial_number", None, None),
+        ("vendor", "vendor", None, None),
+    ),
+    "RadioInterface": (
+        ("level_in", "level_in", None, None),
+        ("level_out", "level_out", None, None),
+        ("maxbitrate_in", "maxbitrate_in", None, None),
+        ("maxbitrate_out", "maxbitrate_out", None, None),
+    ),
+    "Rate": (
+        ("time", "time", None, None),
+        ("value", "value", None, None),
+    ),
+    "ReadAvailableComponentsRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadAvailableComponentsResponse": (
+        ("available_components", "availableComponents", None, None),
+    ),
+    "ReadCPULoadRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadCPULoadResponse": (
+        ("cpu_load", "cpu_load", None, None),
+    ),
+    "ReadCountInterfacesRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadCountInterfacesResponse": (
+        ("count", "count", None, None),
+    ),
+    "ReadDiskRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadDiskResponse": (
+        ("disk", "disk", "model", "DiskComponent"),
+    ),
+    "ReadHardwareHealthRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadHardwareHealthResponse": (
+        ("environment_monitor_state", "environment_monitor_state", None, None),
+        ("fans", "fans", "list", "HardwareHealthComponentFan"),
+        ("power_supply", "power_supply", "list", "HardwareHealthComponentPowerSupply"),
+    ),
+    "ReadInterfacesRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadInterfacesResponse": (
+        ("interfaces", "interfaces", "list", "Interface"),
+    ),
+    "ReadMemoryUsageRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadMemoryUsageResponse": (
+        ("memory_usage", "memory_usage", None, None),
+    ),
+    "ReadRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadSBCRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadSBCResponse": (
+        ("sbc", "sbc", "model", "SBCComponent"),
+    ),
+    "ReadServerRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadServerResponse": (
+        ("server", "server", "model", "ServerComponent"),
+    ),
+    "ReadUPSRequest": (
+        ("device_data", "device_data", "model", "DeviceData"),
+        ("timeout", "timeout", None, None),
+    ),
+    "ReadUPSResponse": (
+        ("ups", "ups", "model", "UPSComponent"),
+    ),
+    "ResponseInfo": (
+        ("messages", "messages", "list", "OutputMessage"),
+        ("performance_data", "performance_data", "list", "PerformanceDataPoint"),
+        ("raw_output", "raw_output", None, None),
+        ("status_code", "status_code", None, None),
+    ),
+    "SAPInterface": (
+        ("inbound", "inbound", None, None),
+        ("outbound", "outbound", None, None),
+    ),
+    "SBCComponent": (
+        ("active_local_contacts", "active_local_contacts", None, None),
+        ("agents", "agents", "list", "SBCComponentAgent"),
+        ("global_call_per_second", "global_call_per_second", None, None),
+        ("global_concurrent_sessions_", "global_concurrent_sessions ", None, None),
+        ("license_capacity", "license_capacity", None, None),
+        ("realms", "realms", "list", "SBCComponentRealm"),
+        ("system_health_score", "system_health_score", None, None),
+        ("system_redundancy", "system_redundancy", None, None),
+        ("transcoding_capacity", "transcoding_capacity", None, None),
+    ),
+    "SBCComponentAgent": (
+        ("current_active_sessions_inbound", "current_active_sessions_inbound", None, None),
+        ("current_active_sessions_outbound", "current_active_sessions_outbound", None, None),
+        ("current_session_rate_inbound", "current_session_rate_inbound", None, None),
+        ("current_session_rate_outbound", "current_session_rate_outbound", None, None),
+        ("hostname", "hostname", None, None),
+        ("period_asr", "period_asr", None, None),
+        ("status", "status", None, None),
+    ),
+    "SBCComponentRealm": (
+        ("active_local_contacts", "active_local_contacts", None, None),
+        ("current_active_sessions_inbound", "current_active_sessions_inbound", None, None),
+        ("current_active_sessions_outbound", "current_active_sessions_outbound", None, None),
+        ("current_session_rate_inbound", "current_session_rate_inbound", None, None),
+        ("current_session_rate_outbound", "current_session_rate_outbound", None, None),
+        ("name", "name", None, None),
+        ("period_asr", "period_asr", None, None),
+        ("status", "status", None, None),
+    ),
+    "SNMPConnectionData": (
+        ("communities", "communities", None, None),
+        ("discover_parallel_requests", "discoverParallelRequests", None, None),
+        ("discover_retries", "discoverRetries", None, None),
+        ("discover_timeout", "discoverTimeout", None, None),
+        ("ports", "ports", None, None),
+        ("v3_data", "v3_data", "model", "SNMPv3ConnectionData"),
+        ("versions", "versions", None, None),
+    ),
+    "SNMPCredentials": (
+        ("community", "community", None, None),
+        ("port", "port", None, None),
+        ("v3_context_name", "v3ContextName", None, None),
+        ("v3_level", "v3Level", None, None),
+        ("version", "version", None, None),
+    ),
+    "SNMPv3ConnectionData": (
+        ("auth_key", "auth_key", None, None),
+        ("auth_protocol", "auth_protocol", None, None),
+        ("context_name", "context_name", None, None),
+        ("level", "level", None, None),
+        ("priv_key", "priv_key", None, None),
+        ("priv_protocol", "priv_protocol", None, None),
+        ("user", "user", None, None),
+    ),
+    "ServerComponent": (
+        ("procs", "procs", None, None),
+        ("users", "users", None, None),
+    ),
+    "Thresholds": (
+        ("critical_max", "criticalMax", None, None),
+        ("critical_min", "criticalMin", None, None),
+        ("warning_max", "warningMax", None, None),
+        ("warning_min", "warningMin", None, None),
+    ),
+    "UPSComponent": (
+        ("alarm_low_voltage_disconnect", "alarm_low_voltage_disconnect", None, None),
+        ("battery_amperage_", "battery_amperage ", None, None),
+        ("battery_capacity", "battery_capacity", None, None),
+        ("battery_current", "battery_current", None, None),
+        ("battery_remaining_time", "battery_remaining_time", None, None),
+        ("battery_temperature", "battery_temperature", None, None),
+        ("battery_voltage", "battery_voltage", None, None),
+        ("current_load", "current_load", None, None),
+        ("mains_voltage_applied", "mains_voltage_applied", None, None),
+        ("rectifier_current", "rectifier_current", None, None),
+        ("system_voltage", "system_voltage", None, None),
+    ),
+}
+
+
+def to_wire(value):
+    """Serializes generated model objects (and lists and dicts of them) to
+    the JSON structure of the API like ApiClient.sanitize_for_serialization,
+    attributes that are None are left out."""
+    if isinstance(value, list):
+        return [to_wire(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(to_wire(item) for item in value)
+    if isinstance(value, dict):
+        return dict((key, to_wire(item)) for key, item in value.items())
+    attribute_map = getattr(type(value), "attribute_map", None)
+    if attribute_map is None:
+        return value
+    result = {}
+    for name, key in attribute_map.items():
+        item = getattr(value, name)
+        if item is not None:
+            result[key] = to_wire(item)
+    return result
+
+
+def build_wire(model, values):
+    """Converts values, a dict of the Python field names of model with dicts
+    for nested models, to the JSON structure of the API, the same that
+    to_wire returns for the generated model object, without creating it.
+    Fields that are None are left out. Raises ValueError for unknown
+    fields."""
+    fields = dict((name, (key, kind, nested)) for name, key, kind, nested in MODELS[model])
+    result = {}
+    for name, value in values.items():
+        if name not in fields:
+            raise ValueError("Unknown parameter " + str(name) + " for " + model)
+        if value is None:
+            continue
+        key, kind, nested = fields[name]
+        if kind == "model" and isinstance(value, dict):
+            value = build_wire(nested, value)
+        elif kind == "list":
+            value = [build_wire(nested, item) if isinstance(item, dict) else item for item in value]
+        elif kind == "dict":
+            value = dict((item_key, build_wire(nested, item) if isinstance(item, dict) else item)
+                         for item_key, item in value.items())
+        result[key] = value
+    return result
+
+
+def field_names(model, names):
+    """Maps field names given either as Python name (if_name) or as JSON key
+    (ifName) to the Python names of model. Raises ValueError for unknown
+    names."""
+    lookup = {}
+    for name, key, kind, nested in MODELS[model]:
+        lookup[name] = name
+        lookup[key] = name
+    result = []
+    for name in names:
+        if name not in lookup:
+            raise ValueError("Unknown field " + str(name) + " for " + model)
+        result.append(lookup[name])
+    return result
+
+
+def from_wire(data, model, fields=None):
+    """Converts a decoded JSON API response of the given model type to the
+    dict the generated client would return from to_dict(), without creating
+    any model objects. Plain values are passed through as decoded, the API
+    already sends them with the types of the schema.
+
+    If fields is given, only these (Python) names of the top level model
+    are included.
+    """
+    if not isinstance(data, dict):
+        return data
+    result = {}
+    for name, key, kind, nested in MODELS[model]:
+        if fields is not None and name not in fields:
+            continue
+        value = data.get(key)
+        if value is not None and kind is not None:
+            if kind == "model":
+                value = from_wire(value, nested)
+            elif kind == "list":
+                value = [from_wire(item, nested) for item in value]
+            else:
+                value = dict((item_key, from_wire(item, nested)) for item_key, item in value.items())
+        result[name] = value
+    return result
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_SNAPSHOT_PATH = "~/.ansible/thola/interface_snapshots"
+
+
+def snapshot_key(host, port, fields=None, if_name_filter=None, if_type_filter=None):
+    # snapshots taken with different fields or filters contain different
+    # interfaces and attributes, so they can't be compared with each other
+    key = json.dumps([host, port, sorted(fields) if fields is not None else None, if_name_filter, if_type_filter])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _state_path(path, key):
+    return os.path.join(os.path.expanduser(path), key + ".json")
+
+
+def load_state(path, key):
+    """Returns the JSON document stored for key in the directory path or
+    None if there is none."""
+    try:
+        with open(_state_path(path, key)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def save_state(path, key, state):
+    directory = os.path.expanduser(path)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.rename(tmp_path, _state_path(path, key))
+    except (IOError, OSError):
+        # without stored state the next run just starts over
+        pass
+
+
+def delete_state(path, key):
+    try:
+        os.remove(_state_path(path, key))
+    except (IOError, OSError):
+        pass
+
+
+def load_snapshot(snapshot_path, key):
+    """Returns the stored snapshot for key as (version, interfaces by
+    ifIndex) or None if there is none."""
+    snapshot = load_state(snapshot_path, key)
+    try:
+        return snapshot["version"], snapshot["interfaces"]
+    except (KeyError, TypeError):
+        return None
+
+
+def save_snapshot(snapshot_path, key, version, interfaces):
+    save_state(snapshot_path, key, {"version": version, "interfaces": interfaces})
+
+
+def index_interfaces(interfaces):
+    return dict((str(interface.get("if_index")), interface) for interface in interfaces)
+
+
+def diff_interfaces(previous, current):
+    """Compares two snapshots (interfaces by ifIndex).
+
+    Returns the list of changed interfaces, containing if_index and the
+    attributes that differ (all attributes for new interfaces), and the
+    list of ifIndexes of removed interfaces.
+    """
+    changed = []
+    for index, interface in current.items():
+        old = previous.get(index)
+        if old is None:
+            changed.append(interface)
+            continue
+        delta = dict((name, value) for name, value in interface.items() if old.get(name) != value)
+        if delta:
+            delta["if_index"] = interface.get("if_index")
+            changed.append(delta)
+    removed = [previous[index].get("if_index") for index in previous if index not in current]
+    return changed, removed
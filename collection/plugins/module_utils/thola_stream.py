@@ -0,0 +1,93 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer(object):
+    """Text buffer that is refilled from an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(self):
+        if self.eof:
+            return False
+        # drop everything that has been consumed before reading more
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it,
+        or None at the end of the input."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, characters):
+        character = self.peek()
+        if character is None or character not in characters:
+            raise ValueError("Unexpected " + repr(character) + " in JSON stream, expected one of " + characters)
+        self.pos += 1
+        return character
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # a number at the end of the buffer might continue in the next chunk
+            if end == len(self.text) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks, key):
+    """Yields the elements of the array stored under key in the top level
+    JSON object of the byte stream chunks, one at a time.
+
+    Only a single element is held in memory at once, other top level values
+    are decoded and dropped. Yields nothing if the key is missing or null.
+    """
+    buf = _Buffer(chunks)
+    buf.expect("{")
+    if buf.peek() == "}":
+        return
+    while True:
+        name = buf.value()
+        buf.expect(":")
+        if name == key and buf.peek() == "[":
+            buf.expect("[")
+            if buf.peek() != "]":
+                while True:
+                    yield buf.value()
+                    if buf.expect(",]") == "]":
+                        break
+            else:
+                buf.expect("]")
+        else:
+            buf.value()
+        if buf.expect(",}") == "}":
+            return
@@ -0,0 +1,43 @@
+import time
+
+# Stages of a module run, in the order they happen. build is the
+# construction of the request, request the round trip to the Thola API
+# (including the SNMP requests Thola sends to the device), decode the
+# conversion of the response and sanitize the post-processing of the facts.
+STAGES = ("build", "request", "decode", "sanitize")
+
+
+class Timings(object):
+    """Measures the durations of the stages of a module run. The clock
+    starts when the object is created, mark(stage) books the time since
+    the previous mark on stage."""
+
+    def __init__(self):
+        self.durations = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.add(stage, now - self._last)
+        self._last = now
+
+    def add(self, stage, seconds):
+        self.durations[stage] = self.durations.get(stage, 0) + seconds
+
+    def move(self, source, target, seconds):
+        """Books seconds that were measured as part of source on target,
+        e.g. the decode time a worker reports within the request time."""
+        seconds = min(seconds, self.durations.get(source, 0))
+        self.add(source, -seconds)
+        self.add(target, seconds)
+
+    def result(self):
+        """Returns the durations in seconds as returned in thola_timings."""
+        result = dict((stage, round(seconds, 6)) for stage, seconds in self.durations.items())
+        result["total"] = round(sum(self.durations.values()), 6)
+        return result
+
+
+def mark(timings, stage):
+    if timings is not None:
+        timings.mark(stage)
@@ -0,0 +1,227 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_client_pool import post_json
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    OPERATIONS,
+    raw_operation,
+    serialize_request,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings, mark
+
+thola_client_found = False
+try:
+    import thola_client.rest as rest
+    import urllib3
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+DEFAULT_WORKER_SOCKET = "~/.ansible/thola/worker.sock"
+DEFAULT_IDLE_TIMEOUT = 600
+# seconds a module waits for the reply of the worker before it sends the
+# request itself
+DEFAULT_FORWARD_TIMEOUT = 300
+
+
+class WorkerUnavailable(Exception):
+    pass
+
+
+def _call(socket_path, message, timeout=None):
+    """Sends message to the worker and returns its reply. Raises
+    WorkerUnavailable if there is no worker, it doesn't reply within timeout
+    seconds or its reply is invalid."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(os.path.expanduser(socket_path))
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as f:
+            line = f.readline()
+    except (IOError, OSError) as e:
+        # socket.timeout is an OSError
+        raise WorkerUnavailable(str(e) or "The Thola worker did not reply")
+    finally:
+        connection.close()
+    if not line:
+        raise WorkerUnavailable("The Thola worker closed the connection")
+    try:
+        reply = json.loads(line)
+    except ValueError:
+        raise WorkerUnavailable("Invalid reply from the Thola worker")
+    if not isinstance(reply, dict):
+        raise WorkerUnavailable("Invalid reply from the Thola worker")
+    return reply
+
+
+def forward(socket_path, operation, api_host, body, raw=False, timeout=None, timings=None):
+    """Lets the worker listening on socket_path run operation and returns
+    the result like raw_operation (or the decoded JSON response if raw is
+    set). body has to be serialized already.
+
+    Raises WorkerUnavailable if there is no worker, otherwise the same
+    exceptions as the generated API.
+    """
+    reply = _call(socket_path, {"operation": operation, "api_host": api_host, "body": body, "raw": raw}, timeout)
+    mark(timings, "request")
+    if timings is not None and "decode" in reply.get("timings", {}):
+        # the worker decoded the response within the round trip
+        timings.move("request", "decode", reply["timings"]["decode"])
+    if reply.get("ok"):
+        return reply["result"]
+    if "status" in reply:
+        e = rest.ApiException(status=reply["status"], reason=reply.get("reason"))
+        e.body = reply.get("body")
+        raise e
+    raise urllib3.exceptions.MaxRetryError(None, api_host, reply.get("error"))
+
+
+def forward_operation(operation, api_host, body, worker_socket=None, raw=False, timings=None,
+                      timeout=DEFAULT_FORWARD_TIMEOUT):
+    """Runs operation over the worker if worker_socket is given and a worker
+    is listening there, directly otherwise. The request is sent directly as
+    well if the worker fails or doesn't reply within timeout seconds. If
+    timings is given, the request and decode stages are marked on it."""
+    if worker_socket:
+        try:
+            return forward(worker_socket, operation, api_host, serialize_request(body), raw, timeout, timings)
+        except WorkerUnavailable:
+            pass
+    if raw:
+        result = post_json(api_host, OPERATIONS[operation].path, body)
+        mark(timings, "request")
+        return result
+    return raw_operation(operation, api_host, body, timings=timings)
+
+
+def ping(socket_path):
+    try:
+        return _call(socket_path, {"command": "ping"}, 5).get("ok", False)
+    except WorkerUnavailable:
+        return False
+
+
+def stop(socket_path):
+    try:
+        _call(socket_path, {"command": "stop"}, 5)
+        return True
+    except WorkerUnavailable:
+        return False
+
+
+def _handle(request):
+    try:
+        timings = Timings()
+        if request.get("raw"):
+            result = post_json(request["api_host"], OPERATIONS[request["operation"]].path, request["body"])
+        else:
+            result = raw_operation(request["operation"], request["api_host"], request["body"], timings=timings)
+        return {"ok": True, "result": result, "timings": timings.result()}
+    except rest.ApiException as e:
+        body = e.body.decode("utf-8", "replace") if isinstance(e.body, bytes) else e.body
+        return {"ok": False, "status": e.status, "reason": e.reason, "body": body}
+    except urllib3.exceptions.HTTPError as e:
+        return {"ok": False, "error": str(e)}
+    except (KeyError, ValueError, TypeError) as e:
+        return {"ok": False, "error": "Invalid request: " + str(e)}
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, idle_timeout):
+        self.idle_timeout = idle_timeout
+        self.last_request = time.monotonic()
+        socketserver.ThreadingUnixStreamServer.__init__(self, socket_path, _Handler)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.last_request = time.monotonic()
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        command = request.get("command")
+        if command == "ping":
+            reply = {"ok": True, "pid": os.getpid()}
+        elif command == "stop":
+            reply = {"ok": True}
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            reply = _handle(request)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        self.server.last_request = time.monotonic()
+
+
+def serve(socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Serves requests on the unix socket socket_path until it is stopped or
+    no request arrived for idle_timeout seconds."""
+    socket_path = os.path.expanduser(socket_path)
+    directory = os.path.dirname(socket_path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    umask = os.umask(0o177)
+    try:
+        server = _Server(socket_path, idle_timeout)
+    finally:
+        os.umask(umask)
+
+    def watch_idle():
+        while True:
+            time.sleep(min(idle_timeout, 5))
+            if time.monotonic() - server.last_request > idle_timeout:
+                server.shutdown()
+                return
+
+    if idle_timeout:
+        watcher = threading.Thread(target=watch_idle)
+        watcher.daemon = True
+        watcher.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+
+
+def start(socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT, wait=10):
+    """Starts a detached worker on socket_path unless one is running there
+    already. Returns True if a worker was started."""
+    if ping(socket_path):
+        return False
+    pid = os.fork()
+    if pid == 0:
+        # first child: new session, then fork again so the worker can't
+        # get a controlling terminal and is reparented to init
+        try:
+            os.setsid()
+            if os.fork() == 0:
+                devnull = os.open(os.devnull, os.O_RDWR)
+                for fd in (0, 1, 2):
+                    os.dup2(devnull, fd)
+                os.chdir("/")
+                try:
+                    serve(socket_path, idle_timeout)
+                finally:
+                    os._exit(0)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if ping(socket_path):
+            return True
+        time.sleep(0.05)
+    raise WorkerUnavailable("The Thola worker did not start")
@@ -0,0 +1,107 @@
+DOCUMENTATION = """
+---
+module: thola_batch
+author: "Thola team"
+version_added: "1.1.0"
+short_description: "Runs one Thola operation for many devices"
+description:
+    - "Runs one identify, read or check operation for a list of devices from the controller"
+    - "All requests are issued from a single process by an asyncio engine with a bounded number of requests in flight"
+    - "This module is implemented as an action plugin, usually you want to run it once with run_once"
+requirements:
+    - thola-client-module-python
+options:
+    api_host:
+        description:
+          - Hostname of the running Thola API instance
+        required: True
+    hosts:
+        description:
+          - List of devices. An entry is either an IP or a dict with the keys host, community, version and port
+          - community, version and port of an entry can also be lists of the values Thola tries
+          - Every device can only be given once, because the results are keyed by device
+        required: True
+    operation:
+        description:
+          - The operation that should be run for every device, e.g. identify, read_interfaces or check_cpu_load
+        required: True
+    community:
+        description:
+          - SNMP community of the devices, can be overridden per device
+    version:
+        description:
+          - SNMP version that should be used to connect to the devices, can be overridden per device
+    port:
+        description:
+          - The port you want Thola to connect to the devices, can be overridden per device
+    discover_parallel_request:
+        description:
+          - Sets the number of possible parallel requests
+    discover_retries:
+        description:
+          - Sets the number of discovery retries
+    discover_timeout:
+        description:
+          - Sets the discover timeout
+    request:
+        description:
+          - Additional parameters of the request, e.g. cpu_load_thresholds for check_cpu_load
+    concurrency:
+        description:
+          - Maximum number of requests that are sent to the Thola API at the same time
+        default: 20
+    timeout:
+        description:
+          - Timeout of a single request in seconds, requests that take longer fail for that device
+    output_format:
+        description:
+          - Format of the interface table of read_interfaces (interfaces) and check_interface_metrics
+          - (performance_data) results, columns returns a dict with the field names (keys) and one list of
+          - values per field (columns) per device, use the inexio.thola.thola_rows filter to get the rows back
+          - Results are converted as soon as they arrive, which keeps the memory usage low for many devices
+        choices: ["rows", "columns"]
+        default: "rows"
+"""
+
+EXAMPLES = """
+- name: thola read interfaces of all devices
+  thola_batch:
+    api_host: '{{ api_host }}'
+    hosts: "{{ groups['devices'] | map('extract', hostvars, 'ansible_host') | list }}"
+    operation: read_interfaces
+    concurrency: 50
+    output_format: columns
+  run_once: true
+  register: result
+
+- name: thola check cpu load of some devices
+  thola_batch:
+    api_host: '{{ api_host }}'
+    hosts:
+      - 192.168.178.1
+      - host: 192.168.178.2
+        community: private
+    operation: check_cpu_load
+    request:
+      cpu_load_thresholds:
+        warning_max: 80
+        critical_max: 90
+  run_once: true
+  register: result
+"""
+
+RETURN = """
+changed:
+    description: "whether the command has been executed on the device"
+    returned: always
+    type: bool
+    sample: True
+results:
+    description: "Facts of every device that could be processed, keyed by device"
+    returned: always
+    type: dict
+failed_hosts:
+    description: "Error message of every device that could not be processed, keyed by device"
+    returned: always
+    type: dict
+"""
@@ -3,6 +3,20 @@ import sys
 
 import urllib3
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    DEFAULT_CREDENTIAL_PATH,
+    DEFAULT_CREDENTIAL_TTL,
+    snmp_credentials,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_HISTORY_PATH,
+    DiscoveryHistory,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import TholaRequestError, build_request
+from ansible_collections.inexio.thola.plugins.module_utils.thola_perfdata import parse_output
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
 
 DOCUMENTATION = """
 ---
@@ -25,13 +39,13 @@ options:
         required: True
     community:
         description:
-          - SNMP community of the device
+          - SNMP community of the device, or a list of communities that are tried
     version:
         description:
-          - SNMP version that should be used to connect to the device
+          - SNMP version that should be used to connect to the device, or a list of versions that are tried
     port:
         description:
-          - The port you want Thola to connect to the device
+          - The port you want Thola to connect to the device, or a list of ports that are tried
     discover_parallel_request:
         description:
           - Sets the number of possible parallel requests
@@ -77,6 +91,48 @@ options:
     vendor_diff_warning:
         description:
           - Show warning when vendor differs
+    worker_socket:
+        description:
+          - Unix socket of a worker started with thola_worker, the request is sent over the worker
+          - if one is listening there and directly to the Thola API otherwise
+        type: str
+        version_added: "1.1.0"
+    parse_output:
+        description:
+          - Return the output of the check parsed, as output (its text) and perfdata (its performance data as
+            metrics with label, value, unit, warn, crit, min and max), instead of as raw_output
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history:
+        description:
+          - Keep a history of how the device answered and take discover_timeout and discover_parallel_request,
+            if they are not given, from it
+          - A device that didn't answer gets a longer timeout and fewer parallel requests next time, a device
+            that answers gets more parallel requests and, down to twice its slowest request, a shorter timeout
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history_path:
+        description:
+          - Directory of the discovery history on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/discovery_history"
+        version_added: "1.1.0"
+    snmp_credential_cache_ttl:
+        description:
+          - If community, version or port are lists, Thola tries all their combinations in parallel and the one
+            that works is cached, later requests to the device only send that one
+          - Number of seconds a cached combination stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    snmp_credential_cache_path:
+        description:
+          - Directory of the SNMP credential cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/snmp_credentials"
+        version_added: "1.1.0"
 """
 
 EXAMPLES = """
@@ -115,26 +171,24 @@ thola_check_identify_facts:
     description: "Whether expected values were correct"
     returned: always
     type: dict
+thola_timings:
+    description: "durations in seconds of the stages of the module run, build (request construction), request
+                  (round trip to the Thola API, including the SNMP requests to the device), decode (response
+                  conversion), sanitize (post-processing of the facts) and their total"
+    returned: when a request was sent
+    type: dict
+    sample: {"build": 0.00012, "request": 0.84211, "decode": 0.00051, "sanitize": 0.00009, "total": 0.84283}
+perfdata:
+    description: "performance data of the check parsed from its output, part of the facts"
+    returned: if parse_output is set
+    type: list
+    sample: [{"label": "load", "value": 12.5, "unit": "%", "warn": 80, "crit": 90, "min": 0, "max": 100}]
 """
 
 
-def change_quotation_marks(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, dict):
-                change_quotation_marks(value)
-            elif isinstance(value, str):
-                obj[key] = obj[key].replace("\"", "'")
-    else:
-        pass
-    return obj
-
-
 thola_client_found = False
 try:
-    import thola_client.api.check_api as check
     import thola_client.rest as rest
-    import thola_client
 
     thola_client_found = True
 except ImportError:
@@ -161,9 +215,9 @@ def main():
         argument_spec=dict(
             api_host=dict(type="str", required=True),
             host=dict(type="str", required=True),
-            community=dict(type="str", required=False),
-            version=dict(type="str", required=False),
-            port=dict(type="int", required=False),
+            community=dict(type="raw", required=False),
+            version=dict(type="raw", required=False),
+            port=dict(type="raw", required=False),
             discover_parallel_request=dict(type="int", required=False),
             discover_retries=dict(type="int", required=False),
             discover_timeout=dict(type="int", required=False),
@@ -178,7 +232,13 @@ def main():
             os_diff_warning=dict(type="bool", required=False),
             os_version_diff_warning=dict(type="bool", required=False),
             serial_number_diff_warning=dict(type="bool", required=False),
-            vendor_diff_warning=dict(type="bool", required=False)
+            vendor_diff_warning=dict(type="bool", required=False),
+            worker_socket=dict(type="str", required=False),
+            parse_output=dict(type="bool", required=False, default=False),
+            discovery_history=dict(type="bool", required=False, default=False),
+            discovery_history_path=dict(type="str", required=False, default=DEFAULT_HISTORY_PATH),
+            snmp_credential_cache_ttl=dict(type="int", required=False, default=DEFAULT_CREDENTIAL_TTL),
+            snmp_credential_cache_path=dict(type="str", required=False, default=DEFAULT_CREDENTIAL_PATH)
         ),
         supports_check_mode=True,
     )
@@ -220,6 +280,27 @@ def main():
     else:
         discover_timeout = module.params["discover_timeout"]
 
+    history = None
+    if module.params["discovery_history"]:
+        history = DiscoveryHistory(module.params["discovery_history_path"], host, port)
+        if module.params["discover_timeout"] is None:
+            discover_timeout = history.discover_timeout
+        if module.params["discover_parallel_request"] is None:
+            discover_parallel_request = history.discover_parallel_request
+
+    try:
+        community, version, port = snmp_credentials(api_host, host, community, version, port,
+                                                    module.params["snmp_credential_cache_path"],
+                                                    module.params["snmp_credential_cache_ttl"],
+                                                    module.params["worker_socket"],
+                                                    discover_parallel_request=discover_parallel_request,
+                                                    discover_retries=discover_retries,
+                                                    discover_timeout=discover_timeout,
+                                                    check_mode=module.check_mode)
+    except TholaRequestError as e:
+        module.fail_json(msg=str(e))
+        return
+
     # properties
     if module.params["device_class"] is None:
         device_class = None
@@ -281,23 +362,11 @@ def main():
                          " serial_number,"
                          " vendor")
 
-    body = thola_client.CheckIdentifyRequest(
-        device_data=thola_client.DeviceData(
-            ip_address=host,
-            connection_data=thola_client.ConnectionData(
-                snmp=thola_client.SNMPConnectionData(
-                    communities=[community],
-                    versions=[version],
-                    ports=[port],
-                    discover_retries=discover_retries,
-                    discover_timeout=discover_timeout,
-                    discover_parallel_requests=discover_parallel_request
-                )
-            )
-        ),
-        expectations=thola_client.models.Device(
+    timings = Timings()
+    extra = dict(
+        expectations=dict(
             _class=device_class,
-            properties=thola_client.models.Properties(
+            properties=dict(
                 model=model,
                 model_series=model_series,
                 os_version=os_version,
@@ -312,17 +381,26 @@ def main():
         serial_number_diff_warning=serial_number_diff_warning,
         vendor_diff_warning=vendor_diff_warning
     )
+    if module.params["parse_output"]:
+        # Thola only appends the performance data to raw_output on request
+        extra["print_performance_data"] = True
+    body = build_request("check_identify", host, community, version, port, discover_parallel_request,
+                         discover_retries, discover_timeout, extra)
+    timings.mark("build")
 
-    check_api = check.CheckApi()
-    check_api.api_client.configuration.host = api_host
     try:
-        result_dict = check_api.check_identify(body=body).to_dict()
+        result_dict = forward_operation("check_identify", api_host, body, module.params["worker_socket"],
+                                        timings=timings)
     except rest.ApiException as e:
+        if history is not None and not module.check_mode:
+            history.record(discover_timeout, discover_parallel_request, status=e.status)
         module.fail_json(**json.loads(e.body))
         return
     except urllib3.exceptions.MaxRetryError:
         module.fail_json("Can't connect to Thola API!")
         return
+    if history is not None and not module.check_mode:
+        history.record(discover_timeout, discover_parallel_request, timings.durations["request"])
 
     result_dict_identify = result_dict["identify_result"]
     result_dict_identify["ansible_net_system"] = result_dict_identify["_class"]
@@ -336,12 +414,21 @@ def main():
 
     if result_dict["status_code"] == 0:
         result_dict = change_quotation_marks(result_dict)
-        results = {"changed": False, "ansible_facts": result_dict}
+        if module.params["parse_output"]:
+            result_dict.update(parse_output(result_dict.pop("raw_output")))
+        timings.mark("sanitize")
+        results = {"changed": False, "ansible_facts": result_dict, "thola_timings": timings.result()}
         module.exit_json(**results)
     else:
         result_dict = change_quotation_marks(result_dict)
-        results = {"changed": False, "ansible_facts": result_dict["raw_output"]}
-        module.fail_json(results)
+        if module.params["parse_output"]:
+            result_dict.update(parse_output(result_dict.pop("raw_output")))
+            msg = result_dict.pop("output")
+        else:
+            msg = result_dict.pop("raw_output")
+        timings.mark("sanitize")
+        # the rest of the result (status_code, performance_data, ...) is returned next to the message
+        module.fail_json(msg=msg, thola_timings=timings.result(), **result_dict)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,26 @@ import sys
 
 import urllib3
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_capabilities import (
+    DEFAULT_CAPABILITY_PATH,
+    DEFAULT_CAPABILITY_TTL,
+    unavailable_component,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import to_columns
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    DEFAULT_CREDENTIAL_PATH,
+    DEFAULT_CREDENTIAL_TTL,
+    snmp_credentials,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_HISTORY_PATH,
+    DiscoveryHistory,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import TholaRequestError, build_request
+from ansible_collections.inexio.thola.plugins.module_utils.thola_perfdata import parse_output
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
 
 DOCUMENTATION = """
 ---
@@ -25,13 +45,13 @@ options:
         required: True
     community:
         description:
-          - SNMP community of the device
+          - SNMP community of the device, or a list of communities that are tried
     version:
         description:
-          - SNMP version that should be used to connect to the device
+          - SNMP version that should be used to connect to the device, or a list of versions that are tried
     port:
         description:
-          - The port you want Thola to connect to the device
+          - The port you want Thola to connect to the device, or a list of ports that are tried
     discover_parallel_request:
         description:
           - Sets the number of possible parallel requests
@@ -47,6 +67,77 @@ options:
     ifType_filter:
         description:
           - Filters all interfaces out where ifType matches the regex
+    output_format:
+        description:
+          - Format of the returned performance data, rows returns a list with one dict per metric
+          - columns returns a dict with the field names (keys) and one list of values per field (columns),
+          - which is a lot smaller for many interfaces, use the inexio.thola.thola_rows filter to get the rows back
+        type: str
+        choices: ["rows", "columns"]
+        default: "rows"
+        version_added: "1.1.0"
+    worker_socket:
+        description:
+          - Unix socket of a worker started with thola_worker, the request is sent over the worker
+          - if one is listening there and directly to the Thola API otherwise
+        type: str
+        version_added: "1.1.0"
+    capability_cache:
+        description:
+          - Skip the request if the device doesn't have the component the module reads, according to its
+            available components
+          - The available components are read once and kept in the capability cache
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    capability_cache_ttl:
+        description:
+          - Number of seconds a capability cache entry stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    capability_cache_path:
+        description:
+          - Directory of the capability cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/capabilities"
+        version_added: "1.1.0"
+    parse_output:
+        description:
+          - Return the output of the check parsed, as output (its text) and perfdata (its performance data as
+            metrics with label, value, unit, warn, crit, min and max), instead of as raw_output
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history:
+        description:
+          - Keep a history of how the device answered and take discover_timeout and discover_parallel_request,
+            if they are not given, from it
+          - A device that didn't answer gets a longer timeout and fewer parallel requests next time, a device
+            that answers gets more parallel requests and, down to twice its slowest request, a shorter timeout
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history_path:
+        description:
+          - Directory of the discovery history on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/discovery_history"
+        version_added: "1.1.0"
+    snmp_credential_cache_ttl:
+        description:
+          - If community, version or port are lists, Thola tries all their combinations in parallel and the one
+            that works is cached, later requests to the device only send that one
+          - Number of seconds a cached combination stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    snmp_credential_cache_path:
+        description:
+          - Directory of the SNMP credential cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/snmp_credentials"
+        version_added: "1.1.0"
 """
 
 EXAMPLES = """
@@ -75,26 +166,29 @@ thola_check_interface_metrics_facts:
     description: "Interface metrics facts"
     returned: always
     type: dict
+skipped:
+    description: "whether the request was skipped because the device doesn't have the component"
+    returned: if capability_cache is set and the component is not available
+    type: bool
+    sample: True
+thola_timings:
+    description: "durations in seconds of the stages of the module run, build (request construction), request
+                  (round trip to the Thola API, including the SNMP requests to the device), decode (response
+                  conversion), sanitize (post-processing of the facts) and their total"
+    returned: when a request was sent
+    type: dict
+    sample: {"build": 0.00012, "request": 0.84211, "decode": 0.00051, "sanitize": 0.00009, "total": 0.84283}
+perfdata:
+    description: "performance data of the check parsed from its output, part of the facts"
+    returned: if parse_output is set
+    type: list
+    sample: [{"label": "load", "value": 12.5, "unit": "%", "warn": 80, "crit": 90, "min": 0, "max": 100}]
 """
 
 
-def change_quotation_marks(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, dict):
-                change_quotation_marks(value)
-            elif isinstance(value, str):
-                obj[key] = obj[key].replace("\"", "'")
-    else:
-        pass
-    return obj
-
-
 thola_client_found = False
 try:
-    import thola_client.api.check_api as check
     import thola_client.rest as rest
-    import thola_client
 
     thola_client_found = True
 except ImportError:
@@ -107,14 +201,24 @@ def main():
         argument_spec=dict(
             api_host=dict(type="str", required=True),
             host=dict(type="str", required=True),
-            community=dict(type="str", required=False),
-            version=dict(type="str", required=False),
-            port=dict(type="int", required=False),
+            community=dict(type="raw", required=False),
+            version=dict(type="raw", required=False),
+            port=dict(type="raw", required=False),
             discover_parallel_request=dict(type="int", required=False),
             discover_retries=dict(type="int", required=False),
             discover_timeout=dict(type="int", required=False),
             ifName_filter=dict(type="str", required=False),
-            ifType_filter=dict(type="str", required=False)
+            ifType_filter=dict(type="str", required=False),
+            output_format=dict(type="str", required=False, default="rows", choices=["rows", "columns"]),
+            worker_socket=dict(type="str", required=False),
+            capability_cache=dict(type="bool", required=False, default=False),
+            capability_cache_ttl=dict(type="int", required=False, default=DEFAULT_CAPABILITY_TTL),
+            capability_cache_path=dict(type="str", required=False, default=DEFAULT_CAPABILITY_PATH),
+            parse_output=dict(type="bool", required=False, default=False),
+            discovery_history=dict(type="bool", required=False, default=False),
+            discovery_history_path=dict(type="str", required=False, default=DEFAULT_HISTORY_PATH),
+            snmp_credential_cache_ttl=dict(type="int", required=False, default=DEFAULT_CREDENTIAL_TTL),
+            snmp_credential_cache_path=dict(type="str", required=False, default=DEFAULT_CREDENTIAL_PATH)
         ),
         supports_check_mode=True,
     )
@@ -156,6 +260,27 @@ def main():
     else:
         discover_timeout = module.params["discover_timeout"]
 
+    history = None
+    if module.params["discovery_history"]:
+        history = DiscoveryHistory(module.params["discovery_history_path"], host, port)
+        if module.params["discover_timeout"] is None:
+            discover_timeout = history.discover_timeout
+        if module.params["discover_parallel_request"] is None:
+            discover_parallel_request = history.discover_parallel_request
+
+    try:
+        community, version, port = snmp_credentials(api_host, host, community, version, port,
+                                                    module.params["snmp_credential_cache_path"],
+                                                    module.params["snmp_credential_cache_ttl"],
+                                                    module.params["worker_socket"],
+                                                    discover_parallel_request=discover_parallel_request,
+                                                    discover_retries=discover_retries,
+                                                    discover_timeout=discover_timeout,
+                                                    check_mode=module.check_mode)
+    except TholaRequestError as e:
+        module.fail_json(msg=str(e))
+        return
+
     # ifname filter
     if module.params["ifName_filter"] is None:
         if_name_filter = None
@@ -166,43 +291,62 @@ def main():
     else:
         if_type_filter = module.params["ifName_filter"]
 
-    body = thola_client.CheckInterfaceMetricsRequest(
-        device_data=thola_client.DeviceData(
-            ip_address=host,
-            connection_data=thola_client.ConnectionData(
-                snmp=thola_client.SNMPConnectionData(
-                    communities=[community],
-                    versions=[version],
-                    ports=[port],
-                    discover_retries=discover_retries,
-                    discover_timeout=discover_timeout,
-                    discover_parallel_requests=discover_parallel_request
-                )
-            )
-        ),
+    if module.params["capability_cache"]:
+        request_args = {"host": host, "community": community, "version": version, "port": port,
+                        "discover_parallel_request": discover_parallel_request,
+                        "discover_retries": discover_retries, "discover_timeout": discover_timeout}
+        component = unavailable_component("check_interface_metrics", api_host, request_args,
+                                          module.params["capability_cache_path"], module.params["capability_cache_ttl"],
+                                          module.params["worker_socket"], module.check_mode)
+        if component is not None:
+            module.exit_json(changed=False, skipped=True, msg="The device has no " + component + " component")
+            return
+
+    timings = Timings()
+    extra = dict(
         if_name_filter=if_name_filter,
         if_type_filter=if_type_filter
     )
+    if module.params["parse_output"]:
+        # Thola only appends the performance data to raw_output on request
+        extra["print_performance_data"] = True
+    body = build_request("check_interface_metrics", host, community, version, port, discover_parallel_request,
+                         discover_retries, discover_timeout, extra)
+    timings.mark("build")
 
-    check_api = check.CheckApi()
-    check_api.api_client.configuration.host = api_host
     try:
-        result_dict = check_api.check_interface_metrics(body=body).to_dict()
+        result_dict = forward_operation("check_interface_metrics", api_host, body, module.params["worker_socket"],
+                                        timings=timings)
     except rest.ApiException as e:
+        if history is not None and not module.check_mode:
+            history.record(discover_timeout, discover_parallel_request, status=e.status)
         module.fail_json(**json.loads(e.body))
         return
     except urllib3.exceptions.MaxRetryError:
         module.fail_json("Can't connect to Thola API!")
         return
+    if history is not None and not module.check_mode:
+        history.record(discover_timeout, discover_parallel_request, timings.durations["request"])
 
     if result_dict["status_code"] == 0:
         result_dict = change_quotation_marks(result_dict)
-        results = {"changed": False, "ansible_facts": result_dict}
+        if module.params["parse_output"]:
+            result_dict.update(parse_output(result_dict.pop("raw_output")))
+        timings.mark("sanitize")
+        if module.params["output_format"] == "columns" and result_dict["performance_data"] is not None:
+            result_dict["performance_data"] = to_columns(result_dict["performance_data"])
+        results = {"changed": False, "ansible_facts": result_dict, "thola_timings": timings.result()}
         module.exit_json(**results)
     else:
         result_dict = change_quotation_marks(result_dict)
-        results = {"changed": False, "ansible_facts": result_dict["raw_output"]}
-        module.fail_json(results)
+        if module.params["parse_output"]:
+            result_dict.update(parse_output(result_dict.pop("raw_output")))
+            msg = result_dict.pop("output")
+        else:
+            msg = result_dict.pop("raw_output")
+        timings.mark("sanitize")
+        # the rest of the result (status_code, performance_data, ...) is returned next to the message
+        module.fail_json(msg=msg, thola_timings=timings.result(), **result_dict)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,27 @@ import sys
 
 import urllib3
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    DEFAULT_CREDENTIAL_PATH,
+    DEFAULT_CREDENTIAL_TTL,
+    snmp_credentials,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_HISTORY_PATH,
+    DiscoveryHistory,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import TholaRequestError, build_request
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_identify_cache import (
+    DEFAULT_CACHE_PATH,
+    DEFAULT_CACHE_TTL,
+    cache_facts,
+    cache_key,
+    get_cached_facts,
+    invalidate_cached_facts,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
 
 DOCUMENTATION = """
 ---
@@ -25,13 +46,13 @@ options:
         required: True
     community:
         description:
-          - SNMP community of the device
+          - SNMP community of the device, or a list of communities that are tried
     version:
         description:
-          - SNMP version that should be used to connect to the device
+          - SNMP version that should be used to connect to the device, or a list of versions that are tried
     port:
         description:
-          - The port you want Thola to connect to the device
+          - The port you want Thola to connect to the device, or a list of ports that are tried
     discover_parallel_request:
         description:
           - Sets the number of possible parallel requests
@@ -41,6 +62,66 @@ options:
     discover_timeout:
         description:
           - Sets the discover timeout
+    cache:
+        description:
+          - Serve the facts from the identify cache if there is a valid entry for the device
+          - and store new results in the cache
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    cache_ttl:
+        description:
+          - Number of seconds a cache entry stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    cache_path:
+        description:
+          - Directory of the identify cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/identify_cache"
+        version_added: "1.1.0"
+    invalidate_cache:
+        description:
+          - Drop the cache entry of the device and identify it again
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    worker_socket:
+        description:
+          - Unix socket of a worker started with thola_worker, the request is sent over the worker
+          - if one is listening there and directly to the Thola API otherwise
+        type: str
+        version_added: "1.1.0"
+    discovery_history:
+        description:
+          - Keep a history of how the device answered and take discover_timeout and discover_parallel_request,
+            if they are not given, from it
+          - A device that didn't answer gets a longer timeout and fewer parallel requests next time, a device
+            that answers gets more parallel requests and, down to twice its slowest request, a shorter timeout
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history_path:
+        description:
+          - Directory of the discovery history on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/discovery_history"
+        version_added: "1.1.0"
+    snmp_credential_cache_ttl:
+        description:
+          - If community, version or port are lists, Thola tries all their combinations in parallel and the one
+            that works is cached, later requests to the device only send that one
+          - Number of seconds a cached combination stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    snmp_credential_cache_path:
+        description:
+          - Directory of the SNMP credential cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/snmp_credentials"
+        version_added: "1.1.0"
 """
 
 EXAMPLES = """
@@ -55,6 +136,14 @@ EXAMPLES = """
     discover_retries: '{{ discover_retries }}'
     discover_timeout: '{{ discover_timeout }}'
   register: result
+
+- name: thola identify with cached results
+  thola_identify_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    cache: true
+    cache_ttl: 604800
+  register: result
 """
 
 RETURN = """
@@ -67,26 +156,24 @@ thola_identify_facts:
     description: "Device facts"
     returned: always
     type: dict
+cached:
+    description: "whether the facts were served from the identify cache"
+    returned: always
+    type: bool
+    sample: False
+thola_timings:
+    description: "durations in seconds of the stages of the module run, build (request construction), request
+                  (round trip to the Thola API, including the SNMP requests to the device), decode (response
+                  conversion), sanitize (post-processing of the facts) and their total"
+    returned: when a request was sent
+    type: dict
+    sample: {"build": 0.00012, "request": 0.84211, "decode": 0.00051, "sanitize": 0.00009, "total": 0.84283}
 """
 
 
-def change_quotation_marks(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, dict):
-                change_quotation_marks(value)
-            elif isinstance(value, str):
-                obj[key] = obj[key].replace("\"", "'")
-    else:
-        pass
-    return obj
-
-
 thola_client_found = False
 try:
-    import thola_client.api.identify_api as identify
     import thola_client.rest as rest
-    import thola_client
 
     thola_client_found = True
 except ImportError:
@@ -113,12 +200,21 @@ def main():
         argument_spec=dict(
             api_host=dict(type="str", required=True),
             host=dict(type="str", required=True),
-            community=dict(type="str", required=False),
-            version=dict(type="str", required=False),
-            port=dict(type="int", required=False),
+            community=dict(type="raw", required=False),
+            version=dict(type="raw", required=False),
+            port=dict(type="raw", required=False),
             discover_parallel_request=dict(type="int", required=False),
             discover_retries=dict(type="int", required=False),
-            discover_timeout=dict(type="int", required=False)
+            discover_timeout=dict(type="int", required=False),
+            cache=dict(type="bool", required=False, default=False),
+            cache_ttl=dict(type="int", required=False, default=DEFAULT_CACHE_TTL),
+            cache_path=dict(type="str", required=False, default=DEFAULT_CACHE_PATH),
+            invalidate_cache=dict(type="bool", required=False, default=False),
+            worker_socket=dict(type="str", required=False),
+            discovery_history=dict(type="bool", required=False, default=False),
+            discovery_history_path=dict(type="str", required=False, default=DEFAULT_HISTORY_PATH),
+            snmp_credential_cache_ttl=dict(type="int", required=False, default=DEFAULT_CREDENTIAL_TTL),
+            snmp_credential_cache_path=dict(type="str", required=False, default=DEFAULT_CREDENTIAL_PATH)
         ),
         supports_check_mode=True,
     )
@@ -160,32 +256,55 @@ def main():
     else:
         discover_timeout = module.params["discover_timeout"]
 
-    body = thola_client.IdentifyRequest(
-        device_data=thola_client.DeviceData(
-            ip_address=host,
-            connection_data=thola_client.ConnectionData(
-                snmp=thola_client.SNMPConnectionData(
-                    communities=[community],
-                    versions=[version],
-                    ports=[port],
-                    discover_retries=discover_retries,
-                    discover_timeout=discover_timeout,
-                    discover_parallel_requests=discover_parallel_request
-                )
-            )
-        )
-    )
+    history = None
+    if module.params["discovery_history"]:
+        history = DiscoveryHistory(module.params["discovery_history_path"], host, port)
+        if module.params["discover_timeout"] is None:
+            discover_timeout = history.discover_timeout
+        if module.params["discover_parallel_request"] is None:
+            discover_parallel_request = history.discover_parallel_request
+
+    try:
+        community, version, port = snmp_credentials(api_host, host, community, version, port,
+                                                    module.params["snmp_credential_cache_path"],
+                                                    module.params["snmp_credential_cache_ttl"],
+                                                    module.params["worker_socket"],
+                                                    discover_parallel_request=discover_parallel_request,
+                                                    discover_retries=discover_retries,
+                                                    discover_timeout=discover_timeout,
+                                                    check_mode=module.check_mode)
+    except TholaRequestError as e:
+        module.fail_json(msg=str(e))
+        return
+
+    cache_path = module.params["cache_path"]
+    key = cache_key(host, port, community, version)
+    if module.params["invalidate_cache"]:
+        if not module.check_mode:
+            invalidate_cached_facts(cache_path, key)
+    elif module.params["cache"]:
+        cached_facts = get_cached_facts(cache_path, key, module.params["cache_ttl"])
+        if cached_facts is not None:
+            module.exit_json(changed=False, cached=True, ansible_facts=cached_facts)
+            return
+
+    timings = Timings()
+    body = build_request("identify", host, community, version, port, discover_parallel_request,
+                         discover_retries, discover_timeout)
+    timings.mark("build")
 
-    identify_api = identify.IdentifyApi()
-    identify_api.api_client.configuration.host = api_host
     try:
-        result_dict = identify_api.identify(body=body).to_dict()
+        result_dict = forward_operation("identify", api_host, body, module.params["worker_socket"], timings=timings)
     except rest.ApiException as e:
+        if history is not None and not module.check_mode:
+            history.record(discover_timeout, discover_parallel_request, status=e.status)
         module.fail_json(**json.loads(e.body))
         return
     except urllib3.exceptions.MaxRetryError:
         module.fail_json("Can't connect to Thola API!")
         return
+    if history is not None and not module.check_mode:
+        history.record(discover_timeout, discover_parallel_request, timings.durations["request"])
 
     result_dict["ansible_net_system"] = result_dict["_class"]
     result_dict["ansible_net_os"] = result_dict["_class"]
@@ -196,7 +315,10 @@ def main():
     result_dict.update(updated_properties)
 
     result_dict = change_quotation_marks(result_dict)
-    results = {"changed": False, "ansible_facts": result_dict}
+    timings.mark("sanitize")
+    if module.params["cache"] and not module.check_mode:
+        cache_facts(cache_path, key, result_dict)
+    results = {"changed": False, "cached": False, "ansible_facts": result_dict, "thola_timings": timings.result()}
     module.exit_json(**results)
 
 
@@ -0,0 +1,102 @@
+DOCUMENTATION = """
+---
+module: thola_identify_sweep
+author: "Thola team"
+version_added: "1.1.0"
+short_description: "Identifies all devices in one or more networks"
+description:
+    - "Sends an identify request for every address of the given networks from the controller"
+    - "The number of requests in flight adapts to the Thola API, it grows while requests succeed"
+    - "and is reduced when the API gets slower or returns errors that indicate overload"
+    - "Results can be streamed to a file while the sweep is running"
+    - "This module is implemented as an action plugin, usually you want to run it once with run_once"
+requirements:
+    - thola-client-module-python
+options:
+    api_host:
+        description:
+          - Hostname of the running Thola API instance
+        required: True
+    networks:
+        description:
+          - List of CIDR ranges and IPs that should be identified
+        required: True
+    community:
+        description:
+          - SNMP community of the devices
+    version:
+        description:
+          - SNMP version that should be used to connect to the devices
+    port:
+        description:
+          - The port you want Thola to connect to the devices
+    discover_parallel_request:
+        description:
+          - Sets the number of possible parallel requests
+    discover_retries:
+        description:
+          - Sets the number of discovery retries
+    discover_timeout:
+        description:
+          - Sets the discover timeout
+    concurrency:
+        description:
+          - Maximum number of identify requests that are sent to the Thola API at the same time
+        default: 100
+    initial_concurrency:
+        description:
+          - Number of requests in flight the sweep starts with
+        default: 10
+    timeout:
+        description:
+          - Timeout of a single identify request in seconds
+    output:
+        description:
+          - File that every result is written to as a JSON line as soon as it is available
+    return_results:
+        description:
+          - Whether the facts of the identified devices are returned, disable this for very large sweeps
+        default: True
+    max_addresses:
+        description:
+          - Maximum number of addresses the networks may contain together, the sweep fails for more
+        default: 65536
+"""
+
+EXAMPLES = """
+- name: thola identify sweep
+  thola_identify_sweep:
+    api_host: '{{ api_host }}'
+    networks:
+      - 10.0.0.0/20
+      - 192.168.178.0/24
+    community: '{{ community }}'
+    concurrency: 200
+    output: /tmp/sweep.jsonl
+  run_once: true
+  register: result
+"""
+
+RETURN = """
+changed:
+    description: "whether the command has been executed on the device"
+    returned: always
+    type: bool
+    sample: True
+scanned:
+    description: "Number of addresses that were sent to Thola"
+    returned: always
+    type: int
+identified:
+    description: "Number of devices that could be identified"
+    returned: always
+    type: int
+concurrency:
+    description: "Number of requests in flight at the end of the sweep"
+    returned: always
+    type: int
+results:
+    description: "Facts of every identified device, keyed by address"
+    returned: if return_results is true
+    type: dict
+"""
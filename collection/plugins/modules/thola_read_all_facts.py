@@ -0,0 +1,323 @@
+import concurrent.futures
+import sys
+
+import urllib3
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_capabilities import (
+    DEFAULT_CAPABILITY_PATH,
+    DEFAULT_CAPABILITY_TTL,
+    available_components,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    DEFAULT_CREDENTIAL_PATH,
+    DEFAULT_CREDENTIAL_TTL,
+    snmp_credentials,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_HISTORY_PATH,
+    DiscoveryHistory,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    COMPONENTS,
+    TholaRequestError,
+    build_request,
+    error_message,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import forward_operation
+
+DOCUMENTATION = """
+---
+module: thola_read_all_facts
+author: "Thola team"
+version_added: "1.1.0"
+short_description: "Reads several components of a device at once"
+description:
+    - "Reads several components of a device concurrently and returns the facts of all of them, the same facts
+      the single read modules (thola_read_cpu_load_facts, thola_read_interfaces_facts, ...) return"
+    - "If no components are given, the available components of the device are read first and all of them are
+      read"
+requirements:
+    - thola-client-module-python
+options:
+    api_host:
+        description:
+          - Hostname of the running Thola API instance
+        required: True
+    host:
+        description:
+          - IP of the device you want to read
+        required: True
+    components:
+        description:
+          - Components that should be read, e.g. the available_components returned by
+            thola_read_available_components_facts
+          - Defaults to all available components of the device
+        type: list
+        elements: str
+        choices: ["cpu", "disk", "hardware_health", "interfaces", "memory", "sbc", "server", "ups"]
+    community:
+        description:
+          - SNMP community of the device, or a list of communities that are tried
+    version:
+        description:
+          - SNMP version that should be used to connect to the device, or a list of versions that are tried
+    port:
+        description:
+          - The port you want Thola to connect to the device, or a list of ports that are tried
+    discover_parallel_request:
+        description:
+          - Sets the number of possible parallel requests
+    discover_retries:
+        description:
+          - Sets the number of discovery retries
+    discover_timeout:
+        description:
+          - Sets the discover timeout
+    worker_socket:
+        description:
+          - Unix socket of a worker started with thola_worker, the requests are sent over the worker
+          - if one is listening there and directly to the Thola API otherwise
+        type: str
+    capability_cache:
+        description:
+          - Take the available components of the device from the capability cache (and fill it if there is no
+            entry), components the device doesn't have are not requested
+        type: bool
+        default: False
+    capability_cache_ttl:
+        description:
+          - Number of seconds a capability cache entry stays valid
+        type: int
+        default: 86400
+    capability_cache_path:
+        description:
+          - Directory of the capability cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/capabilities"
+    discovery_history:
+        description:
+          - Keep a history of how the device answered and take discover_timeout and discover_parallel_request,
+            if they are not given, from it
+          - A device that didn't answer gets a longer timeout and fewer parallel requests next time, a device
+            that answers gets more parallel requests and, down to twice its slowest request, a shorter timeout
+        type: bool
+        default: False
+    discovery_history_path:
+        description:
+          - Directory of the discovery history on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/discovery_history"
+    snmp_credential_cache_ttl:
+        description:
+          - If community, version or port are lists, Thola tries all their combinations in parallel and the one
+            that works is cached, later requests to the device only send that one
+          - Number of seconds a cached combination stays valid
+        type: int
+        default: 86400
+    snmp_credential_cache_path:
+        description:
+          - Directory of the SNMP credential cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/snmp_credentials"
+"""
+
+EXAMPLES = """
+- name: thola read cpu, memory and interfaces
+  thola_read_all_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    components:
+      - cpu
+      - memory
+      - interfaces
+  register: result
+
+- name: thola read all available components
+  thola_read_all_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    community: '{{ community }}'
+    version: '{{ version }}'
+    port: '{{ port }}'
+  register: result
+"""
+
+RETURN = """
+changed:
+    description: "whether the command has been executed on the device"
+    returned: always
+    type: bool
+    sample: True
+components:
+    description: "components that were read"
+    returned: always
+    type: list
+    sample: ["cpu", "memory", "interfaces"]
+component_errors:
+    description: "error messages of the components that could not be read or that the device doesn't have
+                  according to the capability cache, the module only fails if none of the requested reads
+                  succeeded"
+    returned: always
+    type: dict
+    sample: {"ups": "no detection for ups found"}
+thola_read_all_facts:
+    description: "Facts of all read components, and available_components if components was not given"
+    returned: always
+    type: dict
+thola_timings:
+    description: "durations in seconds of the module run, request is the time all reads took together and
+                  components the build, request and decode durations of every successful read"
+    returned: always
+    type: dict
+    sample: {"request": 0.84211, "sanitize": 0.00009, "total": 0.8422,
+             "components": {"cpu": {"build": 0.00012, "request": 0.84118, "decode": 0.00004, "total": 0.84134}}}
+"""
+
+
+thola_client_found = False
+try:
+    import thola_client.rest as rest
+
+    thola_client_found = True
+except ImportError:
+    pass
+
+
+def read_component(component, api_host, request_args, worker_socket, timings):
+    operation = COMPONENTS[component]
+    body = build_request(operation, **request_args)
+    timings.mark("build")
+    return forward_operation(operation, api_host, body, worker_socket, timings=timings)
+
+
+def main():
+    sys.stderr = None
+    module = AnsibleModule(
+        argument_spec=dict(
+            api_host=dict(type="str", required=True),
+            host=dict(type="str", required=True),
+            components=dict(type="list", elements="str", required=False, choices=sorted(COMPONENTS)),
+            community=dict(type="raw", required=False),
+            version=dict(type="raw", required=False),
+            port=dict(type="raw", required=False),
+            discover_parallel_request=dict(type="int", required=False),
+            discover_retries=dict(type="int", required=False),
+            discover_timeout=dict(type="int", required=False),
+            worker_socket=dict(type="str", required=False),
+            capability_cache=dict(type="bool", required=False, default=False),
+            capability_cache_ttl=dict(type="int", required=False, default=DEFAULT_CAPABILITY_TTL),
+            capability_cache_path=dict(type="str", required=False, default=DEFAULT_CAPABILITY_PATH),
+            discovery_history=dict(type="bool", required=False, default=False),
+            discovery_history_path=dict(type="str", required=False, default=DEFAULT_HISTORY_PATH),
+            snmp_credential_cache_ttl=dict(type="int", required=False, default=DEFAULT_CREDENTIAL_TTL),
+            snmp_credential_cache_path=dict(type="str", required=False, default=DEFAULT_CREDENTIAL_PATH)
+        ),
+        supports_check_mode=True,
+    )
+
+    if not thola_client_found:
+        module.fail_json("The thola-client-module is not installed")
+
+    api_host = module.params["api_host"]
+    worker_socket = module.params["worker_socket"]
+    request_args = {"host": module.params["host"]}
+    for key in ("community", "version", "port", "discover_parallel_request", "discover_retries", "discover_timeout"):
+        if module.params[key] is not None:
+            request_args[key] = module.params[key]
+
+    history = None
+    if module.params["discovery_history"]:
+        history = DiscoveryHistory(module.params["discovery_history_path"], request_args["host"],
+                                   request_args.get("port", 161))
+        request_args.setdefault("discover_timeout", history.discover_timeout)
+        request_args.setdefault("discover_parallel_request", history.discover_parallel_request)
+
+    discover_args = dict((key, value) for key, value in request_args.items() if key.startswith("discover_"))
+    try:
+        credentials = snmp_credentials(api_host, request_args["host"], request_args.get("community", "public"),
+                                       request_args.get("version", "2c"), request_args.get("port", 161),
+                                       module.params["snmp_credential_cache_path"],
+                                       module.params["snmp_credential_cache_ttl"], worker_socket,
+                                       check_mode=module.check_mode, **discover_args)
+    except TholaRequestError as e:
+        module.fail_json(msg=str(e))
+        return
+    request_args["community"], request_args["version"], request_args["port"] = credentials
+
+    facts = {}
+    available = None
+    components = module.params["components"]
+    try:
+        if module.params["capability_cache"]:
+            available = available_components(api_host, request_args, module.params["capability_cache_path"],
+                                             module.params["capability_cache_ttl"], worker_socket, module.check_mode)
+        elif components is None:
+            body = build_request("read_available_components", **request_args)
+            available = forward_operation("read_available_components", api_host, body,
+                                          worker_socket)["available_components"] or []
+    except rest.ApiException as e:
+        module.fail_json(msg=error_message(e.body))
+        return
+    except urllib3.exceptions.MaxRetryError:
+        module.fail_json("Can't connect to Thola API!")
+        return
+
+    errors = {}
+    if components is None:
+        facts["available_components"] = available
+        components = [c for c in available if c in COMPONENTS]
+    elif available is not None:
+        for component in components:
+            if component not in available:
+                errors[component] = "The device has no " + component + " component"
+        components = [c for c in components if c in available]
+
+    components = sorted(set(components))
+    timings = Timings()
+    component_timings = dict((component, Timings()) for component in components)
+    if components:
+        # one thread per component, they share the pooled connections
+        with concurrent.futures.ThreadPoolExecutor(len(components)) as executor:
+            futures = [(component, executor.submit(read_component, component, api_host, request_args, worker_socket,
+                                                   component_timings[component]))
+                       for component in components]
+        timings.mark("request")
+        statuses = []
+        for component, future in futures:
+            try:
+                facts.update(future.result())
+            except rest.ApiException as e:
+                errors[component] = error_message(e.body)
+                statuses.append(e.status)
+            except urllib3.exceptions.MaxRetryError:
+                errors[component] = "Can't connect to Thola API!"
+            except Exception as e:
+                # e.g. an invalid response, it must not discard the components that were read
+                errors[component] = str(e) or type(e).__name__
+        failed = all(component in errors for component in components)
+        if history is not None and not module.check_mode and (statuses or not failed):
+            if failed:
+                history.record(request_args["discover_timeout"], request_args["discover_parallel_request"],
+                               status=max(statuses))
+            else:
+                history.record(request_args["discover_timeout"], request_args["discover_parallel_request"],
+                               timings.durations["request"])
+        if failed:
+            module.fail_json(msg="None of the components could be read", components=components,
+                             component_errors=errors)
+            return
+
+    facts = change_quotation_marks(facts)
+    timings.mark("sanitize")
+    thola_timings = timings.result()
+    thola_timings["components"] = dict((component, component_timings[component].result())
+                                       for component in components if component not in errors)
+    results = {"changed": False, "components": components, "component_errors": errors, "ansible_facts": facts,
+               "thola_timings": thola_timings}
+    module.exit_json(**results)
+
+
+if __name__ == "__main__":
+    main()
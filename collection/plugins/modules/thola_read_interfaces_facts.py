@@ -1,8 +1,57 @@
 import json
+import re
 import sys
+import time
 
 import urllib3
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_capabilities import (
+    DEFAULT_CAPABILITY_PATH,
+    DEFAULT_CAPABILITY_TTL,
+    unavailable_component,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_client_pool import open_request, post_json
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import to_columns
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    DEFAULT_CREDENTIAL_PATH,
+    DEFAULT_CREDENTIAL_TTL,
+    snmp_credentials,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_HISTORY_PATH,
+    DiscoveryHistory,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_rates import (
+    COUNTERS,
+    DEFAULT_COUNTERS_PATH,
+    counter_columns,
+    counters_key,
+    interface_rates,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import field_names, from_wire
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import (
+    DEFAULT_SNAPSHOT_PATH,
+    diff_interfaces,
+    index_interfaces,
+    load_snapshot,
+    load_state,
+    save_snapshot,
+    save_state,
+    snapshot_key,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_stream import iter_json_array
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    TholaRequestError,
+    build_request,
+    serialize_request,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings, mark
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import (
+    DEFAULT_FORWARD_TIMEOUT,
+    WorkerUnavailable,
+    forward,
+)
 
 DOCUMENTATION = """
 ---
@@ -25,13 +74,13 @@ options:
         required: True
     community:
         description:
-          - SNMP community of the device
+          - SNMP community of the device, or a list of communities that are tried
     version:
         description:
-          - SNMP version that should be used to connect to the device
+          - SNMP version that should be used to connect to the device, or a list of versions that are tried
     port:
         description:
-          - The port you want Thola to connect to the device
+          - The port you want Thola to connect to the device, or a list of ports that are tried
     discover_parallel_request:
         description:
           - Sets the number of possible parallel requests
@@ -41,6 +90,132 @@ options:
     discover_timeout:
         description:
           - Sets the discover timeout
+    stream:
+        description:
+          - Decodes the response of the Thola API incrementally, one interface at a time, instead of
+          - reading and decoding the whole response at once
+          - Reduces the memory usage and runtime for devices with a lot of interfaces
+        type: bool
+        default: True
+        version_added: "1.1.0"
+    fields:
+        description:
+          - Only returns these attributes of every interface, e.g. ifName and ifOperStatus
+          - Attributes can be given with their Thola API name (ifName) or their fact name (if_name)
+          - ifIndex is always returned
+        type: list
+        elements: str
+        version_added: "1.1.0"
+    ifName_filter:
+        description:
+          - Filters all interfaces out where ifName matches the regex
+        type: str
+        version_added: "1.1.0"
+    ifType_filter:
+        description:
+          - Filters all interfaces out where ifType matches the regex
+        type: str
+        version_added: "1.1.0"
+    incremental:
+        description:
+          - Keeps the last result per device in a local snapshot and only returns interfaces that changed since
+          - then, with ifIndex and the changed attributes (new interfaces are returned completely)
+          - The full table is returned if there is no snapshot yet or snapshot_version doesn't match
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    snapshot_version:
+        description:
+          - Snapshot version the caller has processed last (interfaces_snapshot_version of the previous run)
+          - If it differs from the stored snapshot, the full table is returned
+        type: int
+        version_added: "1.1.0"
+    snapshot_path:
+        description:
+          - Directory of the interface snapshots on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/interface_snapshots"
+        version_added: "1.1.0"
+    rates:
+        description:
+          - Computes per second rates of the octet, packet, error and discard counters since the last run
+          - with rates enabled and returns them as interface_rates, including in_bps and out_bps
+          - 32 bit counters that decrease are taken as wrapped, 64 bit counters as reset (no rate)
+          - The counters are read for the rates even if fields doesn't include them
+          - Rates are computed per ifName_filter and ifType_filter, like snapshots
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    counters_path:
+        description:
+          - Directory where the counters of the last run are stored on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/interface_counters"
+        version_added: "1.1.0"
+    output_format:
+        description:
+          - Format of the returned interfaces, rows returns a list with one dict per interface
+          - columns returns a dict with the field names (keys) and one list of values per field (columns),
+          - which is a lot smaller for many interfaces, use the inexio.thola.thola_rows filter to get the rows back
+        type: str
+        choices: ["rows", "columns"]
+        default: "rows"
+        version_added: "1.1.0"
+    worker_socket:
+        description:
+          - Unix socket of a worker started with thola_worker, the request is sent over the worker
+          - if one is listening there and directly to the Thola API otherwise
+        type: str
+        version_added: "1.1.0"
+    capability_cache:
+        description:
+          - Skip the request if the device doesn't have the component the module reads, according to its
+            available components
+          - The available components are read once and kept in the capability cache
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    capability_cache_ttl:
+        description:
+          - Number of seconds a capability cache entry stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    capability_cache_path:
+        description:
+          - Directory of the capability cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/capabilities"
+        version_added: "1.1.0"
+    discovery_history:
+        description:
+          - Keep a history of how the device answered and take discover_timeout and discover_parallel_request,
+            if they are not given, from it
+          - A device that didn't answer gets a longer timeout and fewer parallel requests next time, a device
+            that answers gets more parallel requests and, down to twice its slowest request, a shorter timeout
+        type: bool
+        default: False
+        version_added: "1.1.0"
+    discovery_history_path:
+        description:
+          - Directory of the discovery history on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/discovery_history"
+        version_added: "1.1.0"
+    snmp_credential_cache_ttl:
+        description:
+          - If community, version or port are lists, Thola tries all their combinations in parallel and the one
+            that works is cached, later requests to the device only send that one
+          - Number of seconds a cached combination stays valid
+        type: int
+        default: 86400
+        version_added: "1.1.0"
+    snmp_credential_cache_path:
+        description:
+          - Directory of the SNMP credential cache on the host the module runs on
+        type: str
+        default: "~/.ansible/thola/snmp_credentials"
+        version_added: "1.1.0"
 """
 
 EXAMPLES = """
@@ -55,6 +230,31 @@ EXAMPLES = """
     discover_retries: '{{ discover_retries }}'
     discover_timeout: '{{ discover_timeout }}'
   register: result
+
+- name: thola read operational status of the ethernet interfaces
+  thola_read_interfaces_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    fields:
+      - ifName
+      - ifOperStatus
+    ifType_filter: '^(?!ethernetCsmacd$)'
+  register: result
+
+- name: thola read changed interfaces since the last poll
+  thola_read_interfaces_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    incremental: true
+    snapshot_version: '{{ interfaces_snapshot_version | default(omit) }}'
+  register: result
+
+- name: thola read interface traffic rates
+  thola_read_interfaces_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    rates: true
+  register: result
 """
 
 RETURN = """
@@ -64,47 +264,107 @@ changed:
     type: bool
     sample: True
 thola_read_interfaces_facts:
-    description: "Interfaces facts"
+    description: "Interfaces facts, in incremental mode also removed_interfaces (list of ifIndex)
+                  and interfaces_snapshot_version, with rates also interface_rates"
     returned: always
     type: dict
+full:
+    description: "whether the full interface table was returned in incremental mode"
+    returned: if incremental is true
+    type: bool
+    sample: False
+skipped:
+    description: "whether the request was skipped because the device doesn't have the component"
+    returned: if capability_cache is set and the component is not available
+    type: bool
+    sample: True
+thola_timings:
+    description: "durations in seconds of the stages of the module run, build (request construction), request
+                  (round trip to the Thola API, including the SNMP requests to the device), decode (response
+                  conversion), sanitize (post-processing of the facts) and their total"
+    returned: when a request was sent
+    type: dict
+    sample: {"build": 0.00012, "request": 0.84211, "decode": 0.00051, "sanitize": 0.00009, "total": 0.84283}
 """
 
 
-def change_quotation_marks(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, dict):
-                change_quotation_marks(value)
-            elif isinstance(value, str):
-                obj[key] = obj[key].replace("\"", "'")
-    else:
-        pass
-    return obj
-
-
 thola_client_found = False
 try:
-    import thola_client.api.read_api as read
     import thola_client.rest as rest
-    import thola_client
 
     thola_client_found = True
 except ImportError:
     pass
 
 
+def read_interfaces(api_host, body, stream, worker_socket=None, timings=None):
+    """Yields the interfaces of the response as decoded JSON dicts. The
+    request stage on timings ends when the response arrived, for streamed
+    responses when its headers arrived."""
+    response = None
+    if worker_socket:
+        try:
+            response = forward(worker_socket, "read_interfaces", api_host, serialize_request(body),
+                               raw=True, timeout=DEFAULT_FORWARD_TIMEOUT, timings=timings)
+        except WorkerUnavailable:
+            pass
+    if response is None and not stream:
+        response = post_json(api_host, "/read/interfaces", body)
+        mark(timings, "request")
+    if response is not None:
+        for interface in response.get("interfaces") or []:
+            yield interface
+        return
+    response = open_request(api_host, "/read/interfaces", body)
+    mark(timings, "request")
+    try:
+        for interface in iter_json_array(response.stream(65536), "interfaces"):
+            yield interface
+    finally:
+        response.release_conn()
+
+
+def select_interfaces(interfaces, fields, if_name_filter, if_type_filter):
+    # filtering and projection happen before the interfaces are converted,
+    # so dropped interfaces and attributes never reach the facts
+    for interface in interfaces:
+        if if_name_filter is not None and if_name_filter.search(interface.get("ifName") or ""):
+            continue
+        if if_type_filter is not None and if_type_filter.search(interface.get("ifType") or ""):
+            continue
+        yield change_quotation_marks(from_wire(interface, "Interface", fields))
+
+
 def main():
     sys.stderr = None
     module = AnsibleModule(
         argument_spec=dict(
             api_host=dict(type="str", required=True),
             host=dict(type="str", required=True),
-            community=dict(type="str", required=False),
-            version=dict(type="str", required=False),
-            port=dict(type="int", required=False),
+            community=dict(type="raw", required=False),
+            version=dict(type="raw", required=False),
+            port=dict(type="raw", required=False),
             discover_parallel_request=dict(type="int", required=False),
             discover_retries=dict(type="int", required=False),
-            discover_timeout=dict(type="int", required=False)
+            discover_timeout=dict(type="int", required=False),
+            stream=dict(type="bool", required=False, default=True),
+            fields=dict(type="list", elements="str", required=False),
+            ifName_filter=dict(type="str", required=False),
+            ifType_filter=dict(type="str", required=False),
+            incremental=dict(type="bool", required=False, default=False),
+            snapshot_version=dict(type="int", required=False),
+            snapshot_path=dict(type="str", required=False, default=DEFAULT_SNAPSHOT_PATH),
+            rates=dict(type="bool", required=False, default=False),
+            counters_path=dict(type="str", required=False, default=DEFAULT_COUNTERS_PATH),
+            output_format=dict(type="str", required=False, default="rows", choices=["rows", "columns"]),
+            worker_socket=dict(type="str", required=False),
+            capability_cache=dict(type="bool", required=False, default=False),
+            capability_cache_ttl=dict(type="int", required=False, default=DEFAULT_CAPABILITY_TTL),
+            capability_cache_path=dict(type="str", required=False, default=DEFAULT_CAPABILITY_PATH),
+            discovery_history=dict(type="bool", required=False, default=False),
+            discovery_history_path=dict(type="str", required=False, default=DEFAULT_HISTORY_PATH),
+            snmp_credential_cache_ttl=dict(type="int", required=False, default=DEFAULT_CREDENTIAL_TTL),
+            snmp_credential_cache_path=dict(type="str", required=False, default=DEFAULT_CREDENTIAL_PATH)
         ),
         supports_check_mode=True,
     )
@@ -146,35 +406,122 @@ def main():
     else:
         discover_timeout = module.params["discover_timeout"]
 
-    body = thola_client.ReadInterfacesRequest(
-        device_data=thola_client.DeviceData(
-            ip_address=host,
-            connection_data=thola_client.ConnectionData(
-                snmp=thola_client.SNMPConnectionData(
-                    communities=[community],
-                    versions=[version],
-                    ports=[port],
-                    discover_retries=discover_retries,
-                    discover_timeout=discover_timeout,
-                    discover_parallel_requests=discover_parallel_request
-                )
-            )
-        )
-    )
+    history = None
+    if module.params["discovery_history"]:
+        history = DiscoveryHistory(module.params["discovery_history_path"], host, port)
+        if module.params["discover_timeout"] is None:
+            discover_timeout = history.discover_timeout
+        if module.params["discover_parallel_request"] is None:
+            discover_parallel_request = history.discover_parallel_request
+
+    try:
+        community, version, port = snmp_credentials(api_host, host, community, version, port,
+                                                    module.params["snmp_credential_cache_path"],
+                                                    module.params["snmp_credential_cache_ttl"],
+                                                    module.params["worker_socket"],
+                                                    discover_parallel_request=discover_parallel_request,
+                                                    discover_retries=discover_retries,
+                                                    discover_timeout=discover_timeout,
+                                                    check_mode=module.check_mode)
+    except TholaRequestError as e:
+        module.fail_json(msg=str(e))
+        return
+
+    if module.params["fields"] is None:
+        fields = None
+    else:
+        try:
+            fields = set(field_names("Interface", module.params["fields"]))
+        except ValueError as e:
+            module.fail_json(msg=str(e))
+            return
+        fields.add("if_index")
+    # the counters are read for the rates, but only returned if fields includes them
+    read_fields = fields
+    if fields is not None and module.params["rates"]:
+        read_fields = fields | set(name for name, bits in COUNTERS)
+    try:
+        if_name_filter = None
+        if module.params["ifName_filter"] is not None:
+            if_name_filter = re.compile(module.params["ifName_filter"])
+        if_type_filter = None
+        if module.params["ifType_filter"] is not None:
+            if_type_filter = re.compile(module.params["ifType_filter"])
+    except re.error as e:
+        module.fail_json(msg="Invalid filter regex: " + str(e))
+        return
+
+    if module.params["capability_cache"]:
+        request_args = {"host": host, "community": community, "version": version, "port": port,
+                        "discover_parallel_request": discover_parallel_request,
+                        "discover_retries": discover_retries, "discover_timeout": discover_timeout}
+        component = unavailable_component("read_interfaces", api_host, request_args,
+                                          module.params["capability_cache_path"], module.params["capability_cache_ttl"],
+                                          module.params["worker_socket"], module.check_mode)
+        if component is not None:
+            module.exit_json(changed=False, skipped=True, msg="The device has no " + component + " component")
+            return
+
+    timings = Timings()
+    body = build_request("read_interfaces", host, community, version, port, discover_parallel_request,
+                         discover_retries, discover_timeout)
+    timings.mark("build")
 
-    read_api = read.ReadApi()
-    read_api.api_client.configuration.host = api_host
     try:
-        result_dict = read_api.read_interfaces(body=body).to_dict()
+        interfaces = read_interfaces(api_host, body, module.params["stream"], module.params["worker_socket"],
+                                     timings)
+        # interfaces are converted and sanitized while they are decoded
+        result_dict = {"interfaces": list(select_interfaces(interfaces, read_fields, if_name_filter, if_type_filter))}
+        timings.mark("decode")
     except rest.ApiException as e:
+        if history is not None and not module.check_mode:
+            history.record(discover_timeout, discover_parallel_request, status=e.status)
         module.fail_json(**json.loads(e.body))
         return
     except urllib3.exceptions.MaxRetryError:
         module.fail_json("Can't connect to Thola API!")
         return
+    if history is not None and not module.check_mode:
+        history.record(discover_timeout, discover_parallel_request, timings.durations["request"])
 
-    result_dict = change_quotation_marks(result_dict)
     results = {"changed": False, "ansible_facts": result_dict}
+    if module.params["rates"]:
+        counters_path = module.params["counters_path"]
+        key = counters_key(host, port, module.params["ifName_filter"], module.params["ifType_filter"])
+        counters = counter_columns(result_dict["interfaces"], time.time())
+        try:
+            result_dict["interface_rates"] = interface_rates(load_state(counters_path, key), counters)
+        except (KeyError, TypeError, AttributeError):
+            # first run or unusable state, rates are available from the next run on
+            result_dict["interface_rates"] = []
+        if not module.check_mode:
+            save_state(counters_path, key, counters)
+        if read_fields is not fields:
+            result_dict["interfaces"] = [dict((name, value) for name, value in interface.items() if name in fields)
+                                         for interface in result_dict["interfaces"]]
+    if module.params["incremental"]:
+        snapshot_path = module.params["snapshot_path"]
+        key = snapshot_key(host, port, fields, module.params["ifName_filter"], module.params["ifType_filter"])
+        current = index_interfaces(result_dict["interfaces"])
+        snapshot = load_snapshot(snapshot_path, key)
+        snapshot_version = module.params["snapshot_version"]
+        if snapshot is None or (snapshot_version is not None and snapshot_version != snapshot[0]):
+            full = True
+            new_snapshot_version = snapshot[0] + 1 if snapshot is not None else 1
+            removed = []
+        else:
+            full = False
+            result_dict["interfaces"], removed = diff_interfaces(snapshot[1], current)
+            new_snapshot_version = snapshot[0] + 1 if result_dict["interfaces"] or removed else snapshot[0]
+        if not module.check_mode and (snapshot is None or new_snapshot_version != snapshot[0]):
+            save_snapshot(snapshot_path, key, new_snapshot_version, current)
+        result_dict["removed_interfaces"] = removed
+        result_dict["interfaces_snapshot_version"] = new_snapshot_version
+        results["full"] = full
+    if module.params["output_format"] == "columns":
+        result_dict["interfaces"] = to_columns(result_dict["interfaces"])
+    timings.mark("sanitize")
+    results["thola_timings"] = timings.result()
     module.exit_json(**results)
 
 
@@ -0,0 +1,101 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_WORKER_SOCKET,
+    WorkerUnavailable,
+    ping,
+    start,
+    stop,
+    thola_client_found,
+)
+
+DOCUMENTATION = """
+---
+module: thola_worker
+author: "Thola team"
+version_added: "1.1.0"
+short_description: "Starts or stops a persistent Thola worker"
+description:
+    - "Manages a long-lived local worker process that keeps the Thola client loaded and its connections to the
+      Thola API open"
+    - "Modules that are called with worker_socket send their request to the worker instead of connecting to the
+      Thola API themselves and fall back to a direct request if no worker is running"
+    - "The worker stops by itself after idle_timeout seconds without requests"
+requirements:
+    - thola-client-module-python
+options:
+    socket:
+        description:
+          - Path of the unix socket the worker listens on
+        default: "~/.ansible/thola/worker.sock"
+    state:
+        description:
+          - Whether the worker should be running
+        choices: ["started", "stopped"]
+        default: "started"
+    idle_timeout:
+        description:
+          - Seconds without requests after which the worker stops, 0 keeps it running until it is stopped
+        type: int
+        default: 600
+"""
+
+EXAMPLES = """
+- name: start thola worker
+  thola_worker:
+    socket: /tmp/thola.sock
+
+- name: thola read cpu load over the worker
+  thola_read_cpu_load_facts:
+    api_host: '{{ api_host }}'
+    host: '{{ host }}'
+    worker_socket: /tmp/thola.sock
+  register: result
+"""
+
+RETURN = """
+changed:
+    description: "whether the worker was started or stopped"
+    returned: always
+    type: bool
+    sample: True
+running:
+    description: "whether a worker is listening on the socket now"
+    returned: always
+    type: bool
+    sample: True
+"""
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            socket=dict(type="str", required=False, default=DEFAULT_WORKER_SOCKET),
+            state=dict(type="str", required=False, default="started", choices=["started", "stopped"]),
+            idle_timeout=dict(type="int", required=False, default=DEFAULT_IDLE_TIMEOUT)
+        ),
+        supports_check_mode=True,
+    )
+
+    if not thola_client_found:
+        module.fail_json("The thola-client-module is not installed")
+
+    socket_path = module.params["socket"]
+    running = ping(socket_path)
+    if module.params["state"] == "started":
+        if running or module.check_mode:
+            module.exit_json(changed=not running, running=running)
+        try:
+            start(socket_path, module.params["idle_timeout"])
+        except (WorkerUnavailable, OSError) as e:
+            module.fail_json(msg="Can't start Thola worker: " + str(e))
+        module.exit_json(changed=True, running=True)
+
+    if not running or module.check_mode:
+        module.exit_json(changed=running, running=running)
+    stop(socket_path)
+    module.exit_json(changed=True, running=False)
+
+
+if __name__ == "__main__":
+    main()
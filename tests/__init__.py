@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLLECTION_PATH = os.path.join(ROOT, "collection")
+MODULES_PATH = os.path.join(COLLECTION_PATH, "plugins", "modules")
+
+# Make the collection importable as ansible_collections.inexio.thola without installing it,
+# so that the tests can import plugins and module_utils the same way the modules do.
+for name, path in (("ansible_collections", None),
+                   ("ansible_collections.inexio", None),
+                   ("ansible_collections.inexio.thola", COLLECTION_PATH)):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [path] if path else []
+        sys.modules[name] = package
+
+# runs the module file argv[1] with the arguments file argv[2] the way ansible does
+RUN_MODULE = "import runpy, sys, tests; sys.argv = sys.argv[1:]; runpy.run_path(sys.argv[0], run_name='__main__')"
+
+
+def run_module(name, args, directory):
+    """Runs the module name, e.g. thola_read_cpu_load_facts, with args in a
+    new interpreter and returns its result, None if it printed none. The
+    arguments file is written to directory."""
+    path = os.path.join(directory, "args.json")
+    with open(path, "w") as f:
+        json.dump({"ANSIBLE_MODULE_ARGS": args}, f)
+    process = subprocess.run([sys.executable, "-c", RUN_MODULE, os.path.join(MODULES_PATH, name + ".py"), path],
+                             cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    lines = process.stdout.decode("utf-8").strip().splitlines()
+    return json.loads(lines[-1]) if lines else None
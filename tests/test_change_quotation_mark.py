@@ -1,18 +1,62 @@
+import collections
 from unittest import TestCase
 
-def change_quotation_marks(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, dict):
-                change_quotation_marks(value)
-            elif isinstance(value, str):
-                obj[key] = obj[key].replace("\"", "'")
-    else:
-        pass
-    return obj
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks
+
+
+def interfaces_payload(count):
+    return {"interfaces": [{
+        "if_index": i,
+        "if_name": "GigabitEthernet0/%d" % i,
+        "if_descr": "uplink \"core-%d\"" % i if i % 10 == 0 else "access port",
+        "if_type": "ethernetCsmacd",
+        "if_oper_status": "up",
+        "if_hc_in_octets": 1234567 * i,
+        "if_hc_out_octets": 7654321 * i,
+        "ethernet_like": {"dot3_stats_fcs_errors": 0, "dot3_stats_alignment_errors": None},
+    } for i in range(count)]}
+
 
 class ChangeQuotationMarksTests(TestCase):
     def test_fail_output(self):
         dictio = {"changed": False, "msg": {"ansible_facts": "CRITICAL: Vendor: expected: \"Cisco\", got: \"Mikrotik\"", "changed": False}}
         dictio_changed = change_quotation_marks(dictio)
         self.assertDictEqual(dictio_changed, {"changed": False, "msg": {"ansible_facts": "CRITICAL: Vendor: expected: 'Cisco', got: 'Mikrotik'", "changed": False}})
+
+    def test_lists(self):
+        dictio = {"interfaces": [{"if_alias": "\"a\"", "tags": ["\"b\"", 1, None]}, "\"c\""]}
+        change_quotation_marks(dictio)
+        self.assertDictEqual(dictio, {"interfaces": [{"if_alias": "'a'", "tags": ["'b'", 1, None]}, "'c'"]})
+
+    def test_string(self):
+        self.assertEqual(change_quotation_marks("OK: \"fine\""), "OK: 'fine'")
+
+    def test_other_values(self):
+        self.assertIsNone(change_quotation_marks(None))
+        self.assertEqual(change_quotation_marks(5), 5)
+        self.assertEqual(change_quotation_marks(("\"a\"",)), ("\"a\"",))
+
+    def test_subclasses(self):
+        dictio = collections.OrderedDict(msg="\"a\"")
+        dictio["nested"] = collections.OrderedDict(text="\"b\"")
+        dictio["counts"] = collections.defaultdict(list, text=["\"c\""])
+        self.assertIs(change_quotation_marks(dictio), dictio)
+        self.assertEqual(dictio["msg"], "'a'")
+        self.assertEqual(dictio["nested"]["text"], "'b'")
+        self.assertEqual(dictio["counts"]["text"], ["'c'"])
+
+    def test_deep_nesting(self):
+        dictio = value = {}
+        for i in range(5000):
+            value["next"] = {}
+            value = value["next"]
+        value["text"] = "\"deep\""
+        change_quotation_marks(dictio)
+        self.assertEqual(value["text"], "'deep'")
+
+    def test_10k_interfaces(self):
+        payload = interfaces_payload(10000)
+        change_quotation_marks(payload)
+        self.assertEqual(payload["interfaces"][10]["if_descr"], "uplink 'core-10'")
+        self.assertEqual(payload["interfaces"][11]["if_descr"], "access port")
+        self.assertFalse(any("\"" in interface["if_descr"] for interface in payload["interfaces"]))
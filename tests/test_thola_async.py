@@ -0,0 +1,99 @@
+import asyncio
+import json
+import socket
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import AdaptiveLimiter, AsyncTholaClient
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import TholaRequestError
+
+from tests.thola_stub import TholaStub
+
+
+def post_all(api_host, bodies, concurrency=20, timeout=None, path="/read/cpu-load"):
+    async def run():
+        client = AsyncTholaClient(api_host, concurrency=concurrency, timeout=timeout)
+        try:
+            return await asyncio.gather(*[client.post(path, body) for body in bodies],
+                                        return_exceptions=True)
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+class AsyncTholaClientTests(TestCase):
+    def test_post(self):
+        with TholaStub({"/read/cpu-load": {"cpus": [{"load": 12.5}]}}) as stub:
+            result = post_all(stub.api_host, [{"device_data": {"ip_address": "10.0.0.1"}}])
+        self.assertEqual(json.loads(result[0]), {"cpus": [{"load": 12.5}]})
+        self.assertEqual(stub.requests, [("/read/cpu-load", {"device_data": {"ip_address": "10.0.0.1"}})])
+
+    def test_concurrency_limit(self):
+        with TholaStub({"/read/cpu-load": {"cpus": []}}, latency=0.02) as stub:
+            result = post_all(stub.api_host, [{"id": i} for i in range(100)], concurrency=5)
+        self.assertEqual(len([r for r in result if isinstance(r, bytes)]), 100)
+        self.assertLessEqual(stub.max_in_flight, 5)
+        self.assertLessEqual(len(stub.connections), 5)
+
+    def test_coalesce(self):
+        # identical requests in flight at the same time share one request
+        bodies = [{"device_data": {"ip_address": "10.0.0.1"}}] * 10 + [{"device_data": {"ip_address": "10.0.0.2"}}]
+        with TholaStub({"/read/cpu-load": {"cpus": []}}, latency=0.05) as stub:
+            result = post_all(stub.api_host, bodies)
+        self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(set(result), {b'{"cpus":[]}'})
+
+    def test_timeout(self):
+        with TholaStub({"/read/cpu-load": {"cpus": []}}, latency=0.5) as stub:
+            result = post_all(stub.api_host, [{}], timeout=0.05)
+        self.assertIsInstance(result[0], TholaRequestError)
+        self.assertEqual(str(result[0]), "Request to Thola API timed out")
+
+    def test_api_error(self):
+        with TholaStub({"/read/cpu-load": (400, {"message": "invalid request"})}) as stub:
+            result = post_all(stub.api_host, [{}])
+        self.assertEqual(str(result[0]), "invalid request")
+
+    def test_no_connection(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        result = post_all("http://127.0.0.1:%d" % port, [{}])
+        self.assertEqual(str(result[0]), "Can't connect to Thola API!")
+
+
+class AdaptiveLimiterTests(TestCase):
+    def test_increase_on_success(self):
+        limiter = AdaptiveLimiter(50, initial=10)
+        for i in range(100):
+            limiter.record(0.01, False)
+        self.assertGreater(limiter.limit, 10)
+        self.assertLessEqual(limiter.limit, 50)
+
+    def test_decrease_on_overload(self):
+        limiter = AdaptiveLimiter(50, initial=16)
+        for i in range(16):
+            limiter.record(0.01, False)
+        limit = limiter.limit
+        limiter.record(0.01, True)
+        self.assertAlmostEqual(limiter.limit, limit / 2.0)
+        # further errors within the same window don't reduce the limit again
+        for i in range(5):
+            limiter.record(0.01, True)
+        self.assertAlmostEqual(limiter.limit, limit / 2.0)
+
+    def test_decrease_on_latency_rise(self):
+        limiter = AdaptiveLimiter(50, initial=8)
+        for i in range(200):
+            limiter.record(0.01, False)
+        limit = limiter.limit
+        for i in range(int(limit)):
+            limiter.record(0.5, False)
+        self.assertLess(limiter.limit, limit)
+
+    def test_minimum(self):
+        limiter = AdaptiveLimiter(50, initial=4)
+        for i in range(100):
+            limiter.record(1, True)
+        self.assertEqual(limiter.limit, 1)
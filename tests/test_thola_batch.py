@@ -0,0 +1,88 @@
+import unittest
+from unittest import TestCase, mock
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import thola_client_found
+
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    from ansible.errors import AnsibleActionFail
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.playbook.play_context import PlayContext
+    from ansible.playbook.task import Task
+    from ansible.template import Templar
+    from ansible_collections.inexio.thola.plugins.action.thola_batch import ActionModule
+
+    ansible_found = True
+except ImportError:
+    ansible_found = False
+
+
+def run_batch(**args):
+    task = Task()
+    task.args = args
+    loader = DataLoader()
+    action = ActionModule(task, mock.MagicMock(), PlayContext(), loader, Templar(loader), None)
+    return action.run(task_vars={})
+
+
+@unittest.skipUnless(thola_client_found and ansible_found, "thola-client-module-python or ansible is not installed")
+class BatchTests(TestCase):
+    def test_results(self):
+        with TholaStub(canned_responses(), failing_hosts=["10.0.0.3"]) as stub:
+            result = run_batch(api_host=stub.api_host, operation="read_cpu_load",
+                               hosts=["10.0.0.1", {"host": "10.0.0.2", "community": "private", "port": 1161},
+                                      "10.0.0.3"])
+        self.assertFalse(result["changed"])
+        self.assertEqual(sorted(result["results"]), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(result["results"]["10.0.0.1"]["cpu_load"][0]["load"], 12.5)
+        self.assertEqual(result["failed_hosts"], {"10.0.0.3": "no response from device"})
+        snmp = dict((body["device_data"]["ip_address"], body["device_data"]["connection_data"]["snmp"])
+                    for path, body in stub.requests)
+        self.assertEqual((snmp["10.0.0.1"]["communities"], snmp["10.0.0.1"]["ports"]), (["public"], [161]))
+        # per device settings override the task wide ones
+        self.assertEqual((snmp["10.0.0.2"]["communities"], snmp["10.0.0.2"]["ports"]), (["private"], [1161]))
+
+    def test_credential_lists(self):
+        with TholaStub(canned_responses()) as stub:
+            result = run_batch(api_host=stub.api_host, operation="read_cpu_load",
+                               hosts=[{"host": "10.0.0.1", "community": ["public", "private"], "port": [161, "1161"]}])
+        self.assertEqual(sorted(result["results"]), ["10.0.0.1"])
+        snmp = stub.requests[0][1]["device_data"]["connection_data"]["snmp"]
+        self.assertEqual((snmp["communities"], snmp["versions"], snmp["ports"]),
+                         (["public", "private"], ["2c"], [161, 1161]))
+
+    def test_request(self):
+        with TholaStub(canned_responses()) as stub:
+            run_batch(api_host=stub.api_host, operation="check_cpu_load", hosts=["10.0.0.1"],
+                      request={"cpu_load_thresholds": {"warning_max": 80}})
+        self.assertEqual(stub.requests[0][1]["cpuLoadThresholds"], {"warningMax": 80})
+
+    def test_columns(self):
+        with TholaStub(canned_responses(3)) as stub:
+            result = run_batch(api_host=stub.api_host, operation="read_interfaces", hosts=["10.0.0.1"],
+                               output_format="columns")
+        interfaces = result["results"]["10.0.0.1"]["interfaces"]
+        self.assertEqual(interfaces["count"], 3)
+        self.assertEqual(interfaces["columns"][interfaces["keys"].index("if_index")], [0, 1, 2])
+
+    def test_duplicates(self):
+        with TholaStub(canned_responses()) as stub:
+            result = run_batch(api_host=stub.api_host, operation="read_cpu_load",
+                               hosts=["10.0.0.1", {"host": "10.0.0.1"}, "10.0.0.2"])
+        self.assertEqual(sorted(result["results"]), ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(len(stub.requests), 2)
+        with self.assertRaises(AnsibleActionFail):
+            run_batch(api_host="http://127.0.0.1:8237", operation="read_cpu_load",
+                      hosts=["10.0.0.1", {"host": "10.0.0.1", "community": "private"}])
+
+    def test_invalid(self):
+        with self.assertRaises(AnsibleActionFail):
+            run_batch(api_host="http://127.0.0.1:8237", operation="read_cpu_load", hosts=[{"community": "private"}])
+        with self.assertRaises(AnsibleActionFail):
+            run_batch(api_host="http://127.0.0.1:8237", operation="read_cpu_load", hosts=["10.0.0.1"],
+                      request={"unknown": 1})
+        for entry in ({"host": "10.0.0.1", "port": "abc"}, {"host": "10.0.0.1", "port": [161, None]},
+                      {"host": "10.0.0.1", "comunity": "private"}):
+            with self.assertRaises(AnsibleActionFail):
+                run_batch(api_host="http://127.0.0.1:8237", operation="read_cpu_load", hosts=[entry])
@@ -0,0 +1,185 @@
+"""Start-up and latency benchmarks of the modules.
+
+Needs pytest-benchmark and is skipped without it. Every facts module is
+measured in the phases of a run against a local stub of the Thola API:
+
+  import       fresh interpreter importing the module
+  request      building and serializing the request body
+  conversion   turning the JSON response into the module result, and for
+               comparison into the generated models
+  quotation    change_quotation_marks on the result
+  rates        interface counter rates, with and without numpy
+  total        complete module run in a fresh interpreter
+
+Modules that read interfaces are measured with 10, 1k and 50k interfaces.
+Run only the benchmarks, e.g. grouped by phase, with
+
+  python -m pytest tests/test_thola_benchmark.py --benchmark-group-by=group,param:case
+"""
+import collections
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests import MODULES_PATH, ROOT, RUN_MODULE
+from tests.thola_stub import TholaStub, canned_responses
+
+pytest.importorskip("pytest_benchmark")
+thola_client = pytest.importorskip("thola_client")
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (  # noqa: E402
+    OPERATIONS,
+    build_request,
+    decode_response,
+    serialize_request,
+)
+from ansible_collections.inexio.thola.plugins.module_utils import thola_rates  # noqa: E402
+from ansible_collections.inexio.thola.plugins.module_utils.thola_rates import (  # noqa: E402
+    compute_rates,
+    counter_columns,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_sanitize import change_quotation_marks  # noqa: E402
+
+
+INTERFACE_COUNTS = (10, 1000, 50000)
+INTERFACE_OPERATIONS = ("read_interfaces", "check_interface_metrics")
+
+# thola_batch and thola_identify_sweep are action plugins, their module
+# files only hold the documentation
+MODULES = sorted(name[:-3] for name in os.listdir(MODULES_PATH)
+                 if name.endswith(".py") and name not in ("thola_batch.py", "thola_identify_sweep.py"))
+
+
+def _operation(module):
+    operation = module[len("thola_"):-len("_facts")]
+    if module.endswith("_facts") and operation in OPERATIONS:
+        return operation
+    return None
+
+
+CASES = [(module, count)
+         for module in MODULES
+         for count in (INTERFACE_COUNTS if _operation(module) in INTERFACE_OPERATIONS else (10,))]
+OPERATION_CASES = [(module, count) for module, count in CASES if _operation(module)]
+
+
+def _case_id(case):
+    module, count = case
+    if _operation(module) in INTERFACE_OPERATIONS:
+        return "%s-%d" % (module, count)
+    return module
+
+
+# arguments the modules need besides api_host and host
+MODULE_ARGS = {"thola_check_identify_facts": {"vendor": "Cisco"}}
+
+# imports a module the way ansible runs it, without calling main
+IMPORT_MODULE = "import runpy, sys, tests; runpy.run_path(sys.argv[1])"
+
+
+def _python(code, *args):
+    return subprocess.run([sys.executable, "-c", code] + list(args), cwd=ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+
+def _response(module, count):
+    return json.dumps(canned_responses(count)[OPERATIONS[_operation(module)].path]).encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def stubs():
+    servers = {}
+    for count in INTERFACE_COUNTS:
+        servers[count] = TholaStub(interface_count=count).__enter__()
+    yield servers
+    for server in servers.values():
+        server.__exit__(None, None, None)
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import(benchmark, module):
+    benchmark.group = "import"
+    benchmark.pedantic(_python, args=(IMPORT_MODULE, os.path.join(MODULES_PATH, module + ".py")),
+                       rounds=5, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("case", OPERATION_CASES, ids=_case_id)
+def test_request(benchmark, case):
+    operation = _operation(case[0])
+    benchmark.group = "request"
+    body = benchmark(lambda: serialize_request(build_request(operation, "10.0.0.1")))
+    assert body["device_data"]["ip_address"] == "10.0.0.1"
+
+
+@pytest.mark.parametrize("case", OPERATION_CASES, ids=_case_id)
+def test_conversion(benchmark, case):
+    module, count = case
+    data = _response(module, count)
+    benchmark.group = "conversion"
+    benchmark.extra_info["interfaces"] = count
+    benchmark.pedantic(decode_response, args=(_operation(module), data), rounds=5 if count > 1000 else 20)
+
+
+# what ApiClient.deserialize expects from a response
+Response = collections.namedtuple("Response", ["data"])
+
+
+@pytest.mark.parametrize("case", OPERATION_CASES, ids=_case_id)
+def test_model_conversion(benchmark, case):
+    # the round trip through the generated models that decode_response replaced
+    module, count = case
+    response = Response(_response(module, count).decode("utf-8"))
+    model = OPERATIONS[_operation(module)].response
+    client = thola_client.ApiClient()
+    benchmark.group = "conversion"
+    benchmark.extra_info["interfaces"] = count
+    benchmark.pedantic(lambda: client.deserialize(response, model).to_dict(), rounds=3 if count > 1000 else 20)
+
+
+@pytest.mark.parametrize("case", OPERATION_CASES, ids=_case_id)
+def test_quotation(benchmark, case):
+    module, count = case
+    result = decode_response(_operation(module), _response(module, count))
+    benchmark.group = "quotation"
+    benchmark.extra_info["interfaces"] = count
+    # change_quotation_marks works in place, every round gets its own copy
+    benchmark.pedantic(change_quotation_marks, setup=lambda: ((json.loads(json.dumps(result)),), {}),
+                       rounds=5 if count > 1000 else 20)
+
+
+@pytest.mark.parametrize("numpy", [False, True], ids=["python", "numpy"])
+@pytest.mark.parametrize("count", INTERFACE_COUNTS)
+def test_rates(benchmark, monkeypatch, numpy, count):
+    if numpy and not thola_rates.numpy_found:
+        pytest.skip("numpy is not installed")
+    monkeypatch.setattr(thola_rates, "numpy_found", numpy)
+    interfaces = [{"if_index": i, "if_hc_in_octets": i * 1000, "if_hc_out_octets": i * 2000, "if_in_errors": i}
+                  for i in range(count)]
+    previous = counter_columns(interfaces, 0)
+    for interface in interfaces:
+        interface["if_hc_in_octets"] += 600
+    current = counter_columns(interfaces, 60)
+    benchmark.group = "rates"
+    benchmark.extra_info["interfaces"] = count
+    rates = benchmark(compute_rates, previous, current)
+    assert rates["if_hc_in_octets"][count - 1] == 10.0
+
+
+@pytest.mark.parametrize("case", CASES, ids=_case_id)
+def test_total(benchmark, case, stubs, tmp_path):
+    module, count = case
+    if module.endswith("_facts"):
+        args = dict(MODULE_ARGS.get(module, {}), api_host=stubs[count].api_host, host="10.0.0.1")
+    else:
+        args = {"socket": str(tmp_path / "worker.sock"), "state": "stopped"}
+    args_file = tmp_path / "args.json"
+    args_file.write_text(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+    benchmark.group = "total"
+    benchmark.extra_info["interfaces"] = count
+    process = benchmark.pedantic(_python, args=(RUN_MODULE, os.path.join(MODULES_PATH, module + ".py"), str(args_file)),
+                                 rounds=3 if count > 1000 else 5, warmup_rounds=1)
+    result = json.loads(process.stdout.decode("utf-8").strip().splitlines()[-1])
+    assert not result.get("failed"), result
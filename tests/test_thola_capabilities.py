@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_capabilities import (
+    capability_key,
+    load_components,
+    save_components,
+    thola_client_found,
+    unavailable_component,
+)
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+
+REQUEST_ARGS = {"host": "10.0.0.1", "community": "public", "version": "2c", "port": 161}
+
+
+def device_responses(components):
+    responses = canned_responses()
+    responses["/read/available-components"] = {"availableComponents": components}
+    return responses
+
+
+class CapabilityCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_roundtrip(self):
+        key = capability_key(REQUEST_ARGS)
+        self.assertIsNone(load_components(self.directory, key))
+        save_components(self.directory, key, ["cpu", "interfaces"])
+        self.assertEqual(load_components(self.directory, key), ["cpu", "interfaces"])
+        self.assertIsNone(load_components(self.directory, key, ttl=-1))
+        # the default SNMP settings are part of the key
+        self.assertEqual(capability_key({"host": "10.0.0.1"}), key)
+        self.assertNotEqual(capability_key(dict(REQUEST_ARGS, community="private")), key)
+
+    @unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+    def test_unavailable_component(self):
+        with TholaStub(device_responses(["cpu", "interfaces"])) as stub:
+            self.assertEqual(unavailable_component("read_ups", stub.api_host, REQUEST_ARGS, self.directory), "ups")
+            self.assertIsNone(unavailable_component("check_cpu_load", stub.api_host, REQUEST_ARGS, self.directory))
+            self.assertIsNone(unavailable_component("read_count_interfaces", stub.api_host, REQUEST_ARGS,
+                                                    self.directory))
+            # identify works on every device and doesn't need the cache
+            self.assertIsNone(unavailable_component("identify", stub.api_host, REQUEST_ARGS, self.directory))
+        # the components were read once and then served from the cache
+        self.assertEqual([path for path, body in stub.requests], ["/read/available-components"])
+
+    @unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+    def test_check_mode(self):
+        with TholaStub(device_responses(["cpu"])) as stub:
+            self.assertEqual(unavailable_component("read_ups", stub.api_host, REQUEST_ARGS, self.directory,
+                                                   check_mode=True), "ups")
+        self.assertIsNone(load_components(self.directory, capability_key(REQUEST_ARGS)))
+
+    @unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+    def test_unknown_on_error(self):
+        with TholaStub({}) as stub:
+            self.assertIsNone(unavailable_component("read_ups", stub.api_host, REQUEST_ARGS, self.directory))
+        self.assertIsNone(load_components(self.directory, capability_key(REQUEST_ARGS)))
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class CapabilityModuleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, name, **args):
+        args = dict(args, host="10.0.0.1", capability_cache=True,
+                    capability_cache_path=os.path.join(self.directory, "capabilities"))
+        return run_module(name, args, self.directory)
+
+    def test_skip(self):
+        # a device without UPS would let the UPS read run into the timeout
+        responses = device_responses(["cpu", "interfaces"])
+        responses["/read/ups"] = (500, {"message": "timeout"})
+        with TholaStub(responses, latency=0.05) as stub:
+            first = self.run_module("thola_read_ups_facts", api_host=stub.api_host)
+            second = self.run_module("thola_check_ups_facts", api_host=stub.api_host)
+            cpu = self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host)
+        self.assertTrue(first["skipped"])
+        self.assertEqual(first["msg"], "The device has no ups component")
+        self.assertTrue(second["skipped"])
+        self.assertFalse(cpu.get("skipped"))
+        self.assertIn("cpu_load", cpu["ansible_facts"])
+        self.assertEqual([path for path, body in stub.requests], ["/read/available-components", "/read/cpu-load"])
+
+    def test_fill_from_available_components(self):
+        with TholaStub(device_responses(["interfaces"])) as stub:
+            self.run_module("thola_read_available_components_facts", api_host=stub.api_host)
+            result = self.run_module("thola_check_cpu_load_facts", api_host=stub.api_host)
+        self.assertTrue(result["skipped"])
+        self.assertEqual([path for path, body in stub.requests], ["/read/available-components"])
+
+    def test_module_check_mode(self):
+        with TholaStub(device_responses(["cpu"])) as stub:
+            for name in ("thola_read_available_components_facts", "thola_read_all_facts"):
+                self.run_module(name, api_host=stub.api_host, _ansible_check_mode=True)
+            ups = self.run_module("thola_read_ups_facts", api_host=stub.api_host, _ansible_check_mode=True)
+        # the device is still checked, only the cache isn't written
+        self.assertTrue(ups["skipped"])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "capabilities")))
+
+    def test_read_all(self):
+        with TholaStub(device_responses(["cpu", "memory"])) as stub:
+            result = self.run_module("thola_read_all_facts", api_host=stub.api_host, components=["cpu", "ups"])
+            available = self.run_module("thola_read_all_facts", api_host=stub.api_host)
+        self.assertEqual(result["components"], ["cpu"])
+        self.assertEqual(result["component_errors"], {"ups": "The device has no ups component"})
+        self.assertEqual(available["components"], ["cpu", "memory"])
+        self.assertEqual(sorted(path for path, body in stub.requests),
+                         ["/read/available-components", "/read/cpu-load", "/read/cpu-load", "/read/memory-usage"])
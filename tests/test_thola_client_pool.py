@@ -0,0 +1,63 @@
+import os
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_client_pool import (
+    DEFAULT_POOL_SIZE,
+    _get_rest_client,
+    clear,
+    open_request,
+    pool_size_from_env,
+    post_json,
+    thola_client_found,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import build_request, raw_operation
+
+from tests.thola_stub import TholaStub
+
+RESPONSES = {"/read/cpu-load": {"cpu_load": [{"load": 12.5}]}}
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class ClientPoolTests(TestCase):
+    def setUp(self):
+        clear()
+        self.addCleanup(clear)
+
+    def test_reuse(self):
+        with TholaStub(RESPONSES) as stub:
+            client = _get_rest_client(stub.api_host, None)
+            self.assertIs(_get_rest_client(stub.api_host, None), client)
+            self.assertIsNot(_get_rest_client(stub.api_host, 2), client)
+            body = build_request("read_cpu_load", "10.0.0.1")
+            for i in range(3):
+                raw_operation("read_cpu_load", stub.api_host, body)
+            # all kinds of requests share the pool
+            post_json(stub.api_host, "/read/cpu-load", body)
+            response = open_request(stub.api_host, "/read/cpu-load", body)
+            response.read()
+            response.release_conn()
+        self.assertEqual(len(stub.requests), 5)
+        self.assertEqual(len(stub.connections), 1)
+
+    def test_clear(self):
+        with TholaStub(RESPONSES) as stub:
+            client = _get_rest_client(stub.api_host, None)
+            body = build_request("read_cpu_load", "10.0.0.1")
+            raw_operation("read_cpu_load", stub.api_host, body)
+            clear()
+            self.assertIsNot(_get_rest_client(stub.api_host, None), client)
+            self.assertEqual(raw_operation("read_cpu_load", stub.api_host, body), {"cpu_load": [{"load": 12.5}]})
+        # the pool was reset, so the second request opened a new connection
+        self.assertEqual(len(stub.connections), 2)
+
+    def test_pool_size(self):
+        environ = dict(os.environ)
+        self.addCleanup(os.environ.clear)
+        self.addCleanup(os.environ.update, environ)
+        os.environ["THOLA_POOL_SIZE"] = "3"
+        self.assertEqual(pool_size_from_env(), 3)
+        configuration, rest_client = _get_rest_client("http://127.0.0.1:8237", None)
+        self.assertEqual(configuration.connection_pool_maxsize, 3)
+        os.environ["THOLA_POOL_SIZE"] = "many"
+        self.assertEqual(pool_size_from_env(), DEFAULT_POOL_SIZE)
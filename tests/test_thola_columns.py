@@ -0,0 +1,52 @@
+import json
+import tracemalloc
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import ColumnTable, to_columns, to_rows
+from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import from_wire
+
+from tests.test_change_quotation_mark import interfaces_payload
+from tests.test_thola_raw import interfaces_response
+
+
+class ColumnTableTests(TestCase):
+    def test_round_trip(self):
+        rows = interfaces_payload(100)["interfaces"]
+        table = to_columns(rows)
+        self.assertEqual(len(table["keys"]), len(rows[0]))
+        self.assertEqual(table["columns"][table["keys"].index("if_index")], list(range(100)))
+        self.assertEqual(to_rows(json.loads(json.dumps(table))), rows)
+
+    def test_missing_fields(self):
+        rows = [{"a": 1}, {"a": None, "b": 2}, {}, {"b": 3, "c": [1]}]
+        table = to_columns(rows)
+        self.assertEqual(to_rows(table), rows)
+        self.assertEqual(to_rows(to_columns([])), [])
+        self.assertEqual(to_rows(to_columns([{}, {}])), [{}, {}])
+
+    def test_shared_keys(self):
+        first = ColumnTable.from_rows([{"if_index": 1, "if_name": "a"}])
+        second = ColumnTable.from_rows([{"if_index": 2, "if_name": "b"}])
+        self.assertIs(first.keys, second.keys)
+
+    def test_nested(self):
+        rows = [{"if_index": 1, "ethernet_like": {"errors": 1}, "radio": None},
+                {"if_index": 2, "ethernet_like": None, "radio": None},
+                {"if_index": 3, "ethernet_like": {"errors": None, "drops": 2}, "radio": None}]
+        table = to_columns(rows)
+        self.assertIsNone(table["columns"][table["keys"].index("radio")])
+        self.assertEqual(to_rows(json.loads(json.dumps(table))), rows)
+
+    def test_memory(self):
+        data = json.dumps(interfaces_response(2000))
+        tracemalloc.start()
+        try:
+            rows = from_wire(json.loads(data), "ReadInterfacesResponse")["interfaces"]
+            rows_size = tracemalloc.get_traced_memory()[0]
+            table = ColumnTable.from_rows(rows)
+            del rows
+            table_size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(table.count, 2000)
+        self.assertLess(table_size * 3, rows_size)
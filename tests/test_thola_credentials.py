@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_credentials import (
+    normalize_credentials,
+    snmp_credentials,
+    thola_client_found,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import TholaRequestError
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+
+def device_responses(community="private", version="2c", port=161):
+    responses = canned_responses()
+    responses["/check/snmp"] = dict(responses["/check/snmp"], successful_snmp_credentials={
+        "community": community, "version": version, "port": port})
+    return responses
+
+
+def snmp_data(body):
+    return body["device_data"]["connection_data"]["snmp"]
+
+
+class NormalizeTests(TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_credentials("public", "2c", 161), (["public"], ["2c"], [161]))
+        self.assertEqual(normalize_credentials(["a", "b"], [1, "2c"], ["161", 1161]),
+                         (["a", "b"], ["1", "2c"], [161, 1161]))
+        with self.assertRaises(TholaRequestError):
+            normalize_credentials("public", "2c", "snmp")
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class CredentialCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_single(self):
+        with TholaStub(device_responses()) as stub:
+            credentials = snmp_credentials(stub.api_host, "10.0.0.1", "public", "2c", "161", self.directory)
+        self.assertEqual(credentials, ("public", "2c", 161))
+        self.assertEqual(stub.requests, [])
+
+    def test_probe(self):
+        with TholaStub(device_responses()) as stub:
+            first = snmp_credentials(stub.api_host, "10.0.0.1", ["public", "private"], ["2c", "3"], 161,
+                                     self.directory, discover_timeout=5)
+            second = snmp_credentials(stub.api_host, "10.0.0.1", ["public", "private"], ["2c", "3"], 161,
+                                      self.directory)
+            # other credentials are a different cache entry
+            snmp_credentials(stub.api_host, "10.0.0.1", ["public", "other"], "2c", 161, self.directory)
+        self.assertEqual(first, ("private", "2c", 161))
+        self.assertEqual(second, first)
+        self.assertEqual([path for path, body in stub.requests], ["/check/snmp", "/check/snmp"])
+        snmp = snmp_data(stub.requests[0][1])
+        self.assertEqual((snmp["communities"], snmp["versions"], snmp["ports"]),
+                         (["public", "private"], ["2c", "3"], [161]))
+        self.assertEqual(snmp["discoverTimeout"], 5)
+
+    def test_check_mode(self):
+        with TholaStub(device_responses()) as stub:
+            for i in range(2):
+                credentials = snmp_credentials(stub.api_host, "10.0.0.1", ["public", "private"], "2c", 161,
+                                               self.directory, check_mode=True)
+                self.assertEqual(credentials, ("private", "2c", 161))
+        # nothing was cached, so the second call probed again
+        self.assertEqual([path for path, body in stub.requests], ["/check/snmp", "/check/snmp"])
+
+    def test_no_working_credentials(self):
+        responses = canned_responses()
+        responses["/check/snmp"] = dict(responses["/check/snmp"], status_code=2, successful_snmp_credentials=None)
+        with TholaStub(responses) as stub:
+            with self.assertRaises(TholaRequestError):
+                snmp_credentials(stub.api_host, "10.0.0.1", ["a", "b"], "2c", 161, self.directory)
+            # nothing was cached
+            with self.assertRaises(TholaRequestError):
+                snmp_credentials(stub.api_host, "10.0.0.1", ["a", "b"], "2c", 161, self.directory)
+        self.assertEqual(len(stub.requests), 2)
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class CredentialModuleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, name, **args):
+        args = dict(args, host="10.0.0.1", snmp_credential_cache_path=os.path.join(self.directory, "credentials"))
+        return run_module(name, args, self.directory)
+
+    def test_modules(self):
+        communities = ["public", "private"]
+        with TholaStub(device_responses()) as stub:
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host, community=communities)
+            self.run_module("thola_check_cpu_load_facts", api_host=stub.api_host, community=communities)
+            result = self.run_module("thola_read_all_facts", api_host=stub.api_host, community=communities,
+                                     components=["memory"])
+        self.assertEqual(sorted(result["ansible_facts"]), ["memory_usage"])
+        self.assertEqual([path for path, body in stub.requests],
+                         ["/check/snmp", "/read/cpu-load", "/check/cpu-load", "/read/memory-usage"])
+        # only the working community is sent after the probe
+        for path, body in stub.requests[1:]:
+            self.assertEqual(snmp_data(body)["communities"], ["private"])
+
+    def test_check_snmp_fills_cache(self):
+        with TholaStub(device_responses(version="1")) as stub:
+            self.run_module("thola_check_snmp_facts", api_host=stub.api_host, version=["2c", "1"])
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host, version=["2c", "1"])
+        self.assertEqual([path for path, body in stub.requests], ["/check/snmp", "/read/cpu-load"])
+        self.assertEqual(snmp_data(stub.requests[0][1])["versions"], ["2c", "1"])
+        self.assertEqual(snmp_data(stub.requests[1][1])["versions"], ["1"])
+
+    def test_module_check_mode(self):
+        with TholaStub(device_responses()) as stub:
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host, community=["public", "private"],
+                            _ansible_check_mode=True)
+            self.run_module("thola_read_all_facts", api_host=stub.api_host, community=["public", "private"],
+                            components=["memory"], _ansible_check_mode=True)
+        self.assertEqual([path for path, body in stub.requests],
+                         ["/check/snmp", "/read/cpu-load", "/check/snmp", "/read/memory-usage"])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "credentials")))
+
+    def test_no_working_credentials(self):
+        responses = canned_responses()
+        responses["/check/snmp"] = dict(responses["/check/snmp"], status_code=2, successful_snmp_credentials=None)
+        with TholaStub(responses) as stub:
+            result = self.run_module("thola_identify_facts", api_host=stub.api_host, port=[161, 1161])
+        self.assertTrue(result["failed"])
+        self.assertEqual(result["msg"], "None of the SNMP credentials work for 10.0.0.1")
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_discovery import (
+    DEFAULT_DISCOVER_PARALLEL_REQUEST,
+    DEFAULT_DISCOVER_TIMEOUT,
+    MAX_DISCOVER_TIMEOUT,
+    DiscoveryHistory,
+)
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+class DiscoveryHistoryTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def history(self):
+        return DiscoveryHistory(self.directory, "10.0.0.1", 161)
+
+    def test_defaults(self):
+        history = self.history()
+        self.assertEqual(history.discover_timeout, DEFAULT_DISCOVER_TIMEOUT)
+        self.assertEqual(history.discover_parallel_request, DEFAULT_DISCOVER_PARALLEL_REQUEST)
+
+    def test_failure(self):
+        self.history().record(2, 5, status=500)
+        history = self.history()
+        self.assertEqual((history.discover_timeout, history.discover_parallel_request), (4, 2))
+        history.record(20, 1, status=500)
+        history = self.history()
+        self.assertEqual((history.discover_timeout, history.discover_parallel_request), (MAX_DISCOVER_TIMEOUT, 1))
+        self.assertEqual(history.failures, 2)
+        # invalid requests say nothing about the device
+        history.record(2, 5, status=400)
+        self.assertEqual(self.history().discover_timeout, MAX_DISCOVER_TIMEOUT)
+
+    def test_success(self):
+        self.history().record(8, 5, 0.2)
+        history = self.history()
+        self.assertEqual((history.discover_timeout, history.discover_parallel_request), (7, 6))
+        for i in range(10):
+            history.record(history.discover_timeout, history.discover_parallel_request, 1.2)
+        history = self.history()
+        # the timeout stays above twice the slowest request
+        self.assertEqual(history.discover_timeout, 3)
+        self.assertEqual(history.discover_parallel_request, 16)
+        self.assertEqual(len(history.latencies), 10)
+
+    def test_other_device(self):
+        self.history().record(2, 5, status=500)
+        self.assertEqual(DiscoveryHistory(self.directory, "10.0.0.2", 161).discover_timeout, 2)
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class DiscoveryHistoryModuleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, name, **args):
+        args = dict(args, host="10.0.0.1", discovery_history=True,
+                    discovery_history_path=os.path.join(self.directory, "history"))
+        return run_module(name, args, self.directory)
+
+    def test_history(self):
+        responses = canned_responses()
+        responses["/read/ups"] = (500, {"message": "timeout"})
+        with TholaStub(responses) as stub:
+            self.run_module("thola_read_ups_facts", api_host=stub.api_host)
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host)
+            self.run_module("thola_read_all_facts", api_host=stub.api_host, components=["memory"])
+            # explicitly given settings are kept
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host, discover_timeout=9)
+        settings = [(snmp["discoverTimeout"], snmp["discoverParallelRequests"])
+                    for snmp in (body["device_data"]["connection_data"]["snmp"] for path, body in stub.requests)]
+        self.assertEqual(settings, [(2, 5), (4, 2), (3, 3), (9, 4)])
+
+    def test_credential_probe(self):
+        # the probe is sent with the settings learned for the device as well
+        responses = canned_responses()
+        responses["/read/ups"] = (500, {"message": "timeout"})
+        responses["/check/snmp"] = dict(responses["/check/snmp"], successful_snmp_credentials={
+            "community": "private", "version": "2c", "port": 161})
+        credentials = os.path.join(self.directory, "credentials")
+        with TholaStub(responses) as stub:
+            self.run_module("thola_read_ups_facts", api_host=stub.api_host, port=[161])
+            self.run_module("thola_read_cpu_load_facts", api_host=stub.api_host, community=["public", "private"],
+                            snmp_credential_cache_path=credentials)
+            self.run_module("thola_read_all_facts", api_host=stub.api_host, community=["public", "other"],
+                            components=["memory"], snmp_credential_cache_path=credentials)
+        settings = [(path, snmp["discoverTimeout"], snmp["discoverParallelRequests"])
+                    for path, snmp in ((path, body["device_data"]["connection_data"]["snmp"])
+                                       for path, body in stub.requests)]
+        self.assertEqual(settings, [("/read/ups", 2, 5), ("/check/snmp", 4, 2), ("/read/cpu-load", 4, 2),
+                                    ("/check/snmp", 3, 3), ("/read/memory-usage", 3, 3)])
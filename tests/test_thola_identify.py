@@ -3,8 +3,15 @@ from unittest import TestCase
 
 import urllib3
 
+from tests.thola_stub import TholaStub
+
 
 class IdentifyTests(TestCase):
+    def start_stub(self, responses=None):
+        stub = TholaStub(responses).__enter__()
+        self.addCleanup(stub.__exit__, None, None, None)
+        return stub
+
     def test_no_connection(self):
         import thola_client
         import thola_client.api.identify_api as identify
@@ -55,7 +62,7 @@ class IdentifyTests(TestCase):
         sys.stderr = None
 
         ansible_host = "demo-snmp.thola.io"
-        api_host = "http://127.0.0.1:8237"
+        api_host = self.start_stub().api_host
         community = "public"
         version = "2c"
         port = 161
@@ -99,7 +106,7 @@ class IdentifyTests(TestCase):
         sys.stderr = None
 
         ansible_host = "demo-snmp.thola.io"
-        api_host = "http://127.0.0.1:8237"
+        api_host = self.start_stub({"/identify": {"class": "linux", "properties": {}}}).api_host
         community = "public"
         version = "2c"
         port = 161
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import TestCase, mock
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_identify_cache import (
+    cache_facts,
+    cache_key,
+    get_cached_facts,
+    invalidate_cached_facts,
+)
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+FACTS = {"ansible_net_vendor": "Cisco", "ansible_net_model": "7206VXR"}
+
+
+class IdentifyCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "cache")
+
+    def test_key(self):
+        key = cache_key("10.0.0.1", 161, "secret", "2c")
+        self.assertEqual(key, cache_key("10.0.0.1", 161, "secret", "2c"))
+        self.assertNotEqual(key, cache_key("10.0.0.1", 161, "public", "2c"))
+        self.assertNotEqual(key, cache_key("10.0.0.1", 1161, "secret", "2c"))
+        cache_facts(self.path, key, FACTS)
+        # the community is only stored hashed
+        with open(os.path.join(self.path, key + ".json")) as f:
+            self.assertNotIn("secret", f.read())
+
+    def test_ttl(self):
+        key = cache_key("10.0.0.1", 161, "public", "2c")
+        self.assertIsNone(get_cached_facts(self.path, key))
+        cache_facts(self.path, key, FACTS)
+        self.assertEqual(get_cached_facts(self.path, key), FACTS)
+        with mock.patch("time.time", return_value=time.time() + 120):
+            self.assertEqual(get_cached_facts(self.path, key, ttl=300), FACTS)
+            self.assertIsNone(get_cached_facts(self.path, key, ttl=60))
+
+    def test_invalidate(self):
+        key = cache_key("10.0.0.1", 161, "public", "2c")
+        cache_facts(self.path, key, FACTS)
+        invalidate_cached_facts(self.path, key)
+        self.assertIsNone(get_cached_facts(self.path, key))
+        # invalidating a missing entry is fine
+        invalidate_cached_facts(self.path, key)
+
+    def test_atomic_write(self):
+        key = cache_key("10.0.0.1", 161, "public", "2c")
+        cache_facts(self.path, key, FACTS)
+        cache_facts(self.path, key, dict(FACTS, ansible_net_model="7204VXR"))
+        # entries are replaced by renaming a complete file, no temporary file is left
+        self.assertEqual(os.listdir(self.path), [key + ".json"])
+        self.assertEqual(get_cached_facts(self.path, key)["ansible_net_model"], "7204VXR")
+        with open(os.path.join(self.path, key + ".json"), "w") as f:
+            f.write("{\"timestamp\": ")
+        self.assertIsNone(get_cached_facts(self.path, key))
+
+    def test_unwritable(self):
+        blocked = os.path.join(self.directory, "file")
+        open(blocked, "w").close()
+        # a cache that can't be written doesn't fail the identify
+        cache_facts(os.path.join(blocked, "cache"), "key", FACTS)
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class IdentifyModuleCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, **args):
+        args = dict(args, host="10.0.0.1", cache_path=os.path.join(self.directory, "cache"))
+        return run_module("thola_identify_facts", args, self.directory)
+
+    def test_cache(self):
+        with TholaStub(canned_responses()) as stub:
+            uncached = self.run_module(api_host=stub.api_host)
+            first = self.run_module(api_host=stub.api_host, cache=True)
+            second = self.run_module(api_host=stub.api_host, cache=True)
+            invalidated = self.run_module(api_host=stub.api_host, cache=True, invalidate_cache=True)
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual([uncached["cached"], first["cached"], second["cached"], invalidated["cached"]],
+                         [False, False, True, False])
+        self.assertEqual(second["ansible_facts"], first["ansible_facts"])
+        self.assertEqual(second["ansible_facts"]["ansible_net_vendor"], "Cisco")
+
+    def test_check_mode(self):
+        with TholaStub(canned_responses()) as stub:
+            self.run_module(api_host=stub.api_host, cache=True, _ansible_check_mode=True)
+            self.assertFalse(os.path.exists(os.path.join(self.directory, "cache")))
+            self.run_module(api_host=stub.api_host, cache=True)
+            invalidated = self.run_module(api_host=stub.api_host, cache=True, invalidate_cache=True,
+                                          _ansible_check_mode=True)
+            cached = self.run_module(api_host=stub.api_host, cache=True)
+        self.assertFalse(invalidated["cached"])
+        # the entry survived the invalidation in check mode
+        self.assertTrue(cached["cached"])
+        self.assertEqual(len(stub.requests), 3)
@@ -0,0 +1,84 @@
+import unittest
+from unittest import TestCase, mock
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import run_operations
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    expand_targets,
+    thola_client_found,
+)
+
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    from ansible.errors import AnsibleActionFail
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.playbook.play_context import PlayContext
+    from ansible.playbook.task import Task
+    from ansible.template import Templar
+    from ansible_collections.inexio.thola.plugins.action.thola_identify_sweep import ActionModule
+
+    ansible_found = True
+except ImportError:
+    ansible_found = False
+
+
+def run_sweep(**args):
+    task = Task()
+    task.args = args
+    loader = DataLoader()
+    action = ActionModule(task, mock.MagicMock(), PlayContext(), loader, Templar(loader), None)
+    return action.run(task_vars={})
+
+
+class ExpandTargetsTests(TestCase):
+    def test_expand(self):
+        self.assertEqual(expand_targets(["10.0.0.0/30", "10.0.0.1", "10.0.0.9/32", "router"]),
+                         ["10.0.0.1", "10.0.0.2", "10.0.0.9", "router"])
+
+    def test_max_addresses(self):
+        self.assertEqual(len(expand_targets(["10.0.0.0/24"], max_addresses=256)), 254)
+        # rejected before it is expanded
+        with self.assertRaises(ValueError):
+            expand_targets(["2001:db8::/64"])
+        # the limit is for all entries together
+        with self.assertRaises(ValueError):
+            expand_targets(["10.0.0.0/24", "10.0.1.1"], max_addresses=256)
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class StreamTests(TestCase):
+    def test_lazy_bodies(self):
+        consumed = []
+        completed = []
+
+        def bodies():
+            for i in range(50):
+                consumed.append(i)
+                yield {"device_data": {"ip_address": "10.0.0.%d" % i}}
+
+        def callback(index, ok, value):
+            # only a window of the concurrency is taken ahead of the responses
+            completed.append(index)
+            self.assertLessEqual(len(consumed), len(completed) + 5)
+
+        with TholaStub(canned_responses(), latency=0.01) as stub:
+            results = run_operations(stub.api_host, "identify", bodies(), concurrency=5, callback=callback)
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(ok for ok, value in results))
+        self.assertLessEqual(stub.max_in_flight, 5)
+
+
+@unittest.skipUnless(thola_client_found and ansible_found, "thola-client-module-python or ansible is not installed")
+class SweepTests(TestCase):
+    def test_sweep(self):
+        with TholaStub(canned_responses(), failing_hosts=["10.0.0.2"]) as stub:
+            result = run_sweep(api_host=stub.api_host, networks=["10.0.0.0/29"])
+        self.assertEqual(result["scanned"], 6)
+        self.assertEqual(result["identified"], 5)
+        self.assertNotIn("10.0.0.2", result["results"])
+
+    def test_max_addresses(self):
+        with self.assertRaises(AnsibleActionFail):
+            run_sweep(api_host="http://127.0.0.1:8237", networks=["10.0.0.0/8"])
+        with self.assertRaises(AnsibleActionFail):
+            run_sweep(api_host="http://127.0.0.1:8237", networks=["10.0.0.0/29"], max_addresses=4)
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+
+from tests import COLLECTION_PATH, ROOT
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+ANSIBLE_INVENTORY = os.path.join(os.path.dirname(sys.executable), "ansible-inventory")
+
+
+def plain(value):
+    # ansible-inventory marks untrusted strings as {"__ansible_unsafe": value}
+    if isinstance(value, dict):
+        if list(value) == ["__ansible_unsafe"]:
+            return value["__ansible_unsafe"]
+        return dict((key, plain(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+@unittest.skipUnless(thola_client_found and os.path.exists(ANSIBLE_INVENTORY),
+                     "thola-client-module-python or ansible is not installed")
+class InventoryTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        # ansible loads the plugin from the collection path, the plugin name
+        # inexio.thola.thola has to resolve to this checkout
+        namespace = os.path.join(self.directory, "ansible_collections", "inexio")
+        os.makedirs(namespace)
+        os.symlink(COLLECTION_PATH, os.path.join(namespace, "thola"))
+
+    def inventory(self, config, *options):
+        path = os.path.join(self.directory, "thola.yml")
+        with open(path, "w") as f:
+            json.dump(dict(config, plugin="inexio.thola.thola"), f)
+        env = dict(os.environ, ANSIBLE_COLLECTIONS_PATH=self.directory,
+                   ANSIBLE_INVENTORY_ENABLED="inexio.thola.thola")
+        process = subprocess.run([ANSIBLE_INVENTORY, "-i", path, "--list"] + list(options), cwd=ROOT, env=env,
+                                 stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(process.returncode, 0, process.stderr.decode("utf-8"))
+        return plain(json.loads(process.stdout.decode("utf-8")))
+
+    def test_groups(self):
+        with TholaStub(canned_responses(), failing_hosts=["10.0.0.2"]) as stub:
+            inventory = self.inventory({"api_host": stub.api_host, "hosts": ["10.0.0.0/30", "10.0.0.1"],
+                                        "keyed_groups": [{"key": "ansible_net_serialnum", "prefix": "serial"}]})
+        # the /30 holds two hosts, duplicates are identified once
+        self.assertEqual(sorted(body["device_data"]["ip_address"] for path, body in stub.requests),
+                         ["10.0.0.1", "10.0.0.2"])
+        hostvars = inventory["_meta"]["hostvars"]
+        # devices that could not be identified are left out
+        self.assertEqual(sorted(hostvars), ["10.0.0.1"])
+        self.assertEqual(hostvars["10.0.0.1"]["ansible_host"], "10.0.0.1")
+        self.assertEqual(hostvars["10.0.0.1"]["ansible_net_vendor"], "Cisco")
+        for group in ("os_ios", "vendor_cisco", "model_series_7206", "serial_4279256517"):
+            self.assertEqual(inventory[group]["hosts"], ["10.0.0.1"], group)
+
+    def test_cache(self):
+        config = {"hosts": ["10.0.0.1"], "cache": True, "cache_plugin": "jsonfile",
+                  "cache_connection": os.path.join(self.directory, "cache")}
+        with TholaStub(canned_responses()) as stub:
+            first = self.inventory(dict(config, api_host=stub.api_host))
+            second = self.inventory(dict(config, api_host=stub.api_host))
+            self.assertEqual(len(stub.requests), 1)
+            self.inventory(dict(config, api_host=stub.api_host), "--flush-cache")
+            self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(second, first)
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+
+from tests import COLLECTION_PATH, ROOT
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+# imports a module like ansible does, without running it, and reports
+# which generated thola_client modules were loaded; the import time is
+# measured by the benchmarks
+IMPORT_MODULE = """
+import json, runpy, sys
+import tests
+if sys.argv[2] == "eager":
+    import thola_client
+runpy.run_path(sys.argv[1])
+print(json.dumps({"modules": sorted(m for m in sys.modules if m.startswith("thola_client"))}))
+"""
+
+LAZY_CLIENT = """
+import json
+import tests
+from ansible_collections.inexio.thola.plugins.module_utils import thola_lazy
+import thola_client
+from thola_client.models import ReadUPSRequest
+model = thola_client.models.IdentifyResponse
+response = thola_client.ApiClient().deserialize(type("R", (), {"data": '{"class": "ios"}'})(), "IdentifyResponse")
+print(json.dumps({"class": response._class, "request": ReadUPSRequest.__name__, "exported": "ReadUPSResponse" in dir(thola_client.models)}))
+"""
+
+# runs a module and reports the generated model modules it loaded once it exits
+RUN_MODULE = """
+import atexit, json, runpy, sys
+import tests
+atexit.register(lambda: sys.__stdout__.write(
+    "\\n" + json.dumps(sorted(m for m in sys.modules if m.startswith("thola_client.models."))) + "\\n"))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def run_python(code, *args):
+    output = subprocess.check_output([sys.executable, "-c", code] + list(args), cwd=ROOT)
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class LazyImportTests(TestCase):
+    def test_module_imports(self):
+        module = os.path.join(COLLECTION_PATH, "plugins", "modules", "thola_read_ups_facts.py")
+        lazy = run_python(IMPORT_MODULE, module, "lazy")
+        eager = run_python(IMPORT_MODULE, module, "eager")
+        lazy_models = [m for m in lazy["modules"] if m.startswith("thola_client.models.")]
+        eager_models = [m for m in eager["modules"] if m.startswith("thola_client.models.")]
+        # importing the module loads no model classes at all
+        self.assertEqual(lazy_models, [])
+        self.assertGreater(len(eager_models), 70)
+
+    def test_compatible(self):
+        result = run_python(LAZY_CLIENT)
+        self.assertEqual(result, {"class": "ios", "request": "ReadUPSRequest", "exported": True})
+
+    def test_module_run(self):
+        # the request is built as plain JSON, so running a module doesn't
+        # load any model classes either
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        module = os.path.join(COLLECTION_PATH, "plugins", "modules", "thola_check_ups_facts.py")
+        args = os.path.join(directory, "args.json")
+        with TholaStub(canned_responses()) as stub:
+            with open(args, "w") as f:
+                json.dump({"ANSIBLE_MODULE_ARGS": {"api_host": stub.api_host, "host": "10.0.0.1"}}, f)
+            models = run_python(RUN_MODULE, module, args)
+        self.assertEqual([path for path, body in stub.requests], ["/check/ups"])
+        self.assertEqual(models, [])
@@ -0,0 +1,170 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.callback.thola_openmetrics import (
+    CallbackModule,
+    check_samples,
+    format_metrics,
+    write_metrics,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_columns import to_columns
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+FACTS = {
+    "status_code": 1,
+    "raw_output": "WARNING: high load | 'load'=85%;80;90;0;100",
+    "performance_data": [{"metric": "load", "label": "cpu \"0\"", "value": 85, "unit": "%",
+                          "thresholds": {"warning_max": 80, "critical_max": 90, "warning_min": None}},
+                         {"metric": "state", "value": "up"}],
+    "thola_timings": {"request": 0.25},
+}
+
+
+class Host(object):
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+
+class Task(object):
+    def __init__(self, action, args=None):
+        self.action = action
+        self.args = args or {}
+
+
+class Result(object):
+    def __init__(self, host, task, result):
+        self._host = Host(host)
+        self._task = task
+        self._result = result
+
+
+class Display(object):
+    verbosity = 0
+
+
+class OpenMetricsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_samples(self):
+        labels = (("host", "a"), ("check", "cpu_load"))
+        point = labels + (("metric", "load"), ("label", "cpu \"0\""))
+        self.assertEqual(list(check_samples("a", "cpu_load", FACTS)), [
+            ("thola_check_status", labels, 1),
+            ("thola_check_value", point + (("unit", "%"),), 85),
+            ("thola_check_threshold", point + (("threshold", "warning_max"),), 80),
+            ("thola_check_threshold", point + (("threshold", "critical_max"),), 90),
+            ("thola_check_request_seconds", labels, 0.25),
+        ])
+        # a check that could not be run is unknown
+        self.assertEqual(list(check_samples("a", "cpu_load", None)), [("thola_check_status", labels, 3)])
+
+    def test_columns(self):
+        columns = dict(FACTS, performance_data=to_columns(FACTS["performance_data"]))
+        self.assertEqual(list(check_samples("a", "cpu_load", columns)), list(check_samples("a", "cpu_load", FACTS)))
+
+    def test_format(self):
+        samples = dict(((family, labels), value) for family, labels, value in check_samples("a", "cpu_load", FACTS))
+        samples[("thola_check_run_timestamp_seconds", ())] = 1700000000
+        lines = format_metrics(samples).splitlines()
+        self.assertEqual(lines[0], "# TYPE thola_check_status gauge")
+        self.assertIn('thola_check_status{host="a",check="cpu_load"} 1.0', lines)
+        self.assertIn('thola_check_value{host="a",check="cpu_load",metric="load",label="cpu \\"0\\"",unit="%"} 85.0',
+                      lines)
+        self.assertIn("thola_check_run_timestamp_seconds 1700000000.0", lines)
+        self.assertEqual(lines[-1], "# EOF")
+
+    def test_write(self):
+        path = os.path.join(self.directory, "metrics", "checks.prom")
+        write_metrics(path, "# EOF\n")
+        write_metrics(path, "thola_check_status 0.0\n# EOF\n")
+        with open(path) as f:
+            self.assertEqual(f.read(), "thola_check_status 0.0\n# EOF\n")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+        # no temporary files are left behind
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["checks.prom"])
+
+    def test_callback(self):
+        path = os.path.join(self.directory, "checks.prom")
+        callback = CallbackModule(Display())
+        callback._plugin_options = {"path": path}
+        callback.v2_playbook_on_stats(None)
+        # nothing is written without checks
+        self.assertFalse(os.path.exists(path))
+
+        facts = dict((key, value) for key, value in FACTS.items() if key != "thola_timings")
+        callback.v2_runner_on_ok(Result("a", Task("inexio.thola.thola_check_cpu_load_facts"),
+                                        {"ansible_facts": facts, "thola_timings": {"request": 0.25}}))
+        callback.v2_runner_on_failed(Result("b", Task("inexio.thola.thola_check_cpu_load_facts"),
+                                            dict(FACTS, failed=True, status_code=2, msg=FACTS["raw_output"])))
+        callback.v2_runner_on_failed(Result("c", Task("thola_check_ups_facts"),
+                                            {"failed": True, "msg": "Can't connect to Thola API!"}))
+        callback.v2_runner_on_ok(Result("localhost", Task("inexio.thola.thola_batch", {"operation": "check_disk"}),
+                                        {"results": {"d": {"status_code": 0}}, "failed_hosts": {"e": "timeout"}}))
+        callback.v2_runner_on_ok(Result("localhost", Task("inexio.thola.thola_batch", {"operation": "identify"}),
+                                        {"results": {"f": {"vendor": "Cisco"}}, "failed_hosts": {}}))
+        callback.v2_runner_on_ok(Result("a", Task("inexio.thola.thola_read_cpu_load_facts"),
+                                        {"ansible_facts": {"cpu_load": []}}))
+        callback.v2_playbook_on_stats(None)
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        status = [line for line in lines if line.startswith("thola_check_status{")]
+        self.assertEqual(status, ['thola_check_status{host="a",check="cpu_load"} 1.0',
+                                  'thola_check_status{host="b",check="cpu_load"} 2.0',
+                                  'thola_check_status{host="c",check="ups"} 3.0',
+                                  'thola_check_status{host="d",check="disk"} 0.0',
+                                  'thola_check_status{host="e",check="disk"} 3.0'])
+        self.assertIn('thola_check_request_seconds{host="a",check="cpu_load"} 0.25', lines)
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class CheckFailureTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_failed_check(self):
+        responses = canned_responses()
+        responses["/check/memory-usage"] = dict(responses["/check/memory-usage"], status_code=2,
+                                                raw_output="CRITICAL: memory usage | 'usage'=95%;80;90;0;100")
+        with TholaStub(responses) as stub:
+            result = run_module("thola_check_memory_usage_facts", {"host": "10.0.0.1", "api_host": stub.api_host},
+                                self.directory)
+        self.assertTrue(result["failed"])
+        # without parse_output Thola doesn't append the performance data
+        self.assertEqual(result["msg"], "CRITICAL: memory usage")
+        self.assertEqual(result["status_code"], 2)
+        self.assertEqual(result["performance_data"][0]["metric"], "load")
+        self.assertIn("request", result["thola_timings"])
+
+    def test_columns_result(self):
+        with TholaStub() as stub:
+            result = run_module("thola_check_interface_metrics_facts",
+                                {"host": "10.0.0.1", "api_host": stub.api_host, "output_format": "columns"},
+                                self.directory)
+        self.assertIsInstance(result["ansible_facts"]["performance_data"], dict)
+        samples = list(check_samples("10.0.0.1", "interface_metrics", result["ansible_facts"]))
+        values = [sample for sample in samples if sample[0] == "thola_check_value"]
+        self.assertEqual(len(values), 40)
+        self.assertIn(("thola_check_value", (("host", "10.0.0.1"), ("check", "interface_metrics"),
+                                             ("metric", "traffic_counter_in"), ("label", "Gi0/3"), ("unit", "")),
+                       3000), values)
@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_perfdata import (
+    parse_output,
+    parse_perfdata,
+    split_output,
+)
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+class PerfdataTests(TestCase):
+    def test_split(self):
+        self.assertEqual(split_output("OK: all fine"), ("OK: all fine", ""))
+        self.assertEqual(split_output("OK: all fine | 'load'=1"), ("OK: all fine", " 'load'=1"))
+        text, perfdata = split_output("CRITICAL: fan 1 | a=1\nfan 1 failed\nfan 2 ok | b=2\nc=3")
+        self.assertEqual(text, "CRITICAL: fan 1\nfan 1 failed\nfan 2 ok")
+        self.assertEqual(parse_perfdata(perfdata)[-1]["label"], "c")
+
+    def test_parse(self):
+        metrics = parse_perfdata("'load'=12.5%;80;90;0;100 'if ''x'' in'=10c;~:5;@1:3 free=U;;;0 size=1.5e3B")
+        self.assertEqual(metrics, [
+            {"label": "load", "value": 12.5, "unit": "%", "warn": 80, "crit": 90, "min": 0, "max": 100},
+            {"label": "if 'x' in", "value": 10, "unit": "c", "warn": "~:5", "crit": "@1:3", "min": None, "max": None},
+            {"label": "free", "value": None, "unit": "", "warn": None, "crit": None, "min": 0, "max": None},
+            {"label": "size", "value": 1500.0, "unit": "B", "warn": None, "crit": None, "min": None, "max": None},
+        ])
+
+    def test_parse_output(self):
+        self.assertEqual(parse_output("OK: all fine | 'load'=12.5%;80;90;0;100"), {
+            "output": "OK: all fine",
+            "perfdata": [{"label": "load", "value": 12.5, "unit": "%", "warn": 80, "crit": 90, "min": 0, "max": 100}],
+        })
+        self.assertEqual(parse_output(None), {"output": "", "perfdata": []})
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class ParseOutputModuleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, name, **args):
+        return run_module(name, dict(args, host="10.0.0.1", parse_output=True), self.directory)
+
+    def test_parse_output(self):
+        responses = canned_responses()
+        responses["/check/disk"] = dict(responses["/check/disk"], status_code=2,
+                                        raw_output="CRITICAL: disk full | '/'=99%;80;90;0;100")
+        with TholaStub(responses) as stub:
+            ok = self.run_module("thola_check_cpu_load_facts", api_host=stub.api_host)
+            critical = self.run_module("thola_check_disk_facts", api_host=stub.api_host)
+        facts = ok["ansible_facts"]
+        self.assertNotIn("raw_output", facts)
+        self.assertEqual(facts["output"], "OK: all fine")
+        self.assertEqual(facts["perfdata"], [{"label": "load", "value": 12.5, "unit": "%", "warn": 80, "crit": 90,
+                                              "min": 0, "max": 100}])
+        self.assertTrue(critical["failed"])
+        self.assertEqual(critical["msg"], "CRITICAL: disk full")
+        self.assertEqual(critical["status_code"], 2)
+        self.assertEqual(critical["perfdata"][0]["label"], "/")
+        # Thola only appends the performance data if the request asks for it
+        self.assertEqual([body.get("print_performance_data") for path, body in stub.requests], [True, True])
+
+    def test_raw_output(self):
+        with TholaStub(canned_responses()) as stub:
+            result = run_module("thola_check_cpu_load_facts", {"host": "10.0.0.1", "api_host": stub.api_host},
+                                self.directory)
+        self.assertEqual(result["ansible_facts"]["raw_output"], "OK: all fine")
+        self.assertNotIn("print_performance_data", stub.requests[0][1])
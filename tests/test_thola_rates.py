@@ -0,0 +1,74 @@
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils import thola_rates
+from ansible_collections.inexio.thola.plugins.module_utils.thola_rates import (
+    compute_rates,
+    counter_columns,
+    interface_rates,
+)
+
+
+class RatesTests(object):
+    numpy = False
+
+    def setUp(self):
+        self.numpy_found = thola_rates.numpy_found
+        thola_rates.numpy_found = self.numpy
+
+    def tearDown(self):
+        thola_rates.numpy_found = self.numpy_found
+
+    def test_rates(self):
+        previous = counter_columns([
+            {"if_index": 1, "if_hc_in_octets": 1000, "if_in_octets": 4294967000},
+            {"if_index": 2, "if_hc_in_octets": 5000, "if_in_octets": 10},
+            {"if_index": 3, "if_hc_in_octets": 1000},
+        ], 100)
+        current = counter_columns([
+            {"if_index": 2, "if_hc_in_octets": 100, "if_in_octets": 30},
+            {"if_index": 1, "if_hc_in_octets": 3000, "if_in_octets": 704},
+            {"if_index": 4, "if_hc_in_octets": 1000},
+            {"if_index": 3, "if_hc_in_octets": 2 ** 63 + 1000},
+        ], 110)
+        rates = compute_rates(previous, current)
+        # 64 bit counter reset, normal increase, new interface, large values
+        self.assertEqual(rates["if_hc_in_octets"], [None, 200.0, None, 2 ** 63 / 10.0])
+        # 32 bit counter wrap
+        self.assertEqual(rates["if_in_octets"], [2.0, 100.0, None, None])
+        self.assertEqual(rates["if_out_octets"], [None] * 4)
+
+    def test_interface_rates(self):
+        previous = counter_columns([{"if_index": 1, "if_hc_in_octets": 0, "if_out_octets": 0}], 0)
+        current = counter_columns([{"if_index": 1, "if_hc_in_octets": 125, "if_out_octets": 250}], 1)
+        self.assertEqual(interface_rates(previous, current), [{
+            "if_index": 1,
+            "if_hc_in_octets": 125.0,
+            "if_out_octets": 250.0,
+            "in_bps": 1000.0,
+            "out_bps": 2000.0,
+        }])
+
+    def test_no_elapsed_time(self):
+        columns = counter_columns([{"if_index": 1, "if_hc_in_octets": 0}], 5)
+        self.assertEqual(compute_rates(columns, columns)["if_hc_in_octets"], [None])
+
+    def test_many_interfaces(self):
+        interfaces = [{"if_index": i, "if_hc_in_octets": i * 1000, "if_hc_out_octets": i * 2000,
+                       "if_in_errors": i} for i in range(50000)]
+        previous = counter_columns(interfaces, 0)
+        for interface in interfaces:
+            interface["if_hc_in_octets"] += 600
+        current = counter_columns(interfaces, 60)
+        rates = compute_rates(previous, current)
+        self.assertEqual(rates["if_hc_in_octets"][49999], 10.0)
+        self.assertEqual(rates["if_in_errors"][0], 0.0)
+
+
+class PythonRatesTests(RatesTests, TestCase):
+    numpy = False
+
+
+@unittest.skipUnless(thola_rates.numpy_found, "numpy is not installed")
+class NumpyRatesTests(RatesTests, TestCase):
+    numpy = True
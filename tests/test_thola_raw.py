@@ -0,0 +1,120 @@
+import collections
+import concurrent.futures
+import json
+import logging
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    TholaRequestError,
+    build_request,
+    decode_response,
+    raw_operation,
+    thola_client_found,
+)
+
+from tests.thola_stub import TholaStub
+
+try:
+    import thola_client
+    import thola_client.rest as rest
+except ImportError:
+    pass
+
+# what ApiClient.deserialize expects from a response
+Response = collections.namedtuple("Response", ["data"])
+
+
+def interfaces_response(count):
+    return {"interfaces": [{
+        "ifIndex": i,
+        "ifName": "GigabitEthernet0/%d" % i,
+        "ifDescr": "uplink \"core-%d\"" % i,
+        "ifType": "ethernetCsmacd",
+        "ifOperStatus": "up",
+        "ifSpeed": 1000000000,
+        "ifHCInOctets": 1234567 * i,
+        "ifHCOutOctets": 7654321 * i,
+        "ethernet_like": {"dot3StatsFCSErrors": 0, "dot3StatsAlignmentErrors": 1},
+    } for i in range(count)]}
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class RawOperationTests(TestCase):
+    def test_same_result_as_generated_api(self):
+        responses = {"/read/interfaces": interfaces_response(10),
+                     "/identify": {"class": "ios", "properties": {"vendor": "Cisco", "model": "7206VXR"}}}
+        with TholaStub(responses) as stub:
+            body = build_request("read_interfaces", "10.0.0.1")
+            configuration = thola_client.Configuration()
+            configuration.host = stub.api_host
+            api = thola_client.ReadApi(thola_client.ApiClient(configuration))
+            generated = api.read_interfaces(body=body).to_dict()
+            self.assertEqual(raw_operation("read_interfaces", stub.api_host, body), generated)
+            identify = raw_operation("identify", stub.api_host, build_request("identify", "10.0.0.1"))
+        self.assertEqual(identify["_class"], "ios")
+        self.assertEqual(identify["properties"]["model"], "7206VXR")
+        self.assertIsNone(identify["properties"]["serial_number"])
+
+    def test_build_request(self):
+        # the plain request is what the generated client sends for the model
+        from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import to_wire
+
+        body = build_request("check_identify", "10.0.0.1", ["public", "private"], "2c", 161, extra=dict(
+            expectations=dict(_class="ios", properties=dict(vendor="Cisco", model=None)),
+            vendor_diff_warning=True))
+        model = thola_client.CheckIdentifyRequest(
+            device_data=thola_client.DeviceData(
+                ip_address="10.0.0.1",
+                connection_data=thola_client.ConnectionData(
+                    snmp=thola_client.SNMPConnectionData(
+                        communities=["public", "private"], versions=["2c"], ports=[161], discover_retries=0,
+                        discover_timeout=2, discover_parallel_requests=5))),
+            expectations=thola_client.models.Device(_class="ios", properties=thola_client.models.Properties(
+                vendor="Cisco")),
+            vendor_diff_warning=True)
+        self.assertEqual(body, to_wire(model))
+        with self.assertRaises(TholaRequestError):
+            build_request("read_cpu_load", "10.0.0.1", extra={"cpu_load_thresholds": {}})
+
+    def test_api_error(self):
+        with TholaStub({"/read/cpu-load": (400, {"message": "invalid request"})}) as stub:
+            with self.assertRaises(rest.ApiException) as context:
+                raw_operation("read_cpu_load", stub.api_host, build_request("read_cpu_load", "10.0.0.1"))
+        self.assertEqual(context.exception.status, 400)
+        self.assertEqual(json.loads(context.exception.body), {"message": "invalid request"})
+
+    def test_large_response(self):
+        # the timings of both conversions are compared in test_thola_benchmark
+        data = json.dumps(interfaces_response(2000))
+        generated = thola_client.ApiClient().deserialize(Response(data), "ReadInterfacesResponse").to_dict()
+        self.assertEqual(decode_response("read_interfaces", data), generated)
+
+    def test_coalesce(self):
+        # identical requests issued concurrently from several threads share one request
+        bodies = [build_request("read_cpu_load", "10.0.0.1")] * 8 + [build_request("read_cpu_load", "10.0.0.2")] * 2
+        with TholaStub({"/read/cpu-load": {"cpu_load": [{"load": 12.5}]}}, latency=0.1) as stub:
+            with concurrent.futures.ThreadPoolExecutor(len(bodies)) as executor:
+                results = list(executor.map(lambda body: raw_operation("read_cpu_load", stub.api_host, body), bodies))
+            raw_operation("read_cpu_load", stub.api_host, bodies[0])
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(results[0]["cpu_load"][0]["load"], 12.5)
+        # every caller gets its own copy of the result
+        self.assertIsNot(results[0], results[1])
+
+    def test_coalesce_error(self):
+        body = build_request("read_cpu_load", "10.0.0.1")
+        with TholaStub({"/read/cpu-load": (400, {"message": "invalid request"})}, latency=0.1) as stub:
+            with concurrent.futures.ThreadPoolExecutor(4) as executor:
+                futures = [executor.submit(raw_operation, "read_cpu_load", stub.api_host, body) for dummy in range(4)]
+        for future in futures:
+            self.assertEqual(future.exception().status, 400)
+        self.assertEqual(len(stub.requests), 1)
+
+    def test_no_handler_per_request(self):
+        # generated models must not add a log handler for every request they build
+        logger = logging.getLogger("urllib3")
+        handlers = len(logger.handlers)
+        for dummy in range(10):
+            build_request("read_cpu_load", "10.0.0.1")
+        self.assertEqual(len(logger.handlers), handlers)
@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class ReadAllTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, **args):
+        return run_module("thola_read_all_facts", dict(args, host="10.0.0.1"), self.directory)
+
+    def test_components(self):
+        with TholaStub(latency=0.1) as stub:
+            result = self.run_module(api_host=stub.api_host, components=["memory", "cpu", "interfaces"])
+        self.assertEqual(result["components"], ["cpu", "interfaces", "memory"])
+        self.assertEqual(result["component_errors"], {})
+        facts = result["ansible_facts"]
+        self.assertEqual(sorted(facts), ["cpu_load", "interfaces", "memory_usage"])
+        self.assertEqual(len(facts["interfaces"]), 10)
+        self.assertEqual(sorted(path for path, body in stub.requests),
+                         ["/read/cpu-load", "/read/interfaces", "/read/memory-usage"])
+        # the reads were issued concurrently
+        self.assertEqual(stub.max_in_flight, 3)
+
+    def test_available_components(self):
+        responses = canned_responses()
+        responses["/read/available-components"] = {"availableComponents": ["interfaces", "ups", "unknown"]}
+        responses["/read/ups"] = (500, {"message": "no detection for ups found"})
+        with TholaStub(responses) as stub:
+            result = self.run_module(api_host=stub.api_host)
+        self.assertFalse(result.get("failed"))
+        self.assertEqual(result["components"], ["interfaces", "ups"])
+        self.assertEqual(result["component_errors"], {"ups": "no detection for ups found"})
+        self.assertEqual(result["ansible_facts"]["available_components"], ["interfaces", "ups", "unknown"])
+        self.assertIn("interfaces", result["ansible_facts"])
+
+    def test_all_failed(self):
+        with TholaStub({}) as stub:
+            result = self.run_module(api_host=stub.api_host, components=["cpu", "disk"])
+        self.assertTrue(result["failed"])
+        self.assertEqual(result["component_errors"], {"cpu": "Not Found", "disk": "Not Found"})
+
+    def test_invalid_response(self):
+        # an error other than an API error only fails its own component
+        responses = canned_responses()
+        responses["/read/disk"] = b"{\"disk\": "
+        with TholaStub(responses) as stub:
+            result = self.run_module(api_host=stub.api_host, components=["cpu", "disk"])
+        self.assertFalse(result.get("failed"))
+        self.assertEqual(result["components"], ["cpu", "disk"])
+        self.assertEqual(list(result["component_errors"]), ["disk"])
+        self.assertEqual(sorted(result["ansible_facts"]), ["cpu_load"])
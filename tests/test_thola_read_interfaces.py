@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from tests import run_module
+from tests.thola_stub import TholaStub, canned_responses, interfaces
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+def device(count, removed=(), **changes):
+    # the interfaces of the stub without the removed ifIndexes and with
+    # changes, a dict of attributes by ifIndex, applied
+    result = [interface for interface in interfaces(count) if interface["ifIndex"] not in removed]
+    for interface in result:
+        interface.update(changes.get("if%d" % interface["ifIndex"], {}))
+    return {"interfaces": result}
+
+
+def traffic(count, factor):
+    # the interfaces of the stub with counters that grew by factor
+    result = interfaces(count)
+    for interface in result:
+        for name in ("ifHCInOctets", "ifHCOutOctets"):
+            interface[name] *= factor
+    return {"interfaces": result}
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class ReadInterfacesTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, **args):
+        args = dict(args, host="10.0.0.1", snapshot_path=os.path.join(self.directory, "snapshots"),
+                    counters_path=os.path.join(self.directory, "counters"))
+        return run_module("thola_read_interfaces_facts", args, self.directory)
+
+    def test_rates_with_fields(self):
+        responses = canned_responses(3)
+        with TholaStub(responses) as stub:
+            self.run_module(api_host=stub.api_host, rates=True)
+            responses["/read/interfaces"] = traffic(3, 2)
+            projected = self.run_module(api_host=stub.api_host, rates=True, fields=["ifName"])
+            responses["/read/interfaces"] = traffic(3, 3)
+            plain = self.run_module(api_host=stub.api_host, rates=True)
+        # the counters are read for the rates, but not returned
+        self.assertEqual(projected["ansible_facts"]["interfaces"][1], {"if_index": 1, "if_name": "Gi0/1"})
+        for result in (projected, plain):
+            rates = result["ansible_facts"]["interface_rates"]
+            self.assertEqual([rate["if_index"] for rate in rates], [0, 1, 2])
+            self.assertGreater(rates[1]["in_bps"], 0)
+            self.assertGreater(rates[2]["out_bps"], 0)
+
+    def test_rates_with_filters(self):
+        responses = canned_responses(3)
+        with TholaStub(responses) as stub:
+            self.run_module(api_host=stub.api_host, rates=True)
+            filtered = self.run_module(api_host=stub.api_host, rates=True, ifName_filter="^Gi0/[01]$")
+            responses["/read/interfaces"] = traffic(3, 2)
+            plain = self.run_module(api_host=stub.api_host, rates=True)
+        # the first filtered run has no counters of its own yet
+        self.assertEqual(filtered["ansible_facts"]["interface_rates"], [])
+        rates = plain["ansible_facts"]["interface_rates"]
+        self.assertEqual([rate["if_index"] for rate in rates], [0, 1, 2])
+        self.assertGreater(rates[2]["in_bps"], 0)
+
+    def test_incremental(self):
+        responses = canned_responses(3)
+        with TholaStub(responses) as stub:
+            first = self.run_module(api_host=stub.api_host, incremental=True)
+            unchanged = self.run_module(api_host=stub.api_host, incremental=True, snapshot_version=1)
+            responses["/read/interfaces"] = device(3, removed=[2], if1={"ifOperStatus": "down"})
+            changed = self.run_module(api_host=stub.api_host, incremental=True, snapshot_version=1)
+            # a caller that missed a run gets the full table
+            mismatch = self.run_module(api_host=stub.api_host, incremental=True, snapshot_version=1)
+        self.assertTrue(first["full"])
+        self.assertEqual(len(first["ansible_facts"]["interfaces"]), 3)
+        self.assertEqual(first["ansible_facts"]["interfaces_snapshot_version"], 1)
+        self.assertEqual(first["ansible_facts"]["removed_interfaces"], [])
+
+        self.assertFalse(unchanged["full"])
+        self.assertEqual(unchanged["ansible_facts"]["interfaces"], [])
+        self.assertEqual(unchanged["ansible_facts"]["interfaces_snapshot_version"], 1)
+
+        self.assertFalse(changed["full"])
+        self.assertEqual(changed["ansible_facts"]["interfaces"], [{"if_index": 1, "if_oper_status": "down"}])
+        self.assertEqual(changed["ansible_facts"]["removed_interfaces"], [2])
+        self.assertEqual(changed["ansible_facts"]["interfaces_snapshot_version"], 2)
+
+        self.assertTrue(mismatch["full"])
+        self.assertEqual([interface["if_index"] for interface in mismatch["ansible_facts"]["interfaces"]], [0, 1])
+        self.assertEqual(mismatch["ansible_facts"]["removed_interfaces"], [])
+        self.assertEqual(mismatch["ansible_facts"]["interfaces_snapshot_version"], 3)
+
+    def test_incremental_check_mode(self):
+        with TholaStub(canned_responses(3)) as stub:
+            checked = self.run_module(api_host=stub.api_host, incremental=True, _ansible_check_mode=True)
+            first = self.run_module(api_host=stub.api_host, incremental=True)
+        self.assertTrue(checked["full"])
+        # the check mode run didn't store a snapshot
+        self.assertTrue(first["full"])
+        self.assertEqual(first["ansible_facts"]["interfaces_snapshot_version"], 1)
+
+    def test_incremental_keys(self):
+        with TholaStub(canned_responses(3)) as stub:
+            self.run_module(api_host=stub.api_host, incremental=True)
+            projected = self.run_module(api_host=stub.api_host, incremental=True, fields=["ifName"])
+            filtered = self.run_module(api_host=stub.api_host, incremental=True, ifName_filter="^Gi0/0$")
+            type_filtered = self.run_module(api_host=stub.api_host, incremental=True, ifType_filter="^other$")
+            again = self.run_module(api_host=stub.api_host, incremental=True, fields=["if_name"])
+        # snapshots of other fields or filters are separate
+        self.assertTrue(projected["full"])
+        self.assertEqual(projected["ansible_facts"]["interfaces"][0], {"if_index": 0, "if_name": "Gi0/0"})
+        self.assertTrue(filtered["full"])
+        self.assertEqual([interface["if_index"] for interface in filtered["ansible_facts"]["interfaces"]], [1, 2])
+        self.assertTrue(type_filtered["full"])
+        # fields given with their API or their fact names are the same
+        self.assertFalse(again["full"])
+        self.assertEqual(again["ansible_facts"]["interfaces"], [])
+
+    def test_stream(self):
+        with TholaStub(canned_responses(5)) as stub:
+            streamed = self.run_module(api_host=stub.api_host, fields=["ifName", "ifOperStatus"])
+            whole = self.run_module(api_host=stub.api_host, fields=["ifName", "ifOperStatus"], stream=False)
+        self.assertEqual(whole["ansible_facts"], streamed["ansible_facts"])
+        self.assertEqual(len(whole["ansible_facts"]["interfaces"]), 5)
+        self.assertEqual(whole["ansible_facts"]["interfaces"][0],
+                         {"if_index": 0, "if_name": "Gi0/0", "if_oper_status": "down"})
@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_snapshot import (
+    diff_interfaces,
+    index_interfaces,
+    load_snapshot,
+    save_snapshot,
+    snapshot_key,
+)
+
+
+class DiffInterfacesTests(TestCase):
+    def test_diff(self):
+        previous = index_interfaces([
+            {"if_index": 1, "if_name": "Gi0/1", "if_oper_status": "up", "if_hc_in_octets": 100},
+            {"if_index": 2, "if_name": "Gi0/2", "if_oper_status": "up", "if_hc_in_octets": 200},
+            {"if_index": 3, "if_name": "Gi0/3", "if_oper_status": "up", "if_hc_in_octets": 300},
+        ])
+        current = index_interfaces([
+            {"if_index": 1, "if_name": "Gi0/1", "if_oper_status": "up", "if_hc_in_octets": 100},
+            {"if_index": 2, "if_name": "Gi0/2", "if_oper_status": "down", "if_hc_in_octets": 250},
+            {"if_index": 4, "if_name": "Gi0/4", "if_oper_status": "up", "if_hc_in_octets": 0},
+        ])
+        changed, removed = diff_interfaces(previous, current)
+        self.assertEqual(sorted(changed, key=lambda interface: interface["if_index"]), [
+            {"if_index": 2, "if_oper_status": "down", "if_hc_in_octets": 250},
+            {"if_index": 4, "if_name": "Gi0/4", "if_oper_status": "up", "if_hc_in_octets": 0},
+        ])
+        self.assertEqual(removed, [3])
+
+    def test_unchanged(self):
+        interfaces = index_interfaces([{"if_index": 1, "if_name": "Gi0/1", "ethernet_like": {"errors": 0}}])
+        self.assertEqual(diff_interfaces(interfaces, interfaces), ([], []))
+
+
+class SnapshotStoreTests(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_save_and_load(self):
+        key = snapshot_key("10.0.0.1", 161, {"if_name", "if_index"})
+        self.assertIsNone(load_snapshot(self.path, key))
+        interfaces = index_interfaces([{"if_index": 1, "if_name": "Gi0/1"}])
+        save_snapshot(self.path, key, 3, interfaces)
+        self.assertEqual(load_snapshot(self.path, key), (3, interfaces))
+        self.assertIsNone(load_snapshot(self.path, snapshot_key("10.0.0.1", 161)))
+        # snapshots of differently filtered interfaces are kept apart
+        filtered = snapshot_key("10.0.0.1", 161, {"if_name", "if_index"}, if_name_filter="^Vlan")
+        self.assertNotEqual(filtered, key)
+        self.assertNotEqual(snapshot_key("10.0.0.1", 161, {"if_name", "if_index"}, if_type_filter="^Vlan"), filtered)
+        self.assertIsNone(load_snapshot(self.path, filtered))
@@ -0,0 +1,56 @@
+import json
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_schema import field_names, from_wire
+from ansible_collections.inexio.thola.plugins.module_utils.thola_stream import iter_json_array
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJsonArrayTests(TestCase):
+    def test_chunk_boundaries(self):
+        payload = {"other": {"a": [1, "]", {"b": "}"}]},
+                   "interfaces": [{"ifIndex": i, "ifDescr": "port ä %d" % i, "ifHCInOctets": 10 ** 15 + i}
+                                  for i in range(50)],
+                   "last": None}
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        for size in (1, 3, 17, 1024, len(data)):
+            self.assertEqual(list(iter_json_array(chunked(data, size), "interfaces")), payload["interfaces"])
+
+    def test_number_split_across_chunks(self):
+        self.assertEqual(list(iter_json_array([b'{"interfaces": [1, 23', b'4, 5]}'], "interfaces")), [1, 234, 5])
+
+    def test_missing_or_empty(self):
+        self.assertEqual(list(iter_json_array([b"{}"], "interfaces")), [])
+        self.assertEqual(list(iter_json_array([b'{"interfaces": null}'], "interfaces")), [])
+        self.assertEqual(list(iter_json_array([b'{"interfaces": []}'], "interfaces")), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"interfaces": [1, 2'], "interfaces"))
+
+
+class FromWireTests(TestCase):
+    def test_interface(self):
+        interface = from_wire({"ifIndex": 1, "ifName": "Gi0/1", "ethernet_like": {"dot3StatsFCSErrors": 3}},
+                              "Interface")
+        self.assertEqual(interface["if_index"], 1)
+        self.assertEqual(interface["if_name"], "Gi0/1")
+        self.assertIsNone(interface["if_alias"])
+        self.assertEqual(interface["ethernet_like"]["dot3_stats_fcs_errors"], 3)
+        self.assertIsNone(interface["radio"])
+
+    def test_class(self):
+        self.assertEqual(from_wire({"class": "ios", "properties": {"vendor": "Cisco"}},
+                                   "IdentifyResponse")["_class"], "ios")
+
+    def test_fields(self):
+        fields = field_names("Interface", ["ifName", "if_oper_status"])
+        self.assertEqual(fields, ["if_name", "if_oper_status"])
+        interface = from_wire({"ifIndex": 1, "ifName": "Gi0/1", "ifOperStatus": "up", "ifDescr": "uplink"},
+                              "Interface", set(fields))
+        self.assertEqual(interface, {"if_name": "Gi0/1", "if_oper_status": "up"})
+        with self.assertRaises(ValueError):
+            field_names("Interface", ["ifBogus"])
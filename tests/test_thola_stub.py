@@ -0,0 +1,46 @@
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_async import run_operations
+from ansible_collections.inexio.thola.plugins.module_utils.thola_operations import (
+    OPERATIONS,
+    build_request,
+    thola_client_found,
+)
+
+from tests.thola_stub import TholaStub
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class TholaStubTests(TestCase):
+    def test_canned_responses(self):
+        results = {}
+        with TholaStub(interface_count=25) as stub:
+            for operation in OPERATIONS:
+                body = build_request(operation, "10.0.0.1")
+                ok, results[operation] = run_operations(stub.api_host, operation, [body])[0]
+                self.assertTrue(ok, results[operation])
+        self.assertEqual(len(stub.requests), len(OPERATIONS))
+        self.assertEqual(results["identify"]["ansible_net_vendor"], "Cisco")
+        self.assertEqual(len(results["read_interfaces"]["interfaces"]), 25)
+        self.assertEqual(results["read_count_interfaces"]["count"], 25)
+        self.assertEqual(len(results["check_interface_metrics"]["performance_data"]), 100)
+
+    def test_error_injection(self):
+        bodies = [build_request("read_cpu_load", "10.0.%d.%d" % (i // 250, i % 250)) for i in range(200)]
+        with TholaStub(latency=(0, 0.01), error_rate=0.25, error_status=503, seed=1) as stub:
+            results = run_operations(stub.api_host, "read_cpu_load", bodies, concurrency=20)
+        failed = [message for ok, message in results if not ok]
+        self.assertEqual(len(failed), stub.errors)
+        self.assertTrue(20 < len(failed) < 80)
+        self.assertEqual(set(failed), {"injected error"})
+        self.assertLessEqual(stub.max_in_flight, 20)
+
+    def test_invalid_request(self):
+        body = build_request("identify", "10.0.0.1")
+        body["device_data"]["connection_data"]["snmp"]["ports"] = 161
+        with TholaStub() as stub:
+            ok, message = run_operations(stub.api_host, "identify", [body])[0]
+        self.assertFalse(ok)
+        self.assertEqual(message, "Unmarshal type error: expected=[]int, got=number, "
+                                  "field=device_data.connection_data.snmp.ports")
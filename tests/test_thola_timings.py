@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.callback.thola_timings import (
+    CallbackModule,
+    format_summary,
+    histogram,
+    percentile,
+    summarize,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+
+from tests import run_module
+from tests.thola_stub import TholaStub
+
+try:
+    import thola_client  # noqa: F401
+
+    thola_client_found = True
+except ImportError:
+    thola_client_found = False
+
+
+class Host(object):
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+
+class Task(object):
+    def __init__(self, action, uuid):
+        self.action = action
+        self._uuid = uuid
+
+
+class Result(object):
+    def __init__(self, host, task, result):
+        self._host = host
+        self._task = task
+        self._result = result
+
+
+class Display(object):
+    verbosity = 0
+
+    def __init__(self):
+        self.lines = []
+
+    def banner(self, msg):
+        self.lines.append(msg)
+
+    def display(self, msg):
+        self.lines.append(msg)
+
+
+class TimingsTests(TestCase):
+    def test_stages(self):
+        timings = Timings()
+        time.sleep(0.01)
+        timings.mark("build")
+        timings.mark("request")
+        timings.add("request", 0.5)
+        timings.move("request", "decode", 0.2)
+        result = timings.result()
+        self.assertGreaterEqual(result["build"], 0.01)
+        self.assertAlmostEqual(result["request"], 0.3, 2)
+        self.assertEqual(result["decode"], 0.2)
+        self.assertAlmostEqual(result["total"], result["build"] + result["request"] + result["decode"], 5)
+
+
+class SummaryTests(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.9), 7)
+
+    def test_histogram(self):
+        self.assertEqual(histogram([0.001, 0.01, 0.02, 20], (0.01, 0.1, float("inf"))), [2, 1, 1])
+
+    def test_summarize(self):
+        samples = {"thola_read_cpu_load_facts": [("a", {"request": 0.2, "total": 0.21}),
+                                                 ("b", {"request": 0.9, "total": 0.92}),
+                                                 ("c", {"request": 0.1, "total": 0.1})]}
+        summary = summarize(samples, slowest_hosts=2)["thola_read_cpu_load_facts"]
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["slowest_hosts"], [("b", 0.9), ("a", 0.2)])
+        self.assertEqual(summary["stages"]["request"]["max"], 0.9)
+        self.assertEqual(summary["stages"]["request"]["p50"], 0.2)
+        self.assertNotIn("decode", summary["stages"])
+        lines = format_summary(summarize(samples))
+        self.assertEqual(lines[0], "thola_read_cpu_load_facts (3 results)")
+        # only the buckets from the fastest to the slowest request are shown
+        self.assertIn("    <= 100.0ms   ", "\n".join(lines))
+        self.assertNotIn("<= 10.0ms", "\n".join(lines))
+
+
+class CallbackTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_callback(self):
+        display = Display()
+        callback = CallbackModule(display)
+        output_path = os.path.join(self.directory, "timings.json")
+        callback._plugin_options = {"slowest_hosts": 5, "output_path": output_path}
+        task = Task("inexio.thola.thola_read_all_facts", "1")
+        for name in ("a", "b"):
+            callback.v2_runner_on_start(Host(name), task)
+        timings = {"request": 0.3, "total": 0.3, "components": {"cpu": {"request": 0.25, "total": 0.26}}}
+        callback.v2_runner_on_ok(Result(Host("a"), task, {"thola_timings": timings}))
+        callback.v2_runner_on_failed(Result(Host("b"), task, {"failed": True, "msg": "Can't connect to Thola API!"}))
+        # loop results carry the timings of every item
+        loop = Task("inexio.thola.thola_read_cpu_load_facts", "2")
+        callback.v2_runner_on_ok(Result(Host("a"), loop, {"results": [{"thola_timings": {"request": 0.1}},
+                                                                     {"thola_timings": {"request": 0.2}}]}))
+        callback.v2_playbook_on_stats(None)
+
+        self.assertEqual(display.lines[0], "THOLA TIMINGS")
+        with open(output_path) as f:
+            summary = json.load(f)
+        self.assertEqual(sorted(summary), ["thola_read_all_facts", "thola_read_all_facts/cpu",
+                                           "thola_read_cpu_load_facts"])
+        self.assertEqual(summary["thola_read_all_facts"]["count"], 1)
+        self.assertIn("overhead", summary["thola_read_all_facts"]["stages"])
+        self.assertEqual(summary["thola_read_cpu_load_facts"]["count"], 2)
+        self.assertNotIn("overhead", summary["thola_read_cpu_load_facts"]["stages"])
+
+
+@unittest.skipUnless(thola_client_found, "thola-client-module-python is not installed")
+class ModuleTimingsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_module(self, name, **args):
+        return run_module(name, dict(args, host="10.0.0.1"), self.directory)
+
+    def test_module_timings(self):
+        with TholaStub(latency=0.05) as stub:
+            for name in ("thola_read_cpu_load_facts", "thola_check_cpu_load_facts", "thola_identify_facts",
+                         "thola_read_interfaces_facts"):
+                timings = self.run_module(name, api_host=stub.api_host)["thola_timings"]
+                self.assertEqual(sorted(timings), ["build", "decode", "request", "sanitize", "total"], name)
+                self.assertGreaterEqual(timings["request"], 0.05, name)
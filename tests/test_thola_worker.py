@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from ansible_collections.inexio.thola.plugins.module_utils.thola_worker import (
+    WorkerUnavailable,
+    forward,
+    forward_operation,
+    ping,
+    serve,
+    stop,
+)
+from ansible_collections.inexio.thola.plugins.module_utils.thola_timings import Timings
+
+from tests.thola_stub import TholaStub
+
+try:
+    import thola_client.rest as rest
+except ImportError:
+    pass
+
+BODY = {"device_data": {"ip_address": "10.0.0.1"}}
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, "worker.sock")
+        self.thread = threading.Thread(target=serve, args=(self.socket_path, 0))
+        self.thread.daemon = True
+        self.thread.start()
+        deadline = time.monotonic() + 5
+        while not ping(self.socket_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        stop(self.socket_path)
+        self.thread.join(5)
+        shutil.rmtree(self.directory)
+
+    def test_forward(self):
+        responses = {"/read/available-components": {"availableComponents": ["cpu"]},
+                     "/read/interfaces": {"interfaces": [{"ifIndex": 1}]}}
+        with TholaStub(responses) as stub:
+            result = forward(self.socket_path, "read_available_components", stub.api_host, BODY)
+            raw = forward(self.socket_path, "read_interfaces", stub.api_host, BODY, raw=True)
+            # the worker keeps its connection to the API open
+            forward(self.socket_path, "read_available_components", stub.api_host, BODY)
+        self.assertEqual(result, {"available_components": ["cpu"]})
+        self.assertEqual(raw, {"interfaces": [{"ifIndex": 1}]})
+        self.assertEqual(len(stub.connections), 1)
+
+    def test_timings(self):
+        with TholaStub({"/read/available-components": {"availableComponents": ["cpu"]}}, latency=0.05) as stub:
+            timings = Timings()
+            forward_operation("read_available_components", stub.api_host, BODY, self.socket_path, timings=timings)
+        self.assertGreaterEqual(timings.durations["request"], 0.05)
+        # the worker reports the time it needed to decode the response
+        self.assertIn("decode", timings.durations)
+
+    def test_api_error(self):
+        with TholaStub({"/read/cpu-load": (400, {"message": "invalid request"})}) as stub:
+            with self.assertRaises(rest.ApiException) as context:
+                forward(self.socket_path, "read_cpu_load", stub.api_host, BODY)
+        self.assertEqual(context.exception.status, 400)
+        self.assertEqual(json.loads(context.exception.body), {"message": "invalid request"})
+
+    def test_stop(self):
+        self.assertTrue(stop(self.socket_path))
+        self.thread.join(5)
+        self.assertFalse(ping(self.socket_path))
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class NoWorkerTests(TestCase):
+    def test_unavailable(self):
+        with self.assertRaises(WorkerUnavailable):
+            forward("/nonexistent/worker.sock", "read_cpu_load", "http://127.0.0.1:8237", BODY)
+
+    def test_fallback(self):
+        with TholaStub({"/read/available-components": {"availableComponents": ["cpu"]}}) as stub:
+            result = forward_operation("read_available_components", stub.api_host, BODY, "/nonexistent/worker.sock")
+        self.assertEqual(result, {"available_components": ["cpu"]})
+
+
+class BrokenWorkerTests(TestCase):
+    """A worker that accepts the connection but then replies garbage or
+    not at all."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.socket_path = os.path.join(self.directory, "worker.sock")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(self.listener.close)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(5)
+        self.connections = []
+
+    def serve(self, reply):
+        def accept():
+            connection, address = self.listener.accept()
+            self.connections.append(connection)
+            connection.makefile("rb").readline()
+            if reply is not None:
+                connection.sendall(reply)
+
+        thread = threading.Thread(target=accept)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close()
+
+    def test_invalid_reply(self):
+        for reply in (b"no json\n", b"[1]\n"):
+            self.serve(reply)
+            with self.assertRaises(WorkerUnavailable):
+                forward(self.socket_path, "read_cpu_load", "http://127.0.0.1:8237", BODY, timeout=5)
+
+    def test_timeout(self):
+        self.serve(None)
+        with self.assertRaises(WorkerUnavailable):
+            forward(self.socket_path, "read_cpu_load", "http://127.0.0.1:8237", BODY, timeout=0.1)
+
+    def test_fallback(self):
+        self.serve(b"no json\n")
+        with TholaStub({"/read/available-components": {"availableComponents": ["cpu"]}}) as stub:
+            result = forward_operation("read_available_components", stub.api_host, BODY, self.socket_path)
+        self.assertEqual(result, {"available_components": ["cpu"]})
+        self.serve(None)
+        with TholaStub({"/read/available-components": {"availableComponents": ["cpu"]}}) as stub:
+            result = forward_operation("read_available_components", stub.api_host, BODY, self.socket_path,
+                                       timeout=0.1)
+        self.assertEqual(result, {"available_components": ["cpu"]})
@@ -0,0 +1,279 @@
+"""Local stand-in for the Thola API, for tests and for load testing the
+collection offline.
+
+Run it as a server with e.g.
+
+  python -m tests.thola_stub --port 8237 --interfaces 1000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# list fields of the SNMP connection data and the Go type Thola expects
+_SNMP_LISTS = (("communities", "[]string"), ("versions", "[]string"), ("ports", "[]int"))
+
+
+class TholaStub(object):
+    """Local stand-in for the Thola API.
+
+    responses maps a request path to either a response body or a
+    (status, body) tuple, bodies that are bytes are sent as they are.
+    Without responses, all endpoints of the API answer with the canned
+    responses of a device with interface_count interfaces.
+
+    Every request is delayed by latency seconds, or by a random time
+    between the two values if latency is a (min, max) tuple. A fraction
+    error_rate of the requests fails with error_status, as do all requests
+    for the devices in failing_hosts. Requests with malformed SNMP
+    connection data are rejected like Thola does. Like Thola, checks only
+    return the performance data in raw_output if the request sets
+    print_performance_data.
+    """
+
+    def __init__(self, responses=None, latency=0, interface_count=10, error_rate=0, error_status=500,
+                 port=0, seed=None, failing_hosts=()):
+        if responses is None:
+            responses = dict((path, _encode(response)) for path, response in canned_responses(interface_count).items())
+        self.responses = responses
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.failing_hosts = set(failing_hosts)
+        self.random = random.Random(seed)
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self.server.daemon_threads = True
+        self.api_host = "http://127.0.0.1:%d" % self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def delay(self):
+        if isinstance(self.latency, tuple):
+            return self.random.uniform(*self.latency)
+        return self.latency
+
+    def respond(self, path, body):
+        """Returns the status and the body of the response to a request."""
+        message = validate(body)
+        if message:
+            return 400, {"message": message}
+        with self.lock:
+            inject = self.error_rate and self.random.random() < self.error_rate
+            if inject:
+                self.errors += 1
+        if inject:
+            return self.error_status, {"message": "injected error"}
+        if self.failing_hosts and _ip_address(body) in self.failing_hosts:
+            return self.error_status, {"message": "no response from device"}
+        response = self.responses.get(path, (404, {"message": "Not Found"}))
+        status = 200
+        if isinstance(response, tuple):
+            status, response = response
+        if path.startswith("/check/") and not (isinstance(body, dict) and body.get("print_performance_data")):
+            response = _without_perfdata(response)
+        return status, response
+
+
+def _without_perfdata(response):
+    # the raw_output of a check without the "| perfdata" sections of its lines
+    try:
+        data = json.loads(response) if isinstance(response, bytes) else response
+    except ValueError:
+        return response
+    if not isinstance(data, dict) or not isinstance(data.get("raw_output"), str):
+        return response
+    lines = [line.split("|", 1)[0].rstrip() for line in data["raw_output"].split("\n")]
+    data = dict(data, raw_output="\n".join(lines))
+    return _encode(data) if isinstance(response, bytes) else data
+
+
+def validate(body):
+    """Returns the error Thola would return for the SNMP connection data of
+    a request, or None if it is valid."""
+    try:
+        snmp = body["device_data"]["connection_data"]["snmp"]
+    except (KeyError, TypeError):
+        return None
+    if not isinstance(snmp, dict):
+        return None
+    for name, expected in _SNMP_LISTS:
+        value = snmp.get(name)
+        if value is not None and not isinstance(value, list):
+            got = "string" if isinstance(value, str) else "number"
+            return "Unmarshal type error: expected=%s, got=%s, field=device_data.connection_data.snmp.%s" % (
+                expected, got, name)
+    return None
+
+
+def _ip_address(body):
+    try:
+        return body["device_data"]["ip_address"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _encode(response):
+    # compact like the Go encoder of the API
+    return json.dumps(response, separators=(",", ":")).encode("utf-8")
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # send headers and body in one segment, small separate writes run into delayed ACKs
+        wbufsize = 1 << 16
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with stub.lock:
+                stub.requests.append((self.path, body))
+                stub.connections.add(self.client_address)
+                stub.in_flight += 1
+                stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+            try:
+                delay = stub.delay()
+                if delay:
+                    time.sleep(delay)
+                status, response = stub.respond(self.path, body)
+                data = response if isinstance(response, bytes) else _encode(response)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with stub.lock:
+                    stub.in_flight -= 1
+
+    return Handler
+
+
+def interfaces(count):
+    return [{
+        "ifIndex": i,
+        "ifDescr": "GigabitEthernet0/%d" % i,
+        "ifName": "Gi0/%d" % i,
+        "ifAlias": "uplink \"core-%d\"" % i if i % 10 == 0 else "access port",
+        "ifType": "ethernetCsmacd",
+        "ifMtu": 1500,
+        "ifSpeed": 1000000000,
+        "ifHighSpeed": 1000,
+        "ifPhysAddress": "00:1b:54:%02x:%02x:%02x" % (i >> 16 & 255, i >> 8 & 255, i & 255),
+        "ifAdminStatus": "up",
+        "ifOperStatus": "up" if i % 7 else "down",
+        "ifLastChange": 1234 * i,
+        "ifHCInOctets": 1234567 * i,
+        "ifHCOutOctets": 7654321 * i,
+        "ifHCInUcastPkts": 12345 * i,
+        "ifHCOutUcastPkts": 54321 * i,
+        "ifInErrors": i % 3,
+        "ifOutErrors": 0,
+        "ifInDiscards": 0,
+        "ifOutDiscards": i % 5,
+        "ethernet_like": {"dot3StatsFCSErrors": 0, "dot3StatsAlignmentErrors": i % 2},
+    } for i in range(count)]
+
+
+def canned_responses(interface_count=10):
+    """Returns responses of a Cisco router with interface_count interfaces
+    for every endpoint the collection uses."""
+    check = {
+        "status_code": 0,
+        "raw_output": "OK: all fine | 'load'=12.5%;80;90;0;100",
+        "messages": [{"status": 0, "message": "all fine"}],
+        "performance_data": [{"metric": "load", "label": "1", "value": 12.5, "unit": "%",
+                              "thresholds": {"warningMax": 80, "criticalMax": 90}}],
+    }
+    interface_check = dict(check, performance_data=[
+        {"metric": metric, "label": "Gi0/%d" % i, "value": i * 1000}
+        for i in range(interface_count)
+        for metric in ("traffic_counter_in", "traffic_counter_out", "error_counter_in", "error_counter_out")])
+    return {
+        "/identify": {"class": "ios", "properties": {
+            "vendor": "Cisco", "model": "7206VXR", "model_series": "7206",
+            "serial_number": "4279256517", "os_version": "12.4(25g)"}},
+        "/read/available-components": {"availableComponents": [
+            "interfaces", "cpu", "memory", "disk", "hardware_health", "ups", "server", "sbc"]},
+        "/read/count-interfaces": {"count": interface_count},
+        "/read/cpu-load": {"cpu_load": [{"load": 12.5, "temperature": 45}, {"load": 3.0, "temperature": 44}]},
+        "/read/disk": {"disk": {"storages": [
+            {"type": "hrStorageFixedDisk", "description": "/", "available": 20000000, "used": 12000000},
+            {"type": "hrStorageFixedDisk", "description": "/var", "available": 5000000, "used": 1000000}]}},
+        "/read/hardware-health": {"environment_monitor_state": 1,
+                                  "fans": [{"description": "Fan %d" % i, "state": "normal"} for i in range(4)],
+                                  "power_supply": [{"description": "PSU %d" % i, "state": "normal"} for i in range(2)]},
+        "/read/interfaces": {"interfaces": interfaces(interface_count)},
+        "/read/memory-usage": {"memory_usage": {"usage": 42.5}},
+        "/read/sbc": {"sbc": {"system_health_score": 100, "global_call_per_second": 12,
+                              "agents": [{"hostname": "agent%d" % i, "status": 0} for i in range(8)],
+                              "realms": [{"name": "realm%d" % i, "status": 0} for i in range(8)]}},
+        "/read/server": {"server": {"procs": 214, "users": 3}},
+        "/read/ups": {"ups": {"alarm_low_voltage_disconnect": 0, "battery_capacity": 100, "battery_current": 0.5,
+                              "battery_remaining_time": 3600, "battery_temperature": 25, "battery_voltage": 54.1,
+                              "current_load": 12.3, "mains_voltage_applied": True, "rectifier_current": 20.5,
+                              "system_voltage": 54.3}},
+        "/check/cpu-load": check,
+        "/check/disk": check,
+        "/check/hardware-health": check,
+        "/check/identify": dict(check, identify_result={"class": "ios", "properties": {"vendor": "Cisco"}}),
+        "/check/interface-metrics": interface_check,
+        "/check/memory-usage": check,
+        "/check/sbc": check,
+        "/check/server": check,
+        "/check/snmp": dict(check, successful_snmp_credentials={"community": "public", "version": "2c", "port": 161}),
+        "/check/ups": check,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves canned Thola API responses")
+    parser.add_argument("--port", type=int, default=8237)
+    parser.add_argument("--interfaces", type=int, default=10, help="number of interfaces of the device")
+    parser.add_argument("--latency", type=float, default=0, help="minimum delay of every request in seconds")
+    parser.add_argument("--max-latency", type=float, help="maximum delay, the delay is random if set")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    latency = args.latency
+    if args.max_latency is not None:
+        latency = (args.latency, args.max_latency)
+    stub = TholaStub(latency=latency, interface_count=args.interfaces, error_rate=args.error_rate,
+                     error_status=args.error_status, port=args.port)
+    # a long running server must not keep every request
+    stub.requests = _Discard()
+    print("Thola stub listening on " + stub.api_host)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+class _Discard(list):
+    def append(self, item):
+        pass
+
+
+if __name__ == "__main__":
+    main()